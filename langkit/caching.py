@@ -1,7 +1,71 @@
 from __future__ import absolute_import, division, print_function
 
-import hashlib
 import json
+import os
+import os.path
+import zlib
+
+try:
+    import xxhash
+except ImportError:  # no-code-coverage
+    xxhash = None
+
+# The "multiprocessing" module is not available on all platforms: see
+# langkit.libmanage.get_cpu_count.
+try:
+    from multiprocessing.pool import ThreadPool
+except ImportError:  # no-code-coverage
+    ThreadPool = None
+
+
+def content_hash(content):
+    """
+    Return a hash for `content`.
+
+    This is not a cryptographic hash: it is only meant to detect content
+    changes between two runs, so it favors speed. Use xxhash if it is
+    available, and combine the CRC32 and Adler-32 checksums of the content
+    with its length otherwise.
+
+    :param str content: Content to hash.
+    :rtype: str
+    """
+    if xxhash is not None:
+        return 'xxh64:{}'.format(xxhash.xxh64(content).hexdigest())
+    else:
+        return 'crc:{:08x}{:08x}:{}'.format(zlib.crc32(content) & 0xffffffff,
+                                            zlib.adler32(content) & 0xffffffff,
+                                            len(content))
+
+
+def write_file_atomically(file_path, content):
+    """
+    Write `content` to the `file_path` file, so that this file contains either
+    its previous content or `content`, even if the write is interrupted.
+
+    This relies on os.replace when it is available (Python 3.3+), which is
+    atomic on all platforms. Otherwise, use os.rename, which is atomic on
+    POSIX systems but cannot replace an existing file on Windows: there, fall
+    back to removing the file first, so the file briefly does not exist and
+    an interrupted write can leave it missing (never truncated).
+
+    :param str file_path: Path of the file to write.
+    :param str content: Content to write.
+    """
+    tmp_path = '{}.{}.tmp'.format(file_path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        if hasattr(os, 'replace'):
+            os.replace(tmp_path, file_path)
+        else:
+            if os.name == 'nt' and os.path.exists(file_path):
+                os.remove(file_path)
+            os.rename(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
 
 class Cache(object):
@@ -21,6 +85,13 @@ class Cache(object):
         self.cache_file = cache_file
         self._load()
 
+        self._used_keys = set()
+        """
+        Set of keys for which is_stale was called since the cache was loaded.
+
+        :type: set[str]
+        """
+
     def _load(self):
         try:
             f = open(self.cache_file, 'r')
@@ -28,7 +99,11 @@ class Cache(object):
             self.db = {}
         else:
             with f:
-                self.db = json.load(f)
+                try:
+                    self.db = json.load(f)
+                except ValueError:
+                    # The cache file is corrupted: start from scratch
+                    self.db = {}
 
     def is_stale(self, key, content):
         """Return whether the `key` cache entry is staled.
@@ -40,9 +115,7 @@ class Cache(object):
         :param str content: Content for the cache entry to test.
         :rtype: bool
         """
-        m = hashlib.md5()
-        m.update(content)
-        new_hash = m.hexdigest()
+        new_hash = content_hash(content)
 
         try:
             old_hash = self.db[key]
@@ -52,9 +125,208 @@ class Cache(object):
             stale = old_hash != new_hash
 
         self.db[key] = new_hash
+        self._used_keys.add(key)
         return stale
 
+    def unused_keys(self):
+        """
+        Return the list of cache entries for which is_stale was not called
+        since the cache was loaded, sorted by key.
+
+        :rtype: list[str]
+        """
+        return sorted(key for key in self.db if key not in self._used_keys)
+
+    def forget(self, key):
+        """
+        Remove the `key` cache entry.
+
+        :param str key: Key for the cache entry to remove.
+        """
+        self.db.pop(key, None)
+        self._used_keys.discard(key)
+
     def save(self):
         """Save the content of the cache to a file."""
-        with open(self.cache_file, 'w') as f:
-            json.dump(self.db, f)
+        write_file_atomically(self.cache_file, json.dumps(self.db))
+
+
+class ResultCache(object):
+    """
+    Cache for the results of expensive text transformations (for instance
+    code formatters), indexed by a hash of their input.
+
+    Each entry is stored as a file in a dedicated directory, so that results
+    are reused across runs.
+    """
+
+    def __init__(self, cache_dir):
+        """
+        :param str cache_dir: Directory in which to store cache entries.
+        """
+        self.cache_dir = cache_dir
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+        self._used_entries = set()
+        """
+        Names of the entries that were looked up since this cache was created.
+
+        :type: set[str]
+        """
+
+    def get(self, kind, content, compute, config=''):
+        """
+        Return `compute(content)`, reusing the result of a previous call with
+        the same `kind`, `content` and `config` if there is one.
+
+        :param str kind: Name for the transformation that `compute` performs.
+            Results for different kinds are stored separately.
+        :param str content: Input for the transformation.
+        :param (str) -> str compute: Function that performs the
+            transformation.
+        :param str config: Description of everything besides `content` that
+            can change the result of `compute`: tool versions, configuration
+            files, etc. Results computed for different configurations are
+            stored separately.
+        :rtype: str
+        """
+        name = '{}-{}'.format(
+            kind,
+            content_hash('{}\0{}'.format(config, content)).replace(':', '-')
+        )
+        self._used_entries.add(name)
+        entry_path = os.path.join(self.cache_dir, name)
+
+        try:
+            with open(entry_path, 'rb') as f:
+                return f.read()
+        except IOError:
+            pass
+
+        result = compute(content)
+        write_file_atomically(entry_path, result)
+        return result
+
+    def prune(self):
+        """
+        Remove the entries that were not looked up since this cache was
+        created, so that the cache does not grow indefinitely.
+        """
+        for name in os.listdir(self.cache_dir):
+            if name not in self._used_entries:
+                os.remove(os.path.join(self.cache_dir, name))
+
+
+class OutputWriter(object):
+    """
+    Writer for generated source files.
+
+    A Cache instance serves as a manifest for generated files: it maps their
+    paths to hashes of their contents. This makes it possible to:
+
+    * write only files whose content changed since the previous run, so that
+      incremental builds have less to do;
+
+    * remove files that the previous run generated but that the current run
+      did not (see the prune method).
+
+    Files are written atomically (see write_file_atomically), so that an
+    interrupted run cannot leave truncated sources. Writes can also be
+    performed in background threads, if explicitly requested with the `jobs`
+    argument: the flush method waits for them to complete.
+    """
+
+    def __init__(self, cache, jobs=1):
+        """
+        :param Cache cache: Manifest for generated files.
+        :param int jobs: Number of threads to use to write files. If 1, write
+            files synchronously.
+        """
+        self.cache = cache
+        self.pool = (ThreadPool(jobs)
+                     if jobs > 1 and ThreadPool is not None else None)
+        self.pending = []
+        """
+        Results for writes scheduled in the thread pool and not flushed yet.
+
+        :type: list[multiprocessing.pool.AsyncResult]
+        """
+
+        self.generated = set()
+        """
+        Absolute paths for all the files that this run generated so far.
+
+        :type: set[str]
+        """
+
+    def write(self, file_path, content, sync=False):
+        """
+        Write `content` to the `file_path` file, unless this file already has
+        this content. Return whether the file is (to be) rewritten.
+
+        :param str file_path: Path of the file to write.
+        :param str content: Content of the file to write.
+        :param bool sync: If True, write the file before returning even when
+            writes are performed in background threads.
+        :rtype: bool
+        """
+        stale = self.cache.is_stale(file_path, content)
+        self.generated.add(os.path.abspath(file_path))
+        if not stale and os.path.exists(file_path):
+            return False
+
+        if self.pool is None or sync:
+            write_file_atomically(file_path, content)
+        else:
+            self.pending.append(self.pool.apply_async(
+                write_file_atomically, (file_path, content)
+            ))
+        return True
+
+    def flush(self):
+        """
+        Wait for all pending writes to complete. Re-raise the first error that
+        occurred in them, if any.
+        """
+        pending, self.pending = self.pending, []
+        for result in pending:
+            result.get()
+
+    def prune(self, root_dir):
+        """
+        Remove the files from `root_dir` that the previous run generated but
+        that the current run did not. Return the list of removed files.
+
+        :param str root_dir: Directory that contains all generated files.
+            Files outside of it are never removed.
+        :rtype: list[str]
+        """
+        root_dir = os.path.join(os.path.abspath(root_dir), '')
+        removed = []
+        for file_path in self.cache.unused_keys():
+            abs_path = os.path.abspath(file_path)
+            if not abs_path.startswith(root_dir):
+                continue
+
+            # The same file may have been generated under a different path
+            # (for instance if the build directory was once given as a
+            # relative path): never remove a file generated by this run.
+            if abs_path not in self.generated and os.path.isfile(file_path):
+                os.remove(file_path)
+                removed.append(file_path)
+            self.cache.forget(file_path)
+        return removed
+
+    def close(self):
+        """
+        Flush pending writes, stop background threads and save the manifest.
+        """
+        try:
+            self.flush()
+        finally:
+            if self.pool is not None:
+                self.pool.close()
+                self.pool.join()
+                self.pool = None
+        self.cache.save()
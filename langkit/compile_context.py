@@ -17,6 +17,7 @@ from collections import defaultdict
 from contextlib import contextmanager, nested
 from distutils.spawn import find_executable
 from glob import glob
+import hashlib
 import inspect
 import os
 from os import path
@@ -36,10 +37,12 @@ from langkit.envs import EnvSpec
 from langkit.expressions import PropertyDef
 from langkit.passes import (
     ASTNodePass, EnvSpecPass, GlobalPass, GrammarRulePass, MajorStepPass,
-    PassManager, PropertyPass, StopPipeline, errors_checkpoint_pass
+    PassManager, PassProfiler, PropertyPass, StopPipeline,
+    errors_checkpoint_pass, profile_pass
 )
-from langkit.template_utils import add_template_dir
-from langkit.utils import Colors, printcol, topological_sort
+from langkit.template_utils import add_template_dir, set_template_cache_dir
+from langkit.utils import (Colors, TopologicalSortFailure, memoized,
+                           printcol, topological_sort)
 
 
 compile_ctx = None
@@ -91,38 +94,104 @@ def copy_file(from_path, to_path):
     write_source_file(to_path, content)
 
 
-def write_source_file(file_path, source):
+def write_source_file(file_path, source, sync=False):
     """
     Helper to write a source file.
 
-    Return whether the file has been updated.
+    Return whether the file has been updated. Unless `sync` is True, the file
+    may be written in a background thread: see caching.OutputWriter.
 
     :param str file_path: Path of the file to write.
     :param str source: Content of the file to write.
+    :param bool sync: Whether the file must be written when this returns.
 
     :rtype: bool
     """
     context = get_context()
-    if context.cache.is_stale(file_path, source):
+    if context.output_writer.write(file_path, source, sync):
         if context.verbosity.debug:
             printcol('Rewriting stale source: {}'.format(file_path),
                      Colors.OKBLUE)
-        with open(file_path, 'wb') as f:
-            f.write(source)
         return True
     return False
 
 
+@memoized
+def _tool_version(executable):
+    """
+    Return the output of `executable --version`, or an empty string if it
+    cannot be run.
+
+    :param str executable: Path to the executable to run.
+    :rtype: str
+    """
+    try:
+        return subprocess.check_output([executable, '--version'])
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+@memoized
+def _clang_format_style(directory):
+    """
+    Return the content of the clang-format style file that applies to files
+    in `directory`, or an empty string if there is none.
+
+    Like clang-format, look for a ".clang-format" or "_clang-format" file in
+    `directory` and then in its parents.
+
+    :param str directory: Absolute path to the directory to process.
+    :rtype: str
+    """
+    for name in ('.clang-format', '_clang-format'):
+        style_file = path.join(directory, name)
+        if path.isfile(style_file):
+            with open(style_file, 'rb') as f:
+                return '{}\n{}'.format(style_file, f.read())
+
+    parent = path.dirname(directory)
+    return '' if parent == directory else _clang_format_style(parent)
+
+
 def write_cpp_file(file_path, source):
     """
     Helper to write a C/C++ source file.
 
+    If clang-format is available, use it to format the source first. As
+    formatting results are cached, unchanged sources are never reformatted.
+
     :param str file_path: Path of the file to write.
     :param str source: Content of the file to write.
     """
-    if write_source_file(file_path, source):
-        if find_executable('clang-format'):
-            subprocess.check_call(['clang-format', '-i', file_path])
+    clang_format_exe = find_executable('clang-format')
+    if clang_format_exe:
+        def clang_format(source):
+            # Make clang-format pick the style file that would apply to
+            # file_path, just as if we formatted it in place.
+            p = subprocess.Popen(
+                [clang_format_exe, '-assume-filename={}'.format(file_path)],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE
+            )
+            result, _ = p.communicate(source)
+            if p.returncode:
+                raise subprocess.CalledProcessError(p.returncode,
+                                                    'clang-format')
+            return result
+
+        # The formatted source depends on the formatter itself, on the style
+        # that applies to file_path and on the file name (clang-format infers
+        # the language from the extension), so include all of these in the
+        # cache key.
+        clang_format_exe = path.realpath(clang_format_exe)
+        config = '\n'.join([
+            clang_format_exe,
+            _tool_version(clang_format_exe),
+            file_path,
+            _clang_format_style(path.dirname(path.abspath(file_path)))
+        ])
+        source = get_context().format_cache.get('clang-format', source,
+                                                clang_format, config)
+    write_source_file(file_path, source)
 
 
 ADA_SPEC = "spec"
@@ -255,6 +324,156 @@ class LibraryEntity(object):
         return '{}.{}'.format(self.unit_fqn, self.entity_name)
 
 
+class ExpressionIndex(object):
+    """
+    Index for the resolved expressions of a set of properties.
+
+    Whole-program analyses on properties (callgraphs, checks on specific kinds
+    of expressions, ...) can query this index instead of walking expression
+    trees over and over.
+    """
+
+    def __init__(self, properties):
+        """
+        Walk the constructed expression of all given properties and index
+        them.
+
+        :param list[PropertyDef] properties: Properties to index. Queries
+            return results in this order.
+        """
+        self.properties = list(properties)
+        """
+        List of indexed properties.
+
+        :type: list[PropertyDef]
+        """
+
+        self.exprs = {}
+        """
+        Mapping from indexed properties to the list of all resolved expressions
+        in their constructed expression, in pre-order.
+
+        :type: dict[PropertyDef, list[ResolvedExpression]]
+        """
+
+        self.call_sites = {}
+        """
+        Mapping from indexed properties to the list of references to
+        properties in their constructed expression. Each reference is a couple:
+        the resolved expression that contains the reference and the referenced
+        property.
+
+        :type: dict[PropertyDef, list[(ResolvedExpression, PropertyDef)]]
+        """
+
+        self._by_kind = defaultdict(list)
+        """
+        Mapping from resolved expression classes to the list of indexed
+        expressions that are exact instances of it. Each item is a triple: the
+        position of the expression in the whole index, the owning property and
+        the expression itself.
+
+        :type: dict[type, list[(int, PropertyDef, ResolvedExpression)]]
+        """
+
+        self._find_cache = {}
+        """
+        Cache for the "find" method.
+
+        :type: dict[type, list[(PropertyDef, ResolvedExpression)]]
+        """
+
+        self._count = 0
+        for prop in self.properties:
+            self._index_property(prop)
+
+        self.forwards, self.backwards = self.callgraphs()
+        """
+        Forwards and backwards properties callgraphs, as computed by the
+        "callgraphs" method with default converters.
+
+        :type: (dict[PropertyDef, set[PropertyDef]],
+                dict[PropertyDef, set[PropertyDef]])
+        """
+
+    def _index_property(self, prop):
+        """
+        Index all resolved expressions in `prop`.
+
+        :param PropertyDef prop: Property to index.
+        """
+        exprs = []
+        call_sites = []
+        self.exprs[prop] = exprs
+        self.call_sites[prop] = call_sites
+
+        if not prop.constructed_expr:
+            return
+
+        for expr in prop.constructed_expr.walk():
+            exprs.append(expr)
+            self._by_kind[type(expr)].append((self._count, prop, expr))
+            self._count += 1
+
+            call_sites.extend(
+                (expr, ref_prop) for ref_prop in expr.flat_subexprs(
+                    lambda e: isinstance(e, PropertyDef)
+                )
+            )
+
+    def find(self, cls):
+        """
+        Return all indexed expressions that are instances of `cls`.
+
+        :param type cls: ResolvedExpression subclass to look for.
+        :return: List of couples: the owning property and the expression
+            itself. Properties come in the indexing order, and expressions
+            for the same property come in pre-order.
+        :rtype: list[(PropertyDef, ResolvedExpression)]
+        """
+        try:
+            return self._find_cache[cls]
+        except KeyError:
+            pass
+
+        items = sorted(
+            item
+            for kind, kind_items in self._by_kind.items()
+            if issubclass(kind, cls)
+            for item in kind_items
+        )
+        result = [(prop, expr) for _, prop, expr in items]
+        self._find_cache[cls] = result
+        return result
+
+    def callgraphs(
+        self, forwards_converter=lambda expr, to_prop: to_prop,
+        backwards_converter=lambda expr, from_prop: from_prop,
+    ):
+        """
+        Compute forwards and backwards callgraphs for indexed properties. See
+        CompileCtx.properties_callgraphs for the semantics of arguments and of
+        the result.
+        """
+        def add_forward(from_prop, to_prop, expr):
+            backwards.setdefault(to_prop, set())
+            forwards[from_prop].add(forwards_converter(expr, to_prop))
+            backwards[to_prop].add(backwards_converter(expr, from_prop))
+            for over_prop in to_prop.all_overriding_properties:
+                add_forward(from_prop, over_prop, expr)
+
+        forwards = {}
+        backwards = {}
+
+        for prop in self.properties:
+            forwards.setdefault(prop, set())
+            backwards.setdefault(prop, set())
+            for expr, ref_prop in self.call_sites[prop]:
+                add_forward(prop, ref_prop, expr)
+
+        return (forwards, backwards)
+
+
 class CompileCtx(object):
     """State holder for native code emission."""
 
@@ -574,6 +793,49 @@ class CompileCtx(object):
         ":type: list[langkit.parsers.GeneratedParser]"
 
         self.cache = None
+        self.output_writer = None
+        self.format_cache = None
+
+        self._expr_index = None
+        """
+        Index for the resolved expressions of all properties. Built lazily:
+        see the "expr_index" property.
+
+        :type: ExpressionIndex|None
+        """
+
+        self.jobs = 1
+        """
+        Maximum number of processes to use for parallel-safe compilation
+        passes.
+
+        :type: int
+        """
+
+        self.write_jobs = 1
+        """
+        Number of threads to use to write generated source files. See
+        caching.OutputWriter.
+
+        :type: int
+        """
+
+        self._sorted_types_cache = {}
+        """
+        Cache for the sorted_types method. Map identifiers for type sets to
+        a frozen copy of the set at the time it was sorted and to the
+        corresponding sorted list of types.
+
+        :type: dict[int, (frozenset[CompiledType], list[CompiledType])]
+        """
+
+        self.pass_profiler = None
+        """
+        If compilation passes must be profiled, profiler that collects
+        statistics about them.
+
+        :type: PassProfiler|None
+        """
 
         # Internal field for extensions directory
         self._extensions_dir = None
@@ -697,11 +959,30 @@ class CompileCtx(object):
         This is useful during code generation as sorted types keep a consistent
         order for declarations.
 
+        The result is cached, as templates request the same sorted views many
+        times: callers must not modify it.
+
         :param set[langkit.compiled_types.CompiledType] type_set: Set of
             CompiledType instances to sort.
         :rtype: list[langkit.compiled_types.CompiledType]
         """
-        return sorted(type_set, key=lambda cls: cls.name)
+        # Templates keep passing the same set objects, so key the cache on
+        # their identity. As sets can change after a first call (and as
+        # identities can be reused once a set is garbage collected), check
+        # that the set still has the content that was sorted before reusing
+        # the result: this is linear but allocates nothing, unlike building a
+        # frozen copy of the set for each lookup.
+        key = id(type_set)
+        entry = self._sorted_types_cache.get(key)
+        if entry is not None:
+            content, result = entry
+            if (len(type_set) == len(content) and
+                    all(t in content for t in type_set)):
+                return result
+
+        result = sorted(type_set, key=lambda cls: cls.name)
+        self._sorted_types_cache[key] = (frozenset(type_set), result)
+        return result
 
     def do_generate_logic_binder(self, convert_property=None,
                                  eq_property=None):
@@ -731,6 +1012,39 @@ class CompileCtx(object):
             if parser.get_type().is_ast_node
         )
 
+    @property
+    def ast_cache_signature(self):
+        """
+        Return a hash of everything that determines the tokens and the AST
+        that the generated library computes for a given source: lexer,
+        parsers and node layouts.
+
+        Entries in AST caches (see Set_AST_Cache_Directory in the generated
+        library) embed this signature, so that libraries never load entries
+        that were computed by a different version of the language
+        specification.
+
+        :rtype: str
+        """
+        h = hashlib.sha1()
+
+        def update(text):
+            h.update(unicode(text).encode('utf-8'))
+
+        update(self.lexer.emit())
+        for parser in sorted(self.generated_parsers,
+                             key=lambda p: str(p.name)):
+            update(parser.spec)
+            update(parser.body)
+        for cls in self.astnode_types:
+            update(u'{} {}\n'.format(
+                cls.dsl_name, u' '.join(
+                    u'{}:{}'.format(f.name.lower, f.type.name.lower)
+                    for f in cls.get_parse_fields()
+                )
+            ))
+        return h.hexdigest()
+
     def create_enum_node_classes(self):
         """
         Expand all EnumNode subclasses into ASTNodeType instances.
@@ -862,10 +1176,32 @@ class CompileCtx(object):
             for prop in astnode.get_properties(*args, **kwargs):
                 yield prop
 
-    def properties_callgraphs(
-        self, forwards_converter=lambda expr, to_prop: to_prop,
-        backwards_converter=lambda expr, from_prop: from_prop,
-    ):
+    @property
+    def expr_index(self):
+        """
+        Return the index for the resolved expressions of all properties.
+
+        This index is built the first time it is requested, so this must be
+        called only after resolved expressions are constructed. Passes that
+        alter resolved expressions or the set of properties must call
+        "invalidate_expr_index" so that it gets rebuilt when needed.
+
+        :rtype: ExpressionIndex
+        """
+        if self._expr_index is None:
+            self._expr_index = ExpressionIndex(
+                self.all_properties(include_inherited=False)
+            )
+        return self._expr_index
+
+    def invalidate_expr_index(self):
+        """
+        Discard the index for the resolved expressions of all properties.
+        """
+        self._expr_index = None
+
+    def properties_callgraphs(self, forwards_converter=None,
+                              backwards_converter=None):
         """
         Compute forwards and backwards properties callgraphs.
 
@@ -884,42 +1220,31 @@ class CompileCtx(object):
         :param forwards_converter: Function to customize what the forwards call
             graph contains. It is its result that is added to the returned set.
             The given resolved expression, which comes from the caller property
-            is the expression that references the given called property.
+            is the expression that references the given called property. If
+            left to None, just use the called property.
         :type forwards_converter: (ResolvedExpression, PropertyDef) -> T
 
         :param backwards_converter: Likewise for the backwards callgraph.
             The given resolved expression, which comes from the given caller
-            property is the expression that references the called property.
+            property is the expression that references the called property. If
+            left to None, just use the caller property.
         :type forwards_converter: (ResolvedExpression, PropertyDef) -> T
 
         :return: A tuple for 1) the forwards callgraph 2) the backwards one.
+            When no converter is passed, these come from the expression index
+            and thus must not be modified.
         :rtype: (dict[PropertyDef, set[T]], dict[PropertyDef, set[T]])
         """
-        def add_forward(from_prop, to_prop, expr):
-            backwards.setdefault(to_prop, set())
-            forwards[from_prop].add(forwards_converter(expr, to_prop))
-            backwards[to_prop].add(backwards_converter(expr, from_prop))
-            for over_prop in to_prop.all_overriding_properties:
-                add_forward(from_prop, over_prop, expr)
-
-        def traverse_expr(expr):
-            for ref_prop in expr.flat_subexprs(
-                lambda e: isinstance(e, PropertyDef)
-            ):
-                add_forward(prop, ref_prop, expr)
-            for subexpr in expr.flat_subexprs():
-                traverse_expr(subexpr)
-
-        forwards = {}
-        backwards = {}
-
-        for prop in self.all_properties(include_inherited=False):
-            forwards.setdefault(prop, set())
-            backwards.setdefault(prop, set())
-            if prop.constructed_expr:
-                traverse_expr(prop.constructed_expr)
+        index = self.expr_index
+        if forwards_converter is None and backwards_converter is None:
+            return (index.forwards, index.backwards)
 
-        return (forwards, backwards)
+        kwargs = {}
+        if forwards_converter is not None:
+            kwargs['forwards_converter'] = forwards_converter
+        if backwards_converter is not None:
+            kwargs['backwards_converter'] = backwards_converter
+        return index.callgraphs(**kwargs)
 
     def compute_uses_entity_info_attr(self):
         """
@@ -956,30 +1281,21 @@ class CompileCtx(object):
         # sure that calls to properties that require entity info are made on
         # entities.
 
-        def process_expr(expr):
-            if isinstance(expr, FieldAccess.Expr):
-                context_mgrs = []
-                if expr.abstract_expr:
-                    context_mgrs.append(expr.abstract_expr.diagnostic_context)
+        for prop, expr in self.expr_index.find(FieldAccess.Expr):
+            context_mgrs = [prop.diagnostic_context]
+            if expr.abstract_expr:
+                context_mgrs.append(expr.abstract_expr.diagnostic_context)
 
-                with nested(*context_mgrs):
-                    check_source_language(
-                        not expr.node_data.uses_entity_info
-                        or expr.node_data.optional_entity_info
-                        or expr.implicit_deref,
-                        'Call to {} must be done on an entity'.format(
-                            expr.node_data.qualname
-                        ),
-                        severity=Severity.non_blocking_error
-                    )
-
-            for subexpr in expr.flat_subexprs():
-                process_expr(subexpr)
-
-        for prop in all_props:
-            with prop.diagnostic_context:
-                if prop.constructed_expr:
-                    process_expr(prop.constructed_expr)
+            with nested(*context_mgrs):
+                check_source_language(
+                    not expr.node_data.uses_entity_info
+                    or expr.node_data.optional_entity_info
+                    or expr.implicit_deref,
+                    'Call to {} must be done on an entity'.format(
+                        expr.node_data.qualname
+                    ),
+                    severity=Severity.non_blocking_error
+                )
 
     def compute_uses_envs_attr(self):
         """
@@ -1135,7 +1451,8 @@ class CompileCtx(object):
              main_programs=set(), annotate_fields_types=False,
              check_only=False, no_property_checks=False,
              warnings=None, generate_pp=False, properties_logging=False,
-             separate_properties=False, generate_astdoc=True):
+             separate_properties=False, generate_astdoc=True,
+             profile_passes=False, jobs=1, write_jobs=1):
         """
         Generate sources for the analysis library. Also emit a tiny program
         useful for testing purposes.
@@ -1181,17 +1498,37 @@ class CompileCtx(object):
 
         :param bool generate_astdoc: Whether to generate the HTML documentation
             for AST nodes, their fields and their properties.
+
+        :param bool profile_passes: Whether to profile compilation passes and
+            code emission steps. If True, print a summary of the most time
+            consuming ones and write a detailed report to
+            $BUILD/pass_profile.json.
+
+        :param int jobs: Maximum number of processes to use to run
+            parallel-safe compilation passes.
+
+        :param int write_jobs: Number of threads to use to write generated
+            source files. If 1, write them synchronously.
         """
         if self.extensions_dir:
             add_template_dir(self.extensions_dir)
         for dirpath in keep(self.template_lookup_extra_dirs):
             add_template_dir(dirpath)
 
+        # Keep compiled templates in the build directory so that next runs do
+        # not have to compile them again.
+        if not check_only:
+            set_template_cache_dir(
+                path.abspath(path.join(file_root, 'obj', 'mako'))
+            )
+
         self.no_property_checks = no_property_checks
         self.generate_pp = generate_pp
         self.properties_logging = properties_logging
         self.separate_properties = separate_properties
         self.generate_astdoc = generate_astdoc
+        self.jobs = jobs
+        self.write_jobs = write_jobs
         if warnings:
             self.warnings = warnings
 
@@ -1210,13 +1547,24 @@ class CompileCtx(object):
                     if path.isfile(filepath) and not filename.startswith("."):
                         self.additional_source_files.append(filepath)
 
-        self.compile(check_only=check_only,
-                     annotate_fields_types=annotate_fields_types)
-        if check_only:
-            return
-        with global_context(self):
-            self._emit(file_root, generate_lexer, main_source_dirs,
-                       main_programs)
+        self.pass_profiler = PassProfiler() if profile_passes else None
+        try:
+            self.compile(check_only=check_only,
+                         annotate_fields_types=annotate_fields_types)
+            if check_only:
+                return
+            with global_context(self):
+                self._emit(file_root, generate_lexer, main_source_dirs,
+                           main_programs)
+        finally:
+            if self.pass_profiler:
+                self.pass_profiler.print_summary()
+                if not path.isdir(file_root):
+                    os.makedirs(file_root)
+                report = path.join(file_root, 'pass_profile.json')
+                self.pass_profiler.write_json(report)
+                printcol('Pass profile report written to {}'.format(report),
+                         Colors.OKBLUE)
 
     def compile(self, check_only=False, annotate_fields_types=False):
         with global_context(self):
@@ -1288,10 +1636,23 @@ class CompileCtx(object):
                 ' were added')
 
         else:
-            self._struct_types = list(topological_sort(
-                (t, dependencies(t))
-                for t in sorted(struct_types, key=lambda t: t.name)
-            ))
+            # Struct types are declared in this order in generated sources:
+            # see topological_sort for how it relates to the order of names.
+            try:
+                self._struct_types = topological_sort(
+                    (t, dependencies(t))
+                    for t in sorted(struct_types, key=lambda t: t.name)
+                )
+            except TopologicalSortFailure as exc:
+                if exc.kind == TopologicalSortFailure.CYCLE:
+                    message = 'Struct types have a dependency cycle: {}'
+                    items_img = ' -> '.join(
+                        t.dsl_name for t in exc.items + exc.items[:1]
+                    )
+                else:
+                    message = 'Struct types depend on unknown struct types: {}'
+                    items_img = ', '.join(t.dsl_name for t in exc.items)
+                check_source_language(False, message.format(items_img))
 
         return self._struct_types
 
@@ -1403,7 +1764,8 @@ class CompileCtx(object):
                        CompileCtx.finalize_symbol_literals),
 
             GrammarRulePass('compile grammar rule', Parser.compile),
-            PropertyPass('render property', PropertyDef.render_property),
+            PropertyPass('render property', PropertyDef.render_property,
+                         merge_fn=PropertyDef.set_rendering),
             GlobalPass('annotate fields types',
                        CompileCtx.annotate_fields_types,
                        disabled=not annotate_fields_types),
@@ -1420,6 +1782,9 @@ class CompileCtx(object):
         a library specification and the corresponding implementation.  Also
         emit a tiny program that can parse starting with any parsing rule for
         testing purposes.
+
+        If pass profiling is enabled, each emission step (Ada module, API,
+        ...) is profiled as a separate pass.
         """
         lib_name_low = self.ada_api_settings.lib_name.lower()
 
@@ -1447,29 +1812,36 @@ class CompileCtx(object):
         self.cache = caching.Cache(
             os.path.join(file_root, 'obj', 'langkit_cache')
         )
+        self.output_writer = caching.OutputWriter(self.cache,
+                                                  self.write_jobs)
+        self.format_cache = caching.ResultCache(
+            os.path.join(file_root, 'obj', 'format_cache')
+        )
 
         # Create the project file for the generated library
-        main_project_file = os.path.join(
-            lib_path, "gnat",
-            "{}.gpr".format(self.ada_api_settings.lib_name.lower()),
-        )
-        write_source_file(
-            main_project_file,
-            self.render_template(
-                "project_file",
-                lib_name=self.ada_api_settings.lib_name,
-                os_path=os.path,
-                quex_path=os.environ['QUEX_PATH'],
+        with profile_pass(self, 'emit library project file'):
+            main_project_file = os.path.join(
+                lib_path, "gnat",
+                "{}.gpr".format(self.ada_api_settings.lib_name.lower()),
+            )
+            write_source_file(
+                main_project_file,
+                self.render_template(
+                    "project_file",
+                    lib_name=self.ada_api_settings.lib_name,
+                    os_path=os.path,
+                    quex_path=os.environ['QUEX_PATH'],
+                )
             )
-        )
 
         if self.generate_astdoc:
             from langkit import astdoc
 
-            f = StringIO()
-            astdoc.write_astdoc(self, f)
-            write_source_file(os.path.join(share_path, 'ast-types.html'),
-                              f.read())
+            with profile_pass(self, 'emit AST documentation'):
+                f = StringIO()
+                astdoc.write_astdoc(self, f)
+                write_source_file(os.path.join(share_path, 'ast-types.html'),
+                                  f.read())
 
         if self.verbosity.info:
             printcol("Generating sources... ", Colors.OKBLUE)
@@ -1499,19 +1871,22 @@ class CompileCtx(object):
         ]
 
         for template_base_name, qual_name, has_body in ada_modules:
-            qual_name = ([names.Name(n) for n in qual_name.split('.')]
-                         if qual_name else [])
-            self.write_ada_module(src_path, template_base_name, qual_name,
-                                  has_body)
-
-        with names.camel_with_underscores:
+            with profile_pass(self, 'emit Ada module {}'.format(
+                template_base_name
+            )):
+                qual_name = ([names.Name(n) for n in qual_name.split('.')]
+                             if qual_name else [])
+                self.write_ada_module(src_path, template_base_name, qual_name,
+                                      has_body)
+
+        with profile_pass(self, 'emit parse main program'), \
+                names.camel_with_underscores:
             write_ada_file(
                 path.join(file_root, "src"), ADA_BODY, [names.Name('Parse')],
                 self.render_template("main_parse_ada")
             )
 
-        with names.lower:
-            # ... and the Quex C interface
+        with profile_pass(self, 'emit Quex C interface'), names.lower:
             write_cpp_file(path.join(src_path, "quex_interface.h"),
                            self.render_template(
                                "lexer/quex_interface_header_c"))
@@ -1519,56 +1894,61 @@ class CompileCtx(object):
                            self.render_template(
                                "lexer/quex_interface_body_c"))
 
-        imain_project_file = os.path.join(file_root, "src", "mains.gpr")
-        write_source_file(
-            imain_project_file,
-            self.render_template(
-                "mains_project_file",
-                lib_name=self.ada_api_settings.lib_name,
-                source_dirs=main_source_dirs,
-                main_programs=main_programs
+        with profile_pass(self, 'emit mains project file'):
+            imain_project_file = os.path.join(file_root, "src", "mains.gpr")
+            write_source_file(
+                imain_project_file,
+                self.render_template(
+                    "mains_project_file",
+                    lib_name=self.ada_api_settings.lib_name,
+                    source_dirs=main_source_dirs,
+                    main_programs=main_programs
+                )
             )
-        )
 
         # Emit C API
-        self.emit_c_api(src_path, include_path)
+        with profile_pass(self, 'emit C API'):
+            self.emit_c_api(src_path, include_path)
 
         # Emit python API
         if self.python_api_settings:
-            python_path = path.join(file_root, "python")
-            if not path.exists(python_path):
-                os.mkdir(python_path)
-            self.emit_python_api(python_path)
+            with profile_pass(self, 'emit Python API'):
+                python_path = path.join(file_root, "python")
+                if not path.exists(python_path):
+                    os.mkdir(python_path)
+                self.emit_python_api(python_path)
+
+                playground_file = os.path.join(file_root, "bin", "playground")
+                write_source_file(
+                    playground_file,
+                    self.render_template(
+                        "python_api/playground_py",
+                        module_name=self.python_api_settings.module_name
+                    ),
+                    sync=True
+                )
+
+                os.chmod(playground_file, 0o775)
 
-            playground_file = os.path.join(file_root, "bin", "playground")
+        # Emit GDB helpers initialization script
+        with profile_pass(self, 'emit GDB helpers'):
+            gdbinit_path = os.path.join(file_root, 'gdbinit.py')
+            lib_name = self.ada_api_settings.lib_name.lower()
             write_source_file(
-                playground_file,
+                gdbinit_path,
                 self.render_template(
-                    "python_api/playground_py",
-                    module_name=self.python_api_settings.module_name
+                    'gdb_py',
+                    langkit_path=os.path.dirname(os.path.dirname(__file__)),
+                    lib_name=lib_name,
+                    prefix=(self.short_name.lower
+                            if self.short_name else lib_name),
                 )
             )
-
-            os.chmod(playground_file, 0o775)
-
-        # Emit GDB helpers initialization script
-        gdbinit_path = os.path.join(file_root, 'gdbinit.py')
-        lib_name = self.ada_api_settings.lib_name.lower()
-        write_source_file(
-            gdbinit_path,
-            self.render_template(
-                'gdb_py',
-                langkit_path=os.path.dirname(os.path.dirname(__file__)),
-                lib_name=lib_name,
-                prefix=(self.short_name.lower
-                        if self.short_name else lib_name),
+            write_source_file(
+                os.path.join(src_path, 'gdb.c'),
+                self.render_template('gdb_c', gdbinit_path=gdbinit_path,
+                                     os_name=os.name)
             )
-        )
-        write_source_file(
-            os.path.join(src_path, 'gdb.c'),
-            self.render_template('gdb_c', gdbinit_path=gdbinit_path,
-                                 os_name=os.name)
-        )
 
         # Add any sources in $lang_path/extensions/support if it exists
         if self.ext('support'):
@@ -1582,26 +1962,36 @@ class CompileCtx(object):
         # the Quex specification changed from last build.
         quex_file = os.path.join(src_path,
                                  "{}.qx".format(self.lang_name.lower))
-        quex_spec = self.lexer.emit()
-        if (
-            write_source_file(quex_file, quex_spec) and
-            generate_lexer
-        ):
+        with profile_pass(self, 'emit Quex lexer specification'):
+            quex_spec = self.lexer.emit()
+            quex_spec_changed = write_source_file(quex_file, quex_spec,
+                                                  sync=True)
+        if quex_spec_changed and generate_lexer:
             quex_py_file = path.join(os.environ["QUEX_PATH"], "quex-exe.py")
-            subprocess.check_call([sys.executable, quex_py_file, "-i",
-                                   quex_file,
-                                   "-o", "quex_lexer",
-                                   "--buffer-element-size", "4",
-                                   "--token-id-offset",  "0x1000",
-                                   "--language", "C",
-                                   "--no-mode-transition-check",
-                                   "--single-mode-analyzer",
-                                   "--token-memory-management-by-user",
-                                   "--token-policy", "single",
-                                   "--token-id-prefix", self.lexer.prefix],
-                                  cwd=src_path)
-
-        self.cache.save()
+            with profile_pass(self, 'run Quex'):
+                subprocess.check_call([sys.executable, quex_py_file, "-i",
+                                       quex_file,
+                                       "-o", "quex_lexer",
+                                       "--buffer-element-size", "4",
+                                       "--token-id-offset",  "0x1000",
+                                       "--language", "C",
+                                       "--no-mode-transition-check",
+                                       "--single-mode-analyzer",
+                                       "--token-memory-management-by-user",
+                                       "--token-policy", "single",
+                                       "--token-id-prefix", self.lexer.prefix],
+                                      cwd=src_path)
+
+        # Remove sources that previous runs generated but that are no longer
+        # part of the library, so that they do not end up in builds.
+        with profile_pass(self, 'flush generated sources'):
+            self.output_writer.flush()
+        for file_path in self.output_writer.prune(file_root):
+            if self.verbosity.debug:
+                printcol('Removing obsolete source: {}'.format(file_path),
+                         Colors.OKBLUE)
+        self.output_writer.close()
+        self.format_cache.prune()
 
     def emit_c_api(self, src_path, include_path):
         """
@@ -1679,6 +2069,22 @@ class CompileCtx(object):
                 )
                 return code
 
+        def pretty_printer_config():
+            # Describe the pretty-printer that pretty_print uses, as its
+            # output depends on it.
+            if not self.pretty_print:
+                return ''
+            for module_name in ('yapf', 'autopep8'):
+                try:
+                    module = __import__(module_name)
+                except ImportError:
+                    continue
+                return '{} {} {}'.format(
+                    module_name, getattr(module, '__version__', '?'),
+                    path.realpath(module.__file__)
+                )
+            return ''
+
         module_filename = "{}.py".format(self.python_api_settings.module_name)
 
         with names.camel:
@@ -1688,16 +2094,22 @@ class CompileCtx(object):
                 pyapi=self.python_api_settings,
             )
 
-            # If pretty-printing failed, write the original code anyway in
-            # order to ease debugging.
+            # Pretty-printing takes a lot of time, so reuse the result of a
+            # previous run if the rendered code did not change. If
+            # pretty-printing failed, write the original code anyway in order
+            # to ease debugging.
             exc = None
             try:
-                pp_code = pretty_print(strip_white_lines(code))
+                pp_code = self.format_cache.get(
+                    'python-pp' if self.pretty_print else 'python', code,
+                    lambda code: pretty_print(strip_white_lines(code)),
+                    pretty_printer_config()
+                )
             except SyntaxError as exc:
                 pp_code = code
 
             write_source_file(os.path.join(python_path, module_filename),
-                              pp_code)
+                              pp_code, sync=exc is not None)
             if exc:
                 raise exc
 
@@ -2112,6 +2524,10 @@ class CompileCtx(object):
                 for env_action in astnode.env_spec.actions:
                     env_action.rewrite_property_refs(redirected_props)
 
+        # This pass changed both the set of properties and their expressions,
+        # so the expression index is stale.
+        self.invalidate_expr_index()
+
     def generate_actions_for_hierarchy(self, node_var, kind_var,
                                        actions_for_astnode):
         """
@@ -2381,8 +2797,20 @@ class CompileCtx(object):
                         annotations[prop] = Annotation(tr_reason, [prop])
 
                     if not prop.memoized:
+                        check_source_language(
+                            prop.memoization_limit is None,
+                            'Only memoized properties can have a memoization'
+                            ' limit'
+                        )
                         continue
 
+                    check_source_language(
+                        prop.memoization_limit is None
+                        or (isinstance(prop.memoization_limit, (int, long))
+                            and prop.memoization_limit > 0),
+                        'Memoization limit must be a positive integer'
+                    )
+
                     reason = prop.reason_for_no_memoization
                     check_source_language(reason is None, reason)
 
@@ -1,6 +1,7 @@
 from __future__ import absolute_import, division, print_function
 
 import enum
+import linecache
 import os.path
 import sys
 import traceback
@@ -40,6 +41,16 @@ class Diagnostics(object):
     :type: DiagnosticStyle
     """
 
+    fast_location_capture = True
+    """
+    Whether extract_library_location walks stack frames directly instead of
+    building a full traceback with `traceback.extract_stack`. Both yield the
+    same locations, but the former is much cheaper, which matters as this runs
+    for each DSL expression, field and parser.
+
+    :type: bool
+    """
+
     @classmethod
     def set_lang_source_dir(cls, lang_source_dir):
         """
@@ -72,16 +83,41 @@ class Diagnostics(object):
         """
         cls.style = style
 
+    @classmethod
+    def set_fast_location_capture(cls, enabled):
+        """
+        Enable or disable the fast location capture mode.
+        :type enabled: bool
+        """
+        cls.fast_location_capture = enabled
+
 
 class Location(object):
     """
     Holder for a location in the source code.
     """
 
-    def __init__(self, file, line, text):
+    def __init__(self, file, line, text=None):
+        """
+        :param str file: Name of the source file.
+        :param int line: Line number in the source file (1-based).
+        :param str|None text: Text for this source line. If left to None, it
+            is read from the source file the first time it is needed.
+        """
         self.file = file
         self.line = line
-        self.text = text
+        self._text = text
+
+    @property
+    def text(self):
+        """
+        Text for the source line this location designates.
+
+        :rtype: str
+        """
+        if self._text is None:
+            self._text = linecache.getline(self.file, self.line).strip()
+        return self._text
 
     @property
     def as_tuple(self):
@@ -97,21 +133,45 @@ class Location(object):
         return "<Location {} {}>".format(self.file, self.line)
 
 
+def _is_library_file(filename):
+    """
+    Return whether `filename` is a source file for the language specification.
+
+    :type filename: str
+    :rtype: bool
+    """
+    return (Diagnostics.is_under_langkit(filename)
+            and "manage.py" not in filename)
+
+
 def extract_library_location(stack=None):
     """
     Extract the location of the definition of an entity in the language
-    specification from a stack trace. Use `traceback.extract_stack()` if no
-    stack is provided.
+    specification from a stack trace. Use the current call stack if no stack
+    is provided.
 
     This relies on `Diagnostics.set_lang_source_dir` being called.
 
     :rtype: Location
     """
+    if stack is None and Diagnostics.fast_location_capture:
+        # Walk frames from the innermost one and stop at the first one that
+        # belongs to the language specification: this is the last one in the
+        # list that `traceback.extract_stack` would return. Only record the
+        # file name and the line number: the text of the source line is
+        # fetched lazily (see Location.text).
+        frame = sys._getframe()
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if _is_library_file(filename):
+                return Location(filename, frame.f_lineno)
+            frame = frame.f_back
+        return None
+
     stack = stack or traceback.extract_stack()
     l = [Location(t[0], t[1], t[3])
          for t in stack
-         if Diagnostics.is_under_langkit(t[0])
-         and "manage.py" not in t[0]]
+         if _is_library_file(t[0])]
 
     return l[-1] if l else None
 
@@ -163,6 +163,17 @@ base_langkit_docs = {
             ${null}, the default one is used instead. It is up to the caller to
             free resources allocated to it when done with the analysis context.
         % endif
+
+        % if lang == 'ada':
+            If Prelude is not ${null}, it must be a frozen context (see
+            Freeze). The new context then shares the units of Prelude instead
+            of loading them again, and its lexical environments inherit from
+            Prelude's. Parsing a buffer for a unit of Prelude, or reparsing
+            such a unit, raises a Constraint_Error. The new context holds a
+            reference to Prelude until it is destroyed. Contexts that share
+            Prelude can be used from different tasks at the same time: see
+            Freeze.
+        % endif
     """,
     'langkit.context_incref': """
         Increase the reference count to an analysis context.
@@ -178,12 +189,31 @@ base_langkit_docs = {
         Debug helper. Set whether Property_Error exceptions raised in
         Populate_Lexical_Env should be discarded. They are by default.
     """,
+    'langkit.context_dump_memoization_statistics': """
+        Debug helper. Print statistics about the memoization of properties in
+        all the units of this context: for each memoized property, number of
+        cache hits, misses and evictions, and number of entries currently in
+        caches as well as their approximate memory footprint.
+    """,
     'langkit.context_set_logic_resolution_timeout': """
         If Timoout is greater than zero, set a timeout for the resolution of
         logic equations. The unit is the number of steps in ANY/ALL relations.
         If Timeout is zero, disable the timeout. By default, the timeout is
         100,000 steps.
     """,
+    'langkit.context_set_ast_cache_directory': """
+        If Directory is not empty, enable the on-disk AST cache for this
+        context and store cache entries in Directory, which must exist.
+        Otherwise, disable the AST cache. It is disabled by default.
+
+        When the AST cache is enabled, the tokens and the AST of units that
+        are parsed from files without diagnostics are saved to the cache. When
+        getting or reparsing a unit from a file, if the cache has an entry for
+        the same file contents, charset, grammar rule and trivia setting,
+        created with the same version of the language specification, the unit
+        is restored from this entry instead of being parsed. Several processes
+        can share the same cache directory.
+    """,
     'langkit.destroy_context': """
         Invoke Remove on all the units Context contains and free Context. Thus,
         any analysis unit it contains may survive if there are still references
@@ -264,6 +294,17 @@ base_langkit_docs = {
         If any other failure occurs, such as file opening, decoding, lexing or
         parsing failure, return an analysis unit anyway: errors are described
         as diagnostics of the returned analysis unit.
+
+        The context caches the answers of its unit provider, including invalid
+        unit names: unless Reparse is true, requesting the same Name/Kind again
+        does not query the unit provider. Invalidate the unit provider cache
+        when the unit provider may now resolve names differently.
+    """,
+    'langkit.invalidate_unit_provider_cache': """
+        Forget the answers of the context's unit provider, so that subsequent
+        requests for units by name query the unit provider again. Call this
+        whenever the unit provider may now resolve unit names differently, for
+        instance after source files were created or deleted.
     """,
     'langkit.remove_unit': """
         Remove the corresponding analysis unit from this context. If someone
@@ -309,6 +350,20 @@ base_langkit_docs = {
     'langkit.unit_root': """
         Return the root AST node for this unit, or ${null} if there is none.
     """,
+    'langkit.unit_nodes_of_kind': """
+        % if lang == 'python':
+            Return the array of nodes in this unit that are instances of the
+            AST_TYPE node class, in document order.
+        % else:
+            Return the array of nodes in this unit whose kind is in the given
+            range of node kinds, in document order.
+        % endif
+
+        The first call builds an index of the nodes in this unit by kind
+        (discarded when the unit is reparsed), so that lookups cost a time
+        proportional to the number of nodes returned instead of the size of
+        the tree.
+    """,
     'langkit.node_unit': """
         Return the unit that owns an AST node.
     """,
@@ -624,6 +679,36 @@ base_langkit_docs = {
             Return 1 if successful.
         % endif
     """,
+    'langkit.token_range_fill': """
+        Store the tokens and trivia that span between the First and Last tokens
+        (both included) in
+        % if lang == 'c':
+            TOKENS, an array of SIZE elements,
+        % else:
+            Result,
+        % endif
+        in source order. This stores nothing if Last actually appears before
+        First, and stops when the
+        % if lang == 'c':
+            array
+        % else:
+            buffer
+        % endif
+        is full: fetch the remaining tokens starting from the one that follows
+        the last stored token.
+        % if lang == 'ada':
+            Set Count to the number of stored tokens.
+        % elif lang == 'c':
+            Return the number of stored tokens.
+        % endif
+
+        % if lang == 'ada':
+            This raises a Constraint_Error
+        % elif lang == 'c':
+            This returns -1
+        % endif
+        if First and Last don't belong to the same analysis unit.
+    """,
     'langkit.token_is_trivia': """
         Return whether this token is a trivia. If it's not, it's a regular
         token.
@@ -873,8 +873,11 @@ class ResolvedExpression(object):
 
     expr_count = iter(count(1))
     """
-    Generator of unique identifiers for expressions in GDB helpers. See
-    render_pre.
+    Generator of identifiers for expressions in GDB helpers. See render_pre.
+
+    PropertyDef.render_property resets it for each property, so that
+    identifiers do not depend on the order in which properties are rendered,
+    nor on the process that renders them.
     """
 
     def __init__(self, result_var_name=None, skippable_refcount=False,
@@ -988,7 +991,10 @@ class ResolvedExpression(object):
                 PropertyDef.get().has_debug_info and
                 self.abstract_expr and
                 self.result_var):
-            unique_id = str(next(self.expr_count))
+            # Prefix the identifier with the property name to make it unique
+            # in the whole library.
+            unique_id = '{}#{}'.format(PropertyDef.get().debug_name,
+                                       next(self.expr_count))
 
             loc = self.abstract_expr.location
             loc_str = '{}:{}'.format(loc.file, loc.line) if loc else 'None'
@@ -1182,32 +1188,80 @@ class ResolvedExpression(object):
         """
         return []
 
-    def flat_subexprs(
-        self, filter=lambda expr: isinstance(expr, ResolvedExpression)
-    ):
+    def flat_subexprs(self, filter=None):
         """
         Wrapper around "subexprs" to return a flat list of items matching
         "filter". By default, get all ResolvedExpressions.
 
+        As resolved expressions are not supposed to change once built, the
+        default list is computed only once and then cached: callers must not
+        modify it. This cache is never invalidated: it is first filled by the
+        compilation passes that run after properties are constructed, so code
+        that changes the operands of a resolved expression after that point
+        must delete the "_flat_subexprs_cache" attribute.
+
         :param filter: Predicate to test whether a subexpression should be
-            returned.
-        :type filter: (T) -> bool
+            returned. If left to None, return ResolvedExpression instances.
+        :type filter: None|(T) -> bool
 
         :rtype: list[ResolvedExpression]
         """
-        def explore(values):
+        if filter is not None:
+            return self._explore_subexprs(filter)
+
+        result = getattr(self, '_flat_subexprs_cache', None)
+        if result is None:
+            result = self._explore_subexprs(
+                lambda expr: isinstance(expr, ResolvedExpression)
+            )
+            self._flat_subexprs_cache = result
+        return result
+
+    def _explore_subexprs(self, filter):
+        """
+        Implementation helper for "flat_subexprs". Go through the "subexprs"
+        datastructure (without recursion) and return the list of its leaves
+        that match "filter".
+
+        :type filter: (T) -> bool
+        :rtype: list[T]
+        """
+        result = []
+
+        # Go through values in order: as the last item in the stack is the next
+        # one to process, push items in reverse order.
+        stack = [self.subexprs]
+        while stack:
+            values = stack.pop()
             if values is None:
-                return []
+                pass
             elif isinstance(values, (list, tuple)):
-                return funcy.mapcat(explore, values)
+                stack.extend(reversed(values))
             elif isinstance(values, dict):
-                return funcy.mapcat(explore, values.values())
+                stack.extend(reversed(values.values()))
             elif filter(values):
-                return [values]
-            else:
-                return []
+                result.append(values)
+        return result
 
-        return explore(self.subexprs)
+    def walk(self, children=None):
+        """
+        Return an iterator on "self" and on all its subexpressions,
+        transitively, in pre-order. This uses an explicit stack, so it can
+        process deeply nested expressions without recursion.
+
+        :param children: Function that returns the subexpressions to visit
+            for a given expression. If left to None, visit all of them.
+        :type children: None|(ResolvedExpression) -> list[ResolvedExpression]
+
+        :rtype: collections.Iterable[ResolvedExpression]
+        """
+        stack = [self]
+        while stack:
+            expr = stack.pop()
+            yield expr
+            stack.extend(reversed(expr.flat_subexprs()
+                                  if children is None else
+                                  children(expr)))
 
     @property
     def bindings(self):
@@ -1218,10 +1272,9 @@ class ResolvedExpression(object):
 
         :rtype: list[VariableExpr]
         """
-        # Do a copy to avoid mutating the expression own's data structures
-        result = list(self._bindings())
-        for expr in self.flat_subexprs():
-            result.extend(expr.bindings)
+        result = []
+        for expr in self.walk():
+            result.extend(expr._bindings())
         return result
 
     def _bindings(self):
@@ -2672,8 +2725,8 @@ class PropertyDef(AbstractNodeData):
     def __init__(self, expr, prefix, name=None, doc=None, public=None,
                  abstract=False, type=None, abstract_runtime_check=False,
                  dynamic_vars=None, memoized=False, unsafe_memoization=False,
-                 memoize_in_populate=False, external=False,
-                 uses_entity_info=None, uses_envs=None,
+                 memoize_in_populate=False, memoization_limit=None,
+                 external=False, uses_entity_info=None, uses_envs=None,
                  optional_entity_info=False, warn_on_unused=True,
                  ignore_warn_on_node=None):
         """
@@ -2735,6 +2788,12 @@ class PropertyDef(AbstractNodeData):
             the populate lexical environment pass. It is disabled by default as
             the hash of lexical environments changes during this pass.
 
+        :param int|None memoization_limit: If not None, maximum number of
+            results to keep in the memoization cache of each analysis unit for
+            this property. When this limit is reached, the least recently used
+            results are evicted. This is useful to bound memory usage for
+            long-lived analysis contexts.
+
         :param bool external: Whether this property's implementation is
             provided by the language specification. If true, `expr` must be
             None and the implementation must be provided in the
@@ -2862,6 +2921,7 @@ class PropertyDef(AbstractNodeData):
         self.memoized = memoized
         self.unsafe_memoization = unsafe_memoization
         self.memoize_in_populate = memoize_in_populate
+        self.memoization_limit = memoization_limit
 
         self.external = external
 
@@ -3595,23 +3655,37 @@ class PropertyDef(AbstractNodeData):
         """
         Render the given property to generated code.
 
+        This does not modify the property, so that it can run in a worker
+        process: use set_rendering to commit the result.
+
         :type context: langkit.compile_context.CompileCtx
-        :rtype: basestring
+        :return: Code for the property declaration, its definition and the
+            declaration and definition of its untyped wrapper.
+        :rtype: (str, str, str, str)
         """
+        ResolvedExpression.expr_count = iter(count(1))
         with self.bind(), Self.bind_type(self.struct):
             with names.camel_with_underscores:
-                self.prop_decl = render('properties/decl_ada')
-                self.prop_def = render('properties/def_ada')
+                prop_decl = render('properties/decl_ada')
+                prop_def = render('properties/def_ada')
 
                 if self.requires_untyped_wrapper:
-                    self.untyped_wrapper_decl = render(
-                        'properties/untyped_wrapper_decl_ada'
-                    )
-                    self.untyped_wrapper_def = render(
-                        'properties/untyped_wrapper_def_ada'
+                    return (
+                        prop_decl, prop_def,
+                        render('properties/untyped_wrapper_decl_ada'),
+                        render('properties/untyped_wrapper_def_ada'),
                     )
                 else:
-                    self.untyped_wrapper_decl = self.untyped_wrapper_def = ''
+                    return (prop_decl, prop_def, '', '')
+
+    def set_rendering(self, rendering):
+        """
+        Commit the generated code for this property.
+
+        :param (str, str, str, str) rendering: Result of render_property.
+        """
+        (self.prop_decl, self.prop_def,
+         self.untyped_wrapper_decl, self.untyped_wrapper_def) = rendering
 
     @property
     def doc(self):
@@ -3751,19 +3825,15 @@ class PropertyDef(AbstractNodeData):
                            for arg in self.natural_arguments])
         }
 
-        def mark_vars(expr):
-            if isinstance(expr, BindingScope):
-                # BindingScope has bindings themselves as operands, but they
-                # must not be considered as uses for this analysis: skip them.
-                expr = expr.expr
+        def children(expr):
+            # BindingScope has bindings themselves as operands, but they must
+            # not be considered as uses for this analysis: skip them.
+            return ([expr.expr] if isinstance(expr, BindingScope) else
+                    expr.flat_subexprs())
 
+        for expr in self.constructed_expr.walk(children):
             if isinstance(expr, VariableExpr):
                 all_vars[expr] = True
-
-            for sub in expr.flat_subexprs():
-                mark_vars(sub)
-
-        mark_vars(self.constructed_expr)
         unused_vars = [var for var, is_used in all_vars.items()
                        if not is_used and not var.ignored]
         wrongly_used_vars = [var for var, is_used in all_vars.items()
@@ -3829,8 +3899,8 @@ def AbstractProperty(type, doc="", runtime_check=False, **kwargs):
 
 # noinspection PyPep8Naming
 def Property(expr, doc=None, public=None, type=None, dynamic_vars=None,
-             memoized=False, warn_on_unused=True, uses_entity_info=None,
-             ignore_warn_on_node=None):
+             memoized=False, memoization_limit=None, warn_on_unused=True,
+             uses_entity_info=None, ignore_warn_on_node=None):
     """
     Public constructor for concrete properties. You can declare your properties
     on your AST node subclasses directly, like this::
@@ -3849,7 +3919,8 @@ def Property(expr, doc=None, public=None, type=None, dynamic_vars=None,
     """
     return PropertyDef(expr, AbstractNodeData.PREFIX_PROPERTY, doc=doc,
                        public=public, type=type, dynamic_vars=dynamic_vars,
-                       memoized=memoized, warn_on_unused=warn_on_unused,
+                       memoized=memoized, memoization_limit=memoization_limit,
+                       warn_on_unused=warn_on_unused,
                        ignore_warn_on_node=ignore_warn_on_node,
                        uses_entity_info=uses_entity_info)
 
@@ -3863,7 +3934,8 @@ class AbstractKind(Enum):
 def langkit_property(public=None, return_type=None, kind=AbstractKind.concrete,
                      dynamic_vars=None, memoized=False,
                      unsafe_memoization=False, memoize_in_populate=False,
-                     external=False, uses_entity_info=None, uses_envs=None,
+                     memoization_limit=None, external=False,
+                     uses_entity_info=None, uses_envs=None,
                      warn_on_unused=True, ignore_warn_on_node=None):
     """
     Decorator to create properties from real Python methods. See Property for
@@ -3886,6 +3958,7 @@ def langkit_property(public=None, return_type=None, kind=AbstractKind.concrete,
             memoized=memoized,
             unsafe_memoization=unsafe_memoization,
             memoize_in_populate=memoize_in_populate,
+            memoization_limit=memoization_limit,
             external=external,
             uses_entity_info=uses_entity_info,
             uses_envs=uses_envs,
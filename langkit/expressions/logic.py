@@ -378,6 +378,9 @@ class Predicate(AbstractExpression):
                 Predicate(FooNode.fields.test_property, Self.a, Self.b, 12)
             )
 
+    If `predicate` is memoized and works on a single logical variable, its
+    results are also cached during each logic resolution, so that
+    backtracking never calls it twice for the same logical variable value.
     """
 
     class Expr(CallExpr):
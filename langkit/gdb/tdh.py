@@ -24,6 +24,26 @@ class TDH(object):
         tokens_array = self.value['tokens']['e'].dereference()
         return Token(self, tokens_array[token_no])
 
+    def line_number(self, index):
+        """
+        Return the number of the line that contains the character at "index"
+        in the source buffer.
+
+        :rtype: int
+        """
+        starts_array = self.value['line_starts']['e'].dereference()
+
+        # Look for the last line that starts at or before "index"
+        first = 1
+        last = int(self.value['line_starts']['size'])
+        while first < last:
+            middle = (first + last + 1) // 2
+            if int(starts_array[middle]) <= index:
+                first = middle
+            else:
+                last = middle - 1
+        return first
+
 
 class Token(object):
     """
@@ -40,7 +60,13 @@ class Token(object):
 
     @property
     def sloc_range(self):
-        return SlocRange(self.value['sloc_range'])
+        # Tokens only store columns: line numbers come from the TDH
+        return SlocRange(
+            self.tdh.line_number(int(self.value['source_first'])),
+            self.tdh.line_number(int(self.value['source_last']) + 1),
+            int(self.value['start_column']),
+            int(self.value['end_column'])
+        )
 
 
 class Sloc(object):
@@ -53,11 +79,9 @@ class Sloc(object):
 
 
 class SlocRange(object):
-    def __init__(self, value):
-        self.start = Sloc(int(value['start_line']),
-                          int(value['start_column']))
-        self.end = Sloc(int(value['end_line']),
-                        int(value['end_column']))
+    def __init__(self, start_line, end_line, start_column, end_column):
+        self.start = Sloc(start_line, start_column)
+        self.end = Sloc(end_line, end_column)
 
     def __repr__(self):
         return '{}-{}'.format(self.start, self.end)
@@ -357,6 +357,23 @@ class ManageScript(object):
             help='Do not generate the HTML documentation for AST nodes, their'
                  ' fields and their properties.'
         )
+        subparser.add_argument(
+            '--profile-passes', dest='profile_passes',
+            action='store_true',
+            help='Collect time and memory usage statistics for compilation'
+                 ' passes and code emission steps. Print a summary and write'
+                 ' a detailed JSON report in $BUILD/pass_profile.json.'
+        )
+        subparser.add_argument(
+            '--generate-jobs', type=int, default=1,
+            help='Number of processes to use for parallel-safe compilation'
+                 ' passes, such as properties rendering (default: 1).'
+        )
+        subparser.add_argument(
+            '--write-jobs', type=int, default=1,
+            help='Number of threads to use to write generated source files'
+                 ' (default: 1).'
+        )
 
     def add_build_args(self, subparser):
         """
@@ -616,7 +633,10 @@ class ManageScript(object):
                           generate_pp=args.pp,
                           properties_logging=args.enabled_properties_logging,
                           separate_properties=args.separate_properties,
-                          generate_astdoc=not args.no_astdoc)
+                          generate_astdoc=not args.no_astdoc,
+                          profile_passes=args.profile_passes,
+                          jobs=args.generate_jobs,
+                          write_jobs=args.write_jobs)
 
         if args.check_only:
             return
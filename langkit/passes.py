@@ -4,10 +4,345 @@ Helpers to manage compilation passes.
 
 from __future__ import absolute_import, division, print_function
 
+from contextlib import contextmanager
+import json
+import os
+from StringIO import StringIO
+import sys
+import time
+
 from langkit.compiled_types import CompiledTypeMetaclass
-from langkit.diagnostics import errors_checkpoint
+from langkit.diagnostics import (DiagnosticError, Diagnostics,
+                                 errors_checkpoint)
 from langkit.utils import Colors, printcol
 
+try:
+    import resource
+except ImportError:  # no-code-coverage
+    resource = None
+
+# The "multiprocessing" module is not available on all platforms: see
+# langkit.libmanage.get_cpu_count.
+try:
+    import multiprocessing
+except ImportError:  # no-code-coverage
+    multiprocessing = None
+
+
+def _cpu_time():
+    """
+    Return the CPU time (user and system) consumed so far by this process, in
+    seconds.
+
+    :rtype: float
+    """
+    times = os.times()
+    return times[0] + times[1]
+
+
+def _peak_rss():
+    """
+    Return the peak resident set size of this process so far, in KiB, or None
+    if this information is not available on this platform.
+
+    :rtype: int|None
+    """
+    if resource is None:  # no-code-coverage
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on Darwin and in KiB on other platforms
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+class PassProfiler(object):
+    """
+    Collect statistics about the execution of compilation passes and code
+    emission steps: wall time, CPU time and memory usage for each pass and, for
+    passes that run on individual items (properties, AST nodes, grammar rules),
+    wall time for each item.
+
+    Memory usage is only available as the process-wide peak resident set size
+    (RSS). For each pass, we report how much this peak increased while the pass
+    was running: this is the memory the pass allocated beyond what the process
+    already used at its peak, so passes that run after a memory hungry one may
+    show no increase even though they allocate memory.
+    """
+
+    def __init__(self):
+        self.passes = []
+        """
+        Statistics for all the passes that ran so far, in execution order.
+        Each item is a JSON-like dict.
+
+        :type: list[dict]
+        """
+
+        self._current_items = None
+        """
+        If a pass is running, list of (label, wall time) for the items it
+        processed so far.
+
+        :type: list[(str, float)]|None
+        """
+
+    @contextmanager
+    def profile_pass(self, name):
+        """
+        Context manager to collect statistics about the pass called `name`.
+
+        :param str name: Name of the pass to profile.
+        """
+        items = []
+        self._current_items = items
+        start_wall = time.time()
+        start_cpu = _cpu_time()
+        start_rss = _peak_rss()
+        try:
+            yield
+        finally:
+            self._current_items = None
+            peak_rss = _peak_rss()
+            self.passes.append({
+                'name': name,
+                'wall_time': time.time() - start_wall,
+                'cpu_time': _cpu_time() - start_cpu,
+                'process_peak_rss_kb': peak_rss,
+                'peak_rss_increase_kb': (None if peak_rss is None else
+                                         peak_rss - start_rss),
+                'items': [{'name': label, 'wall_time': wall_time}
+                          for label, wall_time in sorted(
+                              items, key=lambda i: i[1], reverse=True
+                          )],
+            })
+
+    @contextmanager
+    def profile_item(self, label):
+        """
+        Context manager to measure the time spent on one item of the current
+        pass.
+
+        :param str label: Name for the item (property, AST node, ...).
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.record_item(label, time.time() - start)
+
+    def record_item(self, label, wall_time):
+        """
+        Record that one item of the current pass took `wall_time` seconds.
+        This is useful when the item was processed in another process.
+
+        :param str label: Name for the item (property, AST node, ...).
+        :param float wall_time: Time spent on this item, in seconds.
+        """
+        if self._current_items is not None:
+            self._current_items.append((label, wall_time))
+
+    def write_json(self, filename):
+        """
+        Write all collected statistics in the `filename` JSON file.
+
+        :param str filename: Name of the file to write.
+        """
+        with open(filename, 'w') as f:
+            json.dump({'process_peak_rss_kb': _peak_rss(),
+                       'passes': self.passes}, f, indent=2)
+
+    def print_summary(self, max_passes=20, max_items=5):
+        """
+        Print a summary of the collected statistics on the standard output:
+        the most time consuming passes and for each of them, the most time
+        consuming items.
+
+        :param int max_passes: Maximum number of passes to display.
+        :param int max_items: Maximum number of items to display per pass.
+        """
+        def format_rss(rss_kb):
+            return 'n/a' if rss_kb is None else '{:.1f}M'.format(rss_kb / 1024)
+
+        total_wall = sum(p['wall_time'] for p in self.passes)
+        total_cpu = sum(p['cpu_time'] for p in self.passes)
+        peak_rss = _peak_rss()
+        printcol('Pass profile: {:.3f}s wall time, {:.3f}s CPU time, {}'
+                 ' process peak RSS'.format(total_wall, total_cpu,
+                                            format_rss(peak_rss)),
+                 Colors.OKBLUE)
+        print('  {:>9}  {:>9}  {:>10}  {}'.format('Wall', 'CPU', 'RSS incr.',
+                                                  'Pass'))
+
+        passes = sorted(self.passes, key=lambda p: p['wall_time'],
+                        reverse=True)
+        for p in passes[:max_passes]:
+            print('  {:>8.3f}s  {:>8.3f}s  {:>10}  {}'.format(
+                p['wall_time'], p['cpu_time'],
+                format_rss(p['peak_rss_increase_kb']), p['name']
+            ))
+            for item in p['items'][:max_items]:
+                print('  {:>8.3f}s  {:>9}  {:>10}    {}'.format(
+                    item['wall_time'], '', '', item['name']
+                ))
+
+
+class _NoProfiling(object):
+    """
+    Null context manager, to use when profiling is disabled.
+    """
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_no_profiling = _NoProfiling()
+
+
+def profile_pass(context, name):
+    """
+    Return a context manager to profile the `name` pass, if pass profiling is
+    enabled. This is useful for steps that do not run through the
+    PassManager, such as code emission.
+
+    :type context: langkit.compile_context.CompileCtx
+    :param str name: Name of the pass to profile.
+    """
+    profiler = context.pass_profiler
+    return profiler.profile_pass(name) if profiler else _no_profiling
+
+
+def profile_item(context, get_label):
+    """
+    Return a context manager to profile an item in the current pass, if pass
+    profiling is enabled.
+
+    :type context: langkit.compile_context.CompileCtx
+    :param () -> str get_label: Function that returns the name of the item.
+        Called only if profiling is enabled.
+    """
+    profiler = context.pass_profiler
+    return (profiler.profile_item(get_label())
+            if profiler else _no_profiling)
+
+
+MIN_PARALLEL_ITEMS = 32
+"""
+Minimum number of items for which it is worth running a parallel-safe pass
+in a pool of processes.
+"""
+
+_ITEM_OK, _ITEM_DIAGNOSTIC_ERROR, _ITEM_CRASHED = range(3)
+"""
+Possible outcomes for an item processed in a worker process.
+"""
+
+_parallel_job = None
+"""
+When running a parallel-safe pass, (context, items, item_fn) tuple for it.
+Worker processes are forked after this is set, so they inherit it (as well as
+the whole compilation state) and thus only item indexes and results need to
+go through pipes.
+
+:type: (langkit.compile_context.CompileCtx, list, (T, CompileCtx) -> U)|None
+"""
+
+
+def _run_parallel_item(index):
+    """
+    In a worker process, run the current parallel-safe pass on its index'th
+    item.
+
+    Return a (outcome, output, result, pending_error, wall_time) tuple, where
+    `output` contains everything the pass printed (i.e. diagnostics) for this
+    item and `pending_error` tells whether it emitted non-blocking errors.
+
+    :param int index: Index of the item to process.
+    :rtype: (int, str, U, bool, float)
+    """
+    context, items, item_fn = _parallel_job
+
+    saved_stdout = sys.stdout
+    sys.stdout = output = StringIO()
+    Diagnostics.has_pending_error = False
+    start = time.time()
+    outcome = _ITEM_OK
+    result = None
+    try:
+        result = item_fn(items[index], context)
+    except DiagnosticError:
+        outcome = _ITEM_DIAGNOSTIC_ERROR
+    except Exception:
+        outcome = _ITEM_CRASHED
+    finally:
+        sys.stdout = saved_stdout
+
+    return (outcome, output.getvalue(), result, Diagnostics.has_pending_error,
+            time.time() - start)
+
+
+def run_parallel_safe(context, items, item_fn, merge_fn, get_label):
+    """
+    Run item_fn on all items and then merge_fn on all items and their results.
+
+    When context.jobs allows it, item_fn calls are dispatched to a pool of
+    worker processes. In this case, item_fn must not have side effects other
+    than emitting diagnostics and must return a picklable result, which
+    merge_fn commits in this process. In all cases, merge_fn is called and
+    diagnostics are emitted in item order, so the outcome does not depend on
+    the number of jobs.
+
+    :type context: langkit.compile_context.CompileCtx
+    :param list[T] items: Items to process.
+    :param (T, langkit.compile_context.CompileCtx) -> U item_fn: Function to
+        process one item.
+    :param (T, U) -> None merge_fn: Function to commit the result of item_fn
+        for one item.
+    :param (T) -> str get_label: Function to get a name for an item, for
+        profiling purposes.
+    """
+    global _parallel_job
+
+    jobs = min(context.jobs, len(items))
+    if (jobs <= 1 or len(items) < MIN_PARALLEL_ITEMS
+            or multiprocessing is None or sys.platform == 'win32'):
+        for item in items:
+            with profile_item(context, lambda: get_label(item)):
+                merge_fn(item, item_fn(item, context))
+        return
+
+    # Worker processes will write to the same standard output: make sure
+    # nothing is left in our buffer for them to duplicate.
+    sys.stdout.flush()
+
+    _parallel_job = (context, items, item_fn)
+    pool = multiprocessing.Pool(jobs)
+    try:
+        results = pool.map(_run_parallel_item, range(len(items)),
+                           chunksize=max(1, len(items) // (jobs * 4)))
+    finally:
+        pool.terminate()
+        pool.join()
+        _parallel_job = None
+
+    for item, (outcome, output, result, pending_error, wall_time) in zip(
+        items, results
+    ):
+        sys.stdout.write(output)
+        if pending_error:
+            Diagnostics.has_pending_error = True
+        if context.pass_profiler:
+            context.pass_profiler.record_item(get_label(item), wall_time)
+
+        if outcome == _ITEM_DIAGNOSTIC_ERROR:
+            raise DiagnosticError()
+        elif outcome == _ITEM_CRASHED:
+            # Process this item again in this process, so that the exception
+            # propagates with its original traceback.
+            result = item_fn(item, context)
+        merge_fn(item, result)
+
 
 class PassManager(object):
     """
@@ -51,7 +386,12 @@ class PassManager(object):
                 if (not isinstance(p, MajorStepPass)
                         and context.verbosity.debug):  # no-code-coverage
                     printcol('Running pass: {}'.format(p.name), Colors.YELLOW)
-                p.run(context)
+                if (context.pass_profiler
+                        and not isinstance(p, MajorStepPass)):
+                    with context.pass_profiler.profile_pass(p.name):
+                        p.run(context)
+                else:
+                    p.run(context)
 
 
 class AbstractPass(object):
@@ -149,7 +489,8 @@ class GrammarRulePass(AbstractPass):
 
     def run(self, context):
         for name, rule in context.grammar.rules.items():
-            with rule.diagnostic_context:
+            with rule.diagnostic_context, \
+                    profile_item(context, lambda: name):
                 self.pass_fn(rule)
 
 
@@ -179,11 +520,12 @@ class ASTNodePass(AbstractPass):
 
     def run(self, context):
         for astnode in context.astnode_types:
-            if self.auto_context:
-                with astnode.diagnostic_context:
+            with profile_item(context, lambda: astnode.dsl_name):
+                if self.auto_context:
+                    with astnode.diagnostic_context:
+                        self.pass_fn(context, astnode)
+                else:
                     self.pass_fn(context, astnode)
-            else:
-                self.pass_fn(context, astnode)
 
 
 class EnvSpecPass(AbstractPass):
@@ -227,7 +569,7 @@ class PropertyPass(AbstractPass):
     Concrete pass to run on each PropertyDef instance.
     """
 
-    def __init__(self, name, pass_fn, disabled=False):
+    def __init__(self, name, pass_fn, disabled=False, merge_fn=None):
         """
         :param str name: See AbstractPass.
 
@@ -238,16 +580,39 @@ class PropertyPass(AbstractPass):
                langkit.compile_context.CompileCtx) -> None
 
         :param bool disabled: See AbstractPass.
+
+        :param merge_fn: If provided, the pass is parallel-safe: pass_fn must
+            return a picklable result instead of modifying the compilation
+            state, and merge_fn is called with the PropertyDef instance and
+            this result to commit it. See run_parallel_safe.
+        :type (langkit.expressions.base.PropertyDef, T) -> None
         """
         super(PropertyPass, self).__init__(name, disabled)
         self.pass_fn = pass_fn
+        self.merge_fn = merge_fn
 
     def run(self, context):
+        if self.merge_fn:
+            run_parallel_safe(
+                context,
+                [prop
+                 for astnode in context.astnode_types
+                 for prop in astnode.get_properties(include_inherited=False)],
+                self._run_in_context, self.merge_fn,
+                lambda prop: prop.qualname
+            )
+            return
+
         for astnode in context.astnode_types:
             for prop in astnode.get_properties(include_inherited=False):
-                with prop.diagnostic_context:
+                with prop.diagnostic_context, \
+                        profile_item(context, lambda: prop.qualname):
                     self.pass_fn(prop, context)
 
+    def _run_in_context(self, prop, context):
+        with prop.diagnostic_context:
+            return self.pass_fn(prop, context)
+
 
 class StopPipeline(AbstractPass):
     """
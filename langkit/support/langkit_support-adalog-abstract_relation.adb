@@ -2,9 +2,37 @@ with Ada.Text_IO; use Ada.Text_IO;
 with Ada.Unchecked_Deallocation;
 
 with Langkit_Support.Adalog.Debug; use Langkit_Support.Adalog.Debug;
+with Langkit_Support.Adalog.Solver_Statistics;
 
 package body Langkit_Support.Adalog.Abstract_Relation is
 
+   package Stats renames Langkit_Support.Adalog.Solver_Statistics;
+
+   protected Solve_Id_Generator is
+      procedure Next (Id : out Solve_Id_Type);
+      --  Return a new solve identifier
+   private
+      Last_Id : Solve_Id_Type := No_Solve_Id;
+   end Solve_Id_Generator;
+
+   ------------------------
+   -- Solve_Id_Generator --
+   ------------------------
+
+   protected body Solve_Id_Generator is
+
+      ----------
+      -- Next --
+      ----------
+
+      procedure Next (Id : out Solve_Id_Type) is
+      begin
+         Last_Id := Last_Id + 1;
+         Id := Last_Id;
+      end Next;
+
+   end Solve_Id_Generator;
+
    -----------
    -- Solve --
    -----------
@@ -37,7 +65,27 @@ package body Langkit_Support.Adalog.Abstract_Relation is
       end if;
       Wait;
 
-      return Res : constant Solving_State := Self.Solve_Impl (Context) do
+      if Stats.Enabled then
+         Stats.Enter_Relation (Self'Unrestricted_Access);
+      end if;
+
+      return Res : Solving_State do
+         begin
+            Res := Self.Solve_Impl (Context);
+         exception
+            when others =>
+               --  Keep the stack of relations being evaluated balanced
+
+               if Stats.Enabled then
+                  Stats.Abandon_Relation (Self'Unrestricted_Access);
+               end if;
+               raise;
+         end;
+
+         if Stats.Enabled then
+            Stats.Leave_Relation (Self'Unrestricted_Access, Res);
+         end if;
+
          if Debug_State = Step_At_First_Unsat and then Res = Unsatisfied then
             Set_Debug_State (Step);
          end if;
@@ -148,8 +196,15 @@ package body Langkit_Support.Adalog.Abstract_Relation is
    function Solve (Self : Relation; Timeout : Natural := 0) return Boolean is
       Context : Solving_Context :=
         (Root_Relation => Self,
-         Timeout       => Timeout);
+         Timeout       => Timeout,
+         Solve_Id      => No_Solve_Id);
    begin
+      Solve_Id_Generator.Next (Context.Solve_Id);
+
+      if Stats.Enabled then
+         Stats.Start_Solve;
+      end if;
+
       declare
          Ret : constant Solving_State := Self.all.Solve (Context);
       begin
@@ -159,12 +214,31 @@ package body Langkit_Support.Adalog.Abstract_Relation is
                raise Early_Binding_Error;
 
             when Satisfied =>
+               if Stats.Enabled then
+                  Stats.Finish_Solve (Stats.Satisfied);
+               end if;
                return True;
 
             when Unsatisfied =>
+               if Stats.Enabled then
+                  Stats.Finish_Solve (Stats.Unsatisfied);
+               end if;
                return False;
          end case;
       end;
+
+   exception
+      when Timeout_Error =>
+         if Stats.Enabled then
+            Stats.Finish_Solve (Stats.Timeout);
+         end if;
+         raise;
+
+      when others =>
+         if Stats.Enabled then
+            Stats.Finish_Solve (Stats.Error);
+         end if;
+         raise;
    end Solve;
 
    ----------
@@ -173,6 +247,10 @@ package body Langkit_Support.Adalog.Abstract_Relation is
 
    procedure Tick (Context : in out Solving_Context) is
    begin
+      if Stats.Enabled then
+         Stats.Record_Tick;
+      end if;
+
       if Context.Timeout = 0 then
          return;
       end if;
@@ -3,6 +3,7 @@ with Langkit_Support.Array_Utils;
 with Langkit_Support.Adalog.Debug; use Langkit_Support.Adalog.Debug;
 with Langkit_Support.Adalog.Pure_Relations;
 use Langkit_Support.Adalog.Pure_Relations;
+with Langkit_Support.Adalog.Solver_Statistics;
 
 package body Langkit_Support.Adalog.Operations is
 
@@ -22,6 +23,22 @@ package body Langkit_Support.Adalog.Operations is
    --  Tag the Index'th element in the working queue as completed: it will not
    --  be evaluated anymore.
 
+   Domain_Propagation : Boolean := False;
+   --  See Set_Domain_Propagation
+
+   function Propagate_Domains
+     (Self    : in out All_Rel;
+      Context : Solving_Context) return Boolean
+     with Pre => Self.Next = 1;
+   --  Restrict the domains of Self's sub-relations using the constraints from
+   --  other sub-relations, then move sub-relations whose domain has only one
+   --  value to the front of the working queue. Return False if one domain is
+   --  left empty (i.e. Self cannot be satisfied), True otherwise.
+
+   procedure Restore_Domains (Self : in out All_Rel);
+   --  If Self's sub-relations domains were restricted, restore them, as well
+   --  as the working queue order that Propagate_Domains changed.
+
    -----------
    -- Reset --
    -----------
@@ -45,6 +62,98 @@ package body Langkit_Support.Adalog.Operations is
       end loop;
    end Cleanup;
 
+   -----------
+   -- Reset --
+   -----------
+
+   overriding procedure Reset (Self : in out All_Rel) is
+   begin
+      Restore_Domains (Self);
+      Reset (Base_Aggregate_Rel (Self));
+   end Reset;
+
+   -------------
+   -- Cleanup --
+   -------------
+
+   overriding procedure Cleanup (Self : in out All_Rel) is
+   begin
+      Restore_Domains (Self);
+      Cleanup (Base_Aggregate_Rel (Self));
+   end Cleanup;
+
+   ----------------------------
+   -- Set_Domain_Propagation --
+   ----------------------------
+
+   procedure Set_Domain_Propagation (Enabled : Boolean) is
+   begin
+      Domain_Propagation := Enabled;
+   end Set_Domain_Propagation;
+
+   -----------------------
+   -- Propagate_Domains --
+   -----------------------
+
+   function Propagate_Domains
+     (Self    : in out All_Rel;
+      Context : Solving_Context) return Boolean
+   is
+      Singletons : Natural := 0;
+      --  Number of sub-relations with a single value domain that were moved
+      --  to the front of the working queue.
+   begin
+      Self.Propagated := True;
+      Self.Saved_Queue := Self.Working_Queue;
+
+      for R of Self.Sub_Rels loop
+         if R.Domain_Size /= Natural'Last then
+            for C of Self.Sub_Rels loop
+               if C /= R then
+                  R.Restrict_Domain (C.all, Context);
+               end if;
+            end loop;
+         end if;
+      end loop;
+
+      for I in Self.Working_Queue'Range loop
+         case Get_From_Queue (Self, I).Domain_Size is
+            when 0 =>
+               return False;
+
+            when 1 =>
+               declare
+                  Saved : constant Positive := Self.Working_Queue (I);
+               begin
+                  Self.Working_Queue (Singletons + 2 .. I) :=
+                     Self.Working_Queue (Singletons + 1 .. I - 1);
+                  Self.Working_Queue (Singletons + 1) := Saved;
+                  Singletons := Singletons + 1;
+               end;
+
+            when others =>
+               null;
+         end case;
+      end loop;
+
+      return True;
+   end Propagate_Domains;
+
+   ---------------------
+   -- Restore_Domains --
+   ---------------------
+
+   procedure Restore_Domains (Self : in out All_Rel) is
+   begin
+      if Self.Propagated then
+         for R of Self.Sub_Rels loop
+            R.Restore_Domain;
+         end loop;
+         Self.Working_Queue := Self.Saved_Queue;
+         Self.Propagated := False;
+      end if;
+   end Restore_Domains;
+
    ------------------
    -- Custom_Image --
    ------------------
@@ -122,6 +231,10 @@ package body Langkit_Support.Adalog.Operations is
 
                when Unsatisfied =>
                   Tag_Progress;
+                  if Solver_Statistics.Enabled then
+                     Solver_Statistics.Record_Backtrack
+                       (Get_From_Queue (Self, I));
+                  end if;
                   Set_Completed (Self, I);
                   Trace ("In Any_Rel: relation unsatisfied, get the next one");
             end case;
@@ -178,6 +291,16 @@ package body Langkit_Support.Adalog.Operations is
    begin
       Trace ("In All_Rel:");
 
+      if Domain_Propagation
+         and then not Self.Propagated
+         and then Self.Next = 1
+         and then not Propagate_Domains (Self, Context)
+      then
+         Trace ("In All_Rel: empty domain after propagation");
+         Restore_Domains (Self);
+         return Unsatisfied;
+      end if;
+
       if Self.Next > Self.Count then
          Trace ("In All_Rel: last relation was evaluated: getting back to it");
          Self.Next := Self.Count;
@@ -207,6 +330,7 @@ package body Langkit_Support.Adalog.Operations is
                   if Self.Next = 1 then
                      Trace ("In All_Rel: first evaluated relation"
                             & " unsatisfied");
+                     Restore_Domains (Self);
                      return Unsatisfied;
                   end if;
 
@@ -337,7 +461,9 @@ package body Langkit_Support.Adalog.Operations is
             Count         => Keep_Rels'Length,
             Next          => <>,
             Sub_Rels      => Keep_Rels,
-            Working_Queue => <>);
+            Working_Queue => <>,
+            Propagated    => False,
+            Saved_Queue   => <>);
       begin
          Initialize_Working_Queue (Result.all);
          return Relation (Result);
@@ -1,22 +1,98 @@
+with Ada.Unchecked_Deallocation;
+
 with Langkit_Support.Adalog.Debug; use Langkit_Support.Adalog.Debug;
+with Langkit_Support.Adalog.Solver_Statistics;
 
 package body Langkit_Support.Adalog.Predicates is
 
-   ---------------
-   -- Predicate --
-   ---------------
+   ------------------------
+   -- Memoized_Predicate --
+   ------------------------
+
+   package body Memoized_Predicate is
 
-   package body Predicate is
+      procedure Clear (Cache : in out Predicate_Cache);
+      --  Remove all entries from Cache
+
+      -----------
+      -- Clear --
+      -----------
+
+      procedure Clear (Cache : in out Predicate_Cache) is
+      begin
+         for Cur in Cache.Entries.Iterate loop
+            declare
+               Value : El_Type := Cache_Maps.Key (Cur);
+            begin
+               Var.Dec_Ref (Value);
+            end;
+         end loop;
+         Cache.Entries.Clear;
+      end Clear;
 
       ----------
       -- Free --
       ----------
 
       procedure Free (Self : in out Predicate_Logic) is
+         procedure Destroy is new Ada.Unchecked_Deallocation
+           (Predicate_Cache, Predicate_Cache_Access);
       begin
          Free (Self.Pred);
+         if Self.Cache /= null then
+            Clear (Self.Cache.all);
+            Destroy (Self.Cache);
+         end if;
       end Free;
 
+      --------------
+      -- Evaluate --
+      --------------
+
+      function Evaluate
+        (Self     : Predicate_Logic;
+         Solve_Id : Solve_Id_Type;
+         Value    : El_Type) return Boolean
+      is
+         Result : Boolean;
+      begin
+         if Self.Cache /= null then
+            if Self.Cache.Solve_Id /= Solve_Id then
+               Clear (Self.Cache.all);
+               Self.Cache.Solve_Id := Solve_Id;
+            else
+               declare
+                  Cur : constant Cache_Maps.Cursor :=
+                     Self.Cache.Entries.Find (Value);
+               begin
+                  if Cache_Maps.Has_Element (Cur) then
+                     Trace ("In Predicate apply, using cached result");
+                     return Cache_Maps.Element (Cur);
+                  end if;
+               end;
+            end if;
+         end if;
+
+         Trace ("In Predicate apply, calling predicate");
+         if Solver_Statistics.Enabled then
+            Solver_Statistics.Record_Predicate_Call;
+         end if;
+         Result := Call (Self.Pred, Value);
+
+         if Self.Cache /= null then
+            declare
+               Dummy    : Cache_Maps.Cursor;
+               Inserted : Boolean;
+            begin
+               Self.Cache.Entries.Insert (Value, Result, Dummy, Inserted);
+               if Inserted then
+                  Var.Inc_Ref (Value);
+               end if;
+            end;
+         end if;
+         return Result;
+      end Evaluate;
+
       -----------
       -- Apply --
       -----------
@@ -33,9 +109,9 @@ package body Langkit_Support.Adalog.Predicates is
             return No_Progress;
          end if;
 
-         Trace ("In Predicate apply, calling predicate");
          declare
-            R : constant Boolean := Call (Self.Pred, Get_Value (Self.Ref));
+            R : constant Boolean :=
+               Evaluate (Self, Self.Solve_Id, Get_Value (Self.Ref));
          begin
             Trace (R'Img);
             return +R;
@@ -51,7 +127,31 @@ package body Langkit_Support.Adalog.Predicates is
          null;
       end Revert;
 
-   end Predicate;
+      ----------------
+      -- Solve_Impl --
+      ----------------
+
+      overriding function Solve_Impl
+        (Self    : in out Predicate_Rel;
+         Context : in out Solving_Context) return Solving_State is
+      begin
+         Self.Rel.Solve_Id := Solve_Id (Context);
+         return Impl.Solve_Impl (Impl.Rel (Self), Context);
+      end Solve_Impl;
+
+      ------------------
+      -- Accept_Value --
+      ------------------
+
+      overriding function Accept_Value
+        (Self    : Predicate_Rel;
+         Value   : El_Type;
+         Context : Solving_Context) return Boolean is
+      begin
+         return Evaluate (Self.Rel, Solve_Id (Context), Value);
+      end Accept_Value;
+
+   end Memoized_Predicate;
 
    -----------------
    -- N_Predicate --
@@ -87,6 +187,10 @@ package body Langkit_Support.Adalog.Predicates is
          end loop;
 
          Trace ("In N_Predicate apply, calling predicate");
+         if Solver_Statistics.Enabled then
+            Solver_Statistics.Record_Predicate_Call;
+         end if;
+
          declare
             Vals : Val_Array (1 .. Arity);
          begin
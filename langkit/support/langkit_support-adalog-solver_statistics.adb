@@ -0,0 +1,448 @@
+with Ada.Containers.Hashed_Maps;
+with Ada.Containers.Vectors;
+with Ada.Strings.Unbounded; use Ada.Strings.Unbounded;
+
+with Langkit_Support.Hashes;
+
+package body Langkit_Support.Adalog.Solver_Statistics is
+
+   use Ada.Text_IO;
+
+   type Relation_Statistics is record
+      Image : Unbounded_String;
+      --  Image of the relation, computed at its first evaluation
+
+      Evaluations : Natural := 0;
+      --  Number of times the relation was evaluated
+
+      Satisfied, Unsatisfied : Natural := 0;
+      --  Number of evaluations that returned Satisfied/Unsatisfied
+
+      Backtracks : Natural := 0;
+      --  Number of times the relation was abandoned as an Any_Rel branch
+
+      Domain_Size : Natural := 0;
+      --  For Member relations, number of values in the domain
+
+      Predicate_Calls : Natural := 0;
+      --  For predicate relations, number of calls to the predicate
+   end record;
+
+   package Relation_Statistics_Vectors is new Ada.Containers.Vectors
+     (Positive, Relation_Statistics);
+
+   type Solve_Statistics is record
+      Ticks     : Natural := 0;
+      Outcome   : Solve_Outcome := Running;
+      Relations : Relation_Statistics_Vectors.Vector;
+   end record;
+
+   package Solve_Statistics_Vectors is new Ada.Containers.Vectors
+     (Positive, Solve_Statistics);
+
+   function Hash is new Langkit_Support.Hashes.Hash_Access
+     (Base_Relation'Class, Relation);
+
+   package Relation_Index_Maps is new Ada.Containers.Hashed_Maps
+     (Key_Type        => Relation,
+      Element_Type    => Positive,
+      Hash            => Hash,
+      Equivalent_Keys => "=");
+
+   package Relation_Vectors is new Ada.Containers.Vectors (Positive, Relation);
+
+   type Solve_State is record
+      Solve_Index : Positive;
+      --  Index in Solves of the statistics for this resolution
+
+      Relation_Indexes : Relation_Index_Maps.Map;
+      --  Map relations to the index of their statistics in
+      --  Solves (Solve_Index).Relations.
+
+      Relations_Stack : Relation_Vectors.Vector;
+      --  Stack of relations being evaluated. The last one is the current
+      --  relation.
+   end record;
+   --  State for a resolution in progress
+
+   package Solve_State_Vectors is new Ada.Containers.Vectors
+     (Positive, Solve_State);
+
+   Is_Enabled : Boolean := False;
+   --  Whether statistics collection is enabled
+
+   Solves : Solve_Statistics_Vectors.Vector;
+   --  Statistics for all the recorded resolutions
+
+   Active_Solves : Solve_State_Vectors.Vector;
+   --  Stack of resolutions in progress. Predicates can themselves solve
+   --  relations, so resolutions can be nested: the last one is the current
+   --  resolution, to which all recording hooks apply.
+
+   function In_Solve return Boolean is (not Active_Solves.Is_Empty);
+   --  Whether we are currently recording statistics for a resolution
+
+   function Relation_Index (Self : Relation) return Positive;
+   --  Return the index of Self's statistics in the current resolution,
+   --  creating an entry if needed.
+
+   function Current_Solve return Positive;
+   --  Return the index in Solves of the statistics for the current resolution
+
+   function Current_Relation return Relation;
+   --  Return the relation being evaluated in the current resolution, or null
+   --  if there is none.
+
+   procedure Write_JSON_String (File : File_Type; S : String);
+   --  Write S as a JSON string literal to File
+
+   -----------------
+   -- Set_Enabled --
+   -----------------
+
+   procedure Set_Enabled (Enabled : Boolean) is
+   begin
+      Is_Enabled := Enabled;
+   end Set_Enabled;
+
+   -------------
+   -- Enabled --
+   -------------
+
+   function Enabled return Boolean is
+   begin
+      return Is_Enabled;
+   end Enabled;
+
+   -----------
+   -- Clear --
+   -----------
+
+   procedure Clear is
+   begin
+      Solves.Clear;
+      Active_Solves.Clear;
+   end Clear;
+
+   -----------------
+   -- Solve_Count --
+   -----------------
+
+   function Solve_Count return Natural is
+   begin
+      return Natural (Solves.Length);
+   end Solve_Count;
+
+   -----------
+   -- Ticks --
+   -----------
+
+   function Ticks (Solve_Index : Positive) return Natural is
+   begin
+      return Solves (Solve_Index).Ticks;
+   end Ticks;
+
+   --------------------
+   -- Relation_Index --
+   --------------------
+
+   function Relation_Index (Self : Relation) return Positive is
+      use Relation_Index_Maps;
+
+      State : Solve_State renames Active_Solves (Active_Solves.Last_Index);
+      Cur   : constant Cursor := State.Relation_Indexes.Find (Self);
+   begin
+      if Has_Element (Cur) then
+         return Element (Cur);
+      end if;
+
+      declare
+         Relations : Relation_Statistics_Vectors.Vector renames
+            Solves (State.Solve_Index).Relations;
+      begin
+         Relations.Append
+           ((Image  => To_Unbounded_String (Self.Custom_Image),
+             others => 0));
+         State.Relation_Indexes.Insert (Self, Relations.Last_Index);
+         return Relations.Last_Index;
+      end;
+   end Relation_Index;
+
+   -------------------
+   -- Current_Solve --
+   -------------------
+
+   function Current_Solve return Positive is
+   begin
+      return Active_Solves (Active_Solves.Last_Index).Solve_Index;
+   end Current_Solve;
+
+   ----------------------
+   -- Current_Relation --
+   ----------------------
+
+   function Current_Relation return Relation is
+      Stack : Relation_Vectors.Vector renames
+         Active_Solves (Active_Solves.Last_Index).Relations_Stack;
+   begin
+      return (if Stack.Is_Empty then null else Stack.Last_Element);
+   end Current_Relation;
+
+   -----------------
+   -- Start_Solve --
+   -----------------
+
+   procedure Start_Solve is
+   begin
+      Solves.Append (Solve_Statistics'(others => <>));
+      Active_Solves.Append
+        (Solve_State'(Solve_Index => Solves.Last_Index, others => <>));
+   end Start_Solve;
+
+   ------------------
+   -- Finish_Solve --
+   ------------------
+
+   procedure Finish_Solve (Outcome : Solve_Outcome) is
+   begin
+      if not In_Solve then
+         return;
+      end if;
+
+      Solves (Current_Solve).Outcome := Outcome;
+      Active_Solves.Delete_Last;
+   end Finish_Solve;
+
+   -----------------
+   -- Record_Tick --
+   -----------------
+
+   procedure Record_Tick is
+   begin
+      if In_Solve then
+         declare
+            Solve : Solve_Statistics renames Solves (Current_Solve);
+         begin
+            Solve.Ticks := Solve.Ticks + 1;
+         end;
+      end if;
+   end Record_Tick;
+
+   --------------------
+   -- Enter_Relation --
+   --------------------
+
+   procedure Enter_Relation (Self : Relation) is
+   begin
+      if In_Solve then
+         declare
+            Index : constant Positive := Relation_Index (Self);
+            Stats : Relation_Statistics renames
+               Solves (Current_Solve).Relations (Index);
+         begin
+            Stats.Evaluations := Stats.Evaluations + 1;
+            Active_Solves (Active_Solves.Last_Index).Relations_Stack.Append
+              (Self);
+         end;
+      end if;
+   end Enter_Relation;
+
+   --------------------
+   -- Leave_Relation --
+   --------------------
+
+   procedure Leave_Relation (Self : Relation; Result : Solving_State) is
+   begin
+      if In_Solve then
+         declare
+            Index : constant Positive := Relation_Index (Self);
+            Stats : Relation_Statistics renames
+               Solves (Current_Solve).Relations (Index);
+         begin
+            case Result is
+               when Satisfied =>
+                  Stats.Satisfied := Stats.Satisfied + 1;
+               when Unsatisfied =>
+                  Stats.Unsatisfied := Stats.Unsatisfied + 1;
+               when Progress | No_Progress =>
+                  null;
+            end case;
+         end;
+         Abandon_Relation (Self);
+      end if;
+   end Leave_Relation;
+
+   ----------------------
+   -- Abandon_Relation --
+   ----------------------
+
+   procedure Abandon_Relation (Self : Relation) is
+   begin
+      if In_Solve then
+         declare
+            Stack : Relation_Vectors.Vector renames
+               Active_Solves (Active_Solves.Last_Index).Relations_Stack;
+         begin
+            if not Stack.Is_Empty and then Stack.Last_Element = Self then
+               Stack.Delete_Last;
+            end if;
+         end;
+      end if;
+   end Abandon_Relation;
+
+   ----------------------
+   -- Record_Backtrack --
+   ----------------------
+
+   procedure Record_Backtrack (Branch : Relation) is
+   begin
+      if In_Solve then
+         declare
+            Index : constant Positive := Relation_Index (Branch);
+            Stats : Relation_Statistics renames
+               Solves (Current_Solve).Relations (Index);
+         begin
+            Stats.Backtracks := Stats.Backtracks + 1;
+         end;
+      end if;
+   end Record_Backtrack;
+
+   ------------------------
+   -- Record_Domain_Size --
+   ------------------------
+
+   procedure Record_Domain_Size (Size : Natural) is
+   begin
+      if In_Solve and then Current_Relation /= null then
+         declare
+            Index : constant Positive := Relation_Index (Current_Relation);
+         begin
+            Solves (Current_Solve).Relations (Index).Domain_Size := Size;
+         end;
+      end if;
+   end Record_Domain_Size;
+
+   ---------------------------
+   -- Record_Predicate_Call --
+   ---------------------------
+
+   procedure Record_Predicate_Call is
+   begin
+      if In_Solve and then Current_Relation /= null then
+         declare
+            Index : constant Positive := Relation_Index (Current_Relation);
+            Stats : Relation_Statistics renames
+               Solves (Current_Solve).Relations (Index);
+         begin
+            Stats.Predicate_Calls := Stats.Predicate_Calls + 1;
+         end;
+      end if;
+   end Record_Predicate_Call;
+
+   -----------------------
+   -- Write_JSON_String --
+   -----------------------
+
+   procedure Write_JSON_String (File : File_Type; S : String) is
+      Hex : constant String := "0123456789abcdef";
+   begin
+      Put (File, '"');
+      for C of S loop
+         case C is
+            when '"' | '\' =>
+               Put (File, '\' & C);
+            when ASCII.NUL .. ASCII.US =>
+               Put (File, "\u00"
+                          & Hex (Character'Pos (C) / 16 + 1)
+                          & Hex (Character'Pos (C) mod 16 + 1));
+            when others =>
+               Put (File, C);
+         end case;
+      end loop;
+      Put (File, '"');
+   end Write_JSON_String;
+
+   -----------------------
+   -- Write_JSON_Report --
+   -----------------------
+
+   procedure Write_JSON_Report (File : File_Type) is
+
+      function Img (N : Natural) return String;
+      --  Return the image of N without the leading space
+
+      ---------
+      -- Img --
+      ---------
+
+      function Img (N : Natural) return String is
+         Result : constant String := Natural'Image (N);
+      begin
+         return Result (Result'First + 1 .. Result'Last);
+      end Img;
+
+   begin
+      Put_Line (File, "[");
+      for I in Solves.First_Index .. Solves.Last_Index loop
+         declare
+            Solve : Solve_Statistics renames Solves (I);
+            Outcome : constant String :=
+              (case Solve.Outcome is
+               when Running     => "running",
+               when Satisfied   => "satisfied",
+               when Unsatisfied => "unsatisfied",
+               when Timeout     => "timeout",
+               when Error       => "error");
+         begin
+            Put_Line (File, "  {");
+            Put_Line (File, "    ""ticks"": " & Img (Solve.Ticks) & ",");
+            Put_Line (File, "    ""outcome"": """ & Outcome & """,");
+            Put (File, "    ""relations"": [");
+
+            for J in Solve.Relations.First_Index .. Solve.Relations.Last_Index
+            loop
+               declare
+                  R : Relation_Statistics renames Solve.Relations (J);
+               begin
+                  New_Line (File);
+                  Put (File, "      {""image"": ");
+                  Write_JSON_String (File, To_String (R.Image));
+                  Put (File,
+                       ", ""evaluations"": " & Img (R.Evaluations)
+                       & ", ""satisfied"": " & Img (R.Satisfied)
+                       & ", ""unsatisfied"": " & Img (R.Unsatisfied)
+                       & ", ""backtracks"": " & Img (R.Backtracks)
+                       & ", ""domain_size"": " & Img (R.Domain_Size)
+                       & ", ""predicate_calls"": " & Img (R.Predicate_Calls)
+                       & "}");
+                  if J /= Solve.Relations.Last_Index then
+                     Put (File, ",");
+                  end if;
+               end;
+            end loop;
+
+            New_Line (File);
+            Put_Line (File, "    ]");
+            Put (File, "  }");
+            if I /= Solves.Last_Index then
+               Put (File, ",");
+            end if;
+            New_Line (File);
+         end;
+      end loop;
+      Put_Line (File, "]");
+   end Write_JSON_Report;
+
+   -----------------------
+   -- Write_JSON_Report --
+   -----------------------
+
+   procedure Write_JSON_Report (Filename : String) is
+      File : File_Type;
+   begin
+      Create (File, Out_File, Filename);
+      Write_JSON_Report (File);
+      Close (File);
+   end Write_JSON_Report;
+
+end Langkit_Support.Adalog.Solver_Statistics;
@@ -2,6 +2,7 @@ with Ada.Strings.Unbounded; use Ada.Strings.Unbounded;
 with Ada.Unchecked_Deallocation;
 
 with Langkit_Support.Adalog.Debug; use Langkit_Support.Adalog.Debug;
+with Langkit_Support.Adalog.Solver_Statistics;
 
 package body Langkit_Support.Adalog.Unify_One_Side is
 
@@ -14,6 +15,13 @@ package body Langkit_Support.Adalog.Unify_One_Side is
       Eq_Data : Equals_Data) return Unify_Rec;
    --  Helper for the public Create function
 
+   procedure Free is new Ada.Unchecked_Deallocation
+     (Boolean_Array, Boolean_Array_Access);
+
+   function Is_Candidate (Self : Member_T; Index : Positive) return Boolean
+   is (Self.Mask = null or else Self.Mask (Index));
+   --  Return whether Self.Values (Index) is still in Self's domain
+
    -----------
    -- Apply --
    -----------
@@ -112,6 +120,18 @@ package body Langkit_Support.Adalog.Unify_One_Side is
       pragma Unreferenced (Context);
    begin
       Trace ("In Member");
+      if Solver_Statistics.Enabled then
+         Solver_Statistics.Record_Domain_Size (Self.Domain_Size);
+      end if;
+
+      --  Skip values that were removed from the domain
+
+      while Self.Current_Index in Self.Values.all'Range
+         and then not Is_Candidate (Self, Self.Current_Index)
+      loop
+         Self.Current_Index := Self.Current_Index + 1;
+      end loop;
+
       if Self.Current_Index in Self.Values.all'Range then
          if Is_Defined (Self.Left) and then not Self.Changed then
 
@@ -123,19 +143,22 @@ package body Langkit_Support.Adalog.Unify_One_Side is
 
             Trace ("In Member: left already defined, checking domain");
             Self.Domain_Checked := True;
-            for V of Self.Values.all loop
-               declare
-                  L     : L_Type := Get_Value (Self.Left);
-                  R_Val : L_Type := Convert (Self.R_Data, V);
-                  B     : constant Boolean := Equals (Self.Eq_Data, L, R_Val);
-               begin
-                  L_Dec_Ref (L);
-                  L_Dec_Ref (R_Val);
-                  if B then
-                     Trace ("In Member: left already defined, satisfied");
-                     return Satisfied;
-                  end if;
-               end;
+            for I in Self.Values.all'Range loop
+               if Is_Candidate (Self, I) then
+                  declare
+                     L     : L_Type := Get_Value (Self.Left);
+                     R_Val : L_Type := Convert (Self.R_Data, Self.Values (I));
+                     B     : constant Boolean :=
+                        Equals (Self.Eq_Data, L, R_Val);
+                  begin
+                     L_Dec_Ref (L);
+                     L_Dec_Ref (R_Val);
+                     if B then
+                        Trace ("In Member: left already defined, satisfied");
+                        return Satisfied;
+                     end if;
+                  end;
+               end if;
             end loop;
 
             Trace ("In Member: left already defined, unsatisfied");
@@ -182,6 +205,70 @@ package body Langkit_Support.Adalog.Unify_One_Side is
       Self.Current_Index := 1;
    end Reset;
 
+   -----------------
+   -- Domain_Size --
+   -----------------
+
+   overriding function Domain_Size (Self : Member_T) return Natural is
+   begin
+      return (if Self.Mask = null
+              then Self.Values.all'Length
+              else Self.Mask_Size);
+   end Domain_Size;
+
+   ---------------------
+   -- Restrict_Domain --
+   ---------------------
+
+   overriding procedure Restrict_Domain
+     (Self       : in out Member_T;
+      Constraint : Base_Relation'Class;
+      Context    : Solving_Context) is
+   begin
+      if Constraint not in Var.Value_Filter'Class
+         or else Var.Value_Filter'Class (Constraint).Filtered_Var /= Self.Left
+      then
+         return;
+      end if;
+
+      if Self.Mask = null then
+         Self.Mask := new Boolean_Array'(Self.Values.all'Range => True);
+         Self.Mask_Size := Self.Values.all'Length;
+      end if;
+
+      for I in Self.Values.all'Range loop
+         if Self.Mask (I) then
+            declare
+               R_Val : L_Type := Convert (Self.R_Data, Self.Values (I));
+               B     : constant Boolean :=
+                  Var.Value_Filter'Class (Constraint).Accept_Value
+                    (R_Val, Context);
+            begin
+               L_Dec_Ref (R_Val);
+               if not B then
+                  Self.Mask (I) := False;
+                  Self.Mask_Size := Self.Mask_Size - 1;
+               end if;
+            end;
+         end if;
+      end loop;
+
+      if Debug.Debug then
+         Trace ("In Member: domain restricted to"
+                & Natural'Image (Self.Mask_Size) & " values");
+      end if;
+   end Restrict_Domain;
+
+   --------------------
+   -- Restore_Domain --
+   --------------------
+
+   overriding procedure Restore_Domain (Self : in out Member_T) is
+   begin
+      Free (Self.Mask);
+      Self.Mask_Size := 0;
+   end Restore_Domain;
+
    ------------
    -- Create --
    ------------
@@ -249,6 +336,7 @@ package body Langkit_Support.Adalog.Unify_One_Side is
          R_Dec_Ref (V);
       end loop;
       Unchecked_Free (Self.Values);
+      Free (Self.Mask);
    end Cleanup;
 
    ------------------
@@ -9,6 +9,14 @@ package body Langkit_Support.Bump_Ptr is
    procedure Dealloc is new Ada.Unchecked_Deallocation
      (Bump_Ptr_Pool_Type, Bump_Ptr_Pool);
 
+   procedure Dealloc is new Ada.Unchecked_Deallocation
+     (Page_Cache_Type, Page_Cache);
+
+   function New_Page (Pool : Bump_Ptr_Pool) return Page_Ptr
+     with Inline;
+   --  Return a new page for Pool, taking it from Pool's page cache if
+   --  possible.
+
    function Align (Size, Alignment : Storage_Offset) return Storage_Offset
      with Inline;
 
@@ -26,13 +34,75 @@ package body Langkit_Support.Bump_Ptr is
       end if;
    end Align;
 
+   -----------------------
+   -- Create_Page_Cache --
+   -----------------------
+
+   function Create_Page_Cache
+     (Page_Size : Storage_Count := Default_Page_Size;
+      Max_Pages : Natural := Default_Max_Cached_Pages) return Page_Cache is
+   begin
+      return new Page_Cache_Type'(Ref_Count => 1,
+                                  Page_Size => Page_Size,
+                                  Max_Pages => Max_Pages,
+                                  Pages     => <>);
+   end Create_Page_Cache;
+
+   -------------
+   -- Dec_Ref --
+   -------------
+
+   procedure Dec_Ref (Cache : in out Page_Cache) is
+   begin
+      if Cache = No_Page_Cache then
+         return;
+      end if;
+
+      if Cache.Ref_Count > 1 then
+         Cache.Ref_Count := Cache.Ref_Count - 1;
+      else
+         for PI in First_Index (Cache.Pages) .. Last_Index (Cache.Pages) loop
+            Free (Get (Cache.Pages, PI));
+         end loop;
+         Destroy (Cache.Pages);
+         Dealloc (Cache);
+      end if;
+      Cache := No_Page_Cache;
+   end Dec_Ref;
+
+   ------------------
+   -- Cached_Pages --
+   ------------------
+
+   function Cached_Pages (Cache : Page_Cache) return Natural is
+   begin
+      return (if Cache = No_Page_Cache then 0 else Length (Cache.Pages));
+   end Cached_Pages;
+
+   ------------
+   -- Create --
+   ------------
+
+   function Create
+     (Page_Size : Storage_Count := Default_Page_Size) return Bump_Ptr_Pool
+   is
+      Result : constant Bump_Ptr_Pool := new Bump_Ptr_Pool_Type;
+   begin
+      Result.Page_Size := Page_Size;
+      Result.Current_Offset := Page_Size;
+      return Result;
+   end Create;
+
    ------------
    -- Create --
    ------------
 
-   function Create return Bump_Ptr_Pool is
+   function Create (Cache : Page_Cache) return Bump_Ptr_Pool is
+      Result : constant Bump_Ptr_Pool := Create (Cache.Page_Size);
    begin
-      return new Bump_Ptr_Pool_Type;
+      Cache.Ref_Count := Cache.Ref_Count + 1;
+      Result.Cache := Cache;
+      return Result;
    end Create;
 
    ----------
@@ -40,23 +110,69 @@ package body Langkit_Support.Bump_Ptr is
    ----------
 
    procedure Free (Pool : in out Bump_Ptr_Pool) is
+      Cache : Page_Cache;
    begin
       if Pool = No_Pool then
          return;
       end if;
 
-      --  Free every page allocated
-
-      --  TODO: Might be interresting at some point to keep a global cache of
-      --  pages ourself, since we always use the same size.
+      --  Give pages back to the page cache as long as it has room for them,
+      --  and free the other ones.
 
+      Cache := Pool.Cache;
       for PI in First_Index (Pool.Pages) .. Last_Index (Pool.Pages) loop
-         Free (Get (Pool.Pages, PI));
+         if Cache /= No_Page_Cache
+           and then Length (Cache.Pages) < Cache.Max_Pages
+         then
+            Append (Cache.Pages, Get (Pool.Pages, PI));
+         else
+            Free (Get (Pool.Pages, PI));
+         end if;
       end loop;
       Destroy (Pool.Pages);
+
+      for BI in First_Index (Pool.Large_Blocks)
+             .. Last_Index (Pool.Large_Blocks)
+      loop
+         Free (Get (Pool.Large_Blocks, BI));
+      end loop;
+      Destroy (Pool.Large_Blocks);
+
+      Dec_Ref (Cache);
       Dealloc (Pool);
    end Free;
 
+   ----------------
+   -- Statistics --
+   ----------------
+
+   function Statistics (Pool : Bump_Ptr_Pool) return Pool_Statistics is
+   begin
+      if Pool = No_Pool then
+         return (others => <>);
+      end if;
+
+      return (Page_Size       => Pool.Page_Size,
+              Pages           => Length (Pool.Pages),
+              Large_Blocks    => Length (Pool.Large_Blocks),
+              Allocated_Bytes => Pool.Allocated_Bytes,
+              Wasted_Bytes    => Pool.Wasted_Bytes);
+   end Statistics;
+
+   --------------
+   -- New_Page --
+   --------------
+
+   function New_Page (Pool : Bump_Ptr_Pool) return Page_Ptr is
+      Cache : constant Page_Cache := Pool.Cache;
+   begin
+      if Cache /= No_Page_Cache and then Length (Cache.Pages) > 0 then
+         return Pop (Cache.Pages);
+      else
+         return System.Memory.Alloc (size_t (Pool.Page_Size));
+      end if;
+   end New_Page;
+
    --------------
    -- Allocate --
    --------------
@@ -72,25 +188,29 @@ package body Langkit_Support.Bump_Ptr is
       --  on regular alloc mechanism, but this ensures that we can handle all
       --  allocations transparently via this allocator.
 
-      if S > Page_Size then
+      Pool.Allocated_Bytes := Pool.Allocated_Bytes + S;
+
+      if S > Pool.Page_Size then
          declare
             Mem : constant System.Address := System.Memory.Alloc (size_t (S));
          begin
 
-            --  Append the allocated memory to the pool pages, so that it is
-            --  freed on pool free, but don't touch at the current_page, so
-            --  it can keep being used next time.
+            --  Append the allocated memory to the pool large blocks, so that
+            --  it is freed on pool free, but don't touch at the current_page,
+            --  so it can keep being used next time.
 
-            Append (Pool.Pages, Mem);
+            Append (Pool.Large_Blocks, Mem);
             return Mem;
          end;
       end if;
 
-      --  When we don't have enough space to allocate the chunk, allocate a new
+      --  When we don't have enough space to allocate the chunk, get a new
       --  page.
 
-      if Page_Size - Pool.Current_Offset < S then
-         Pool.Current_Page := System.Memory.Alloc (Page_Size);
+      if Pool.Page_Size - Pool.Current_Offset < S then
+         Pool.Wasted_Bytes :=
+           Pool.Wasted_Bytes + (Pool.Page_Size - Pool.Current_Offset);
+         Pool.Current_Page := New_Page (Pool);
          Append (Pool.Pages, Pool.Current_Page);
          Pool.Current_Offset := 0;
       end if;
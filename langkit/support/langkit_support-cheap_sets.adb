@@ -1,124 +1,192 @@
 with Ada.Unchecked_Deallocation;
-with Langkit_Support.Array_Utils;
 
 package body Langkit_Support.Cheap_Sets is
 
-   function Find
-     (Self      : Set;
-      E         : Element_Type;
-      Do_Remove : Boolean := True) return Boolean;
+   Initial_Table_Capacity : constant := 4 * Small_Set_Size;
+   --  Capacity for the hash table of a set that just outgrew Small_Set_Size.
+   --  This must be a power of two.
+
+   procedure Free is new Ada.Unchecked_Deallocation (Set_Record, Set_Access);
+
+   function Home (Data : Set_Record; E : Element_Type) return Natural
+   is (Natural (Hash (E) and Hash_Type (Data.Capacity - 1)));
+   --  Return the index of the slot in the hash table Data at which the probe
+   --  sequence for E starts.
+
+   function Next (Data : Set_Record; Index : Natural) return Natural
+   is ((Index + 1) mod Data.Capacity);
+   --  Return the index of the slot in the hash table Data that comes after
+   --  Index in probe sequences.
+
+   function Lookup (Data : Set_Record; E : Element_Type) return Integer;
+   --  Return the index of the slot in Data that contains E, or -1 if E is not
+   --  in Data.
+
+   procedure Insert (Data : in out Set_Record; E : Element_Type);
+   --  Insert E in the hash table Data. E must not be in Data already, and
+   --  Data must have at least one Empty slot besides the one that E will use.
+
+   procedure Rehash (Self : in out Set; Capacity : Positive);
+   --  Replace Self's storage with a new hash table of the given capacity
+   --  (which must be a power of two) that contains the same elements.
 
    ------------
-   -- Remove --
+   -- Lookup --
    ------------
 
-   function Remove
-     (Self      : Set;
-      E         : Element_Type) return Boolean is
+   function Lookup (Data : Set_Record; E : Element_Type) return Integer is
    begin
-      return Find (Self, E, Do_Remove => True);
-   end Remove;
+      if not Data.Hashed then
+         for I in 0 .. Data.Count - 1 loop
+            if Data.Slots (I).Element = E then
+               return I;
+            end if;
+         end loop;
+         return -1;
+      end if;
 
-   ---------
-   -- Add --
-   ---------
+      --  Add makes sure that hash tables always have Empty slots, so the
+      --  following loop always terminates.
+
+      declare
+         Index : Natural := Home (Data, E);
+      begin
+         loop
+            declare
+               S : Slot renames Data.Slots (Index);
+            begin
+               case S.State is
+                  when Empty =>
+                     return -1;
+                  when Occupied =>
+                     if S.Element = E then
+                        return Index;
+                     end if;
+                  when Deleted =>
+                     null;
+               end case;
+            end;
+            Index := Next (Data, Index);
+         end loop;
+      end;
+   end Lookup;
 
-   function Add (Self : in out Set; E : Element_Type) return Boolean is
-      use Elements_Vectors;
+   ------------
+   -- Insert --
+   ------------
 
-      type El_Access is access all Element_Type;
-      First_No : El_Access := null;
+   procedure Insert (Data : in out Set_Record; E : Element_Type) is
+      Index : Natural := Home (Data, E);
    begin
+      --  As E is not in Data, we can reuse the first tombstone we find
 
-      --  Create the inner vector if it has not been created yet
+      while Data.Slots (Index).State = Occupied loop
+         Index := Next (Data, Index);
+      end loop;
 
-      if Self.Elements = null then
-         Self.Elements := new Elements_Vectors.Vector;
+      if Data.Slots (Index).State = Empty then
+         Data.Used := Data.Used + 1;
       end if;
+      Data.Slots (Index) := (Occupied, E);
+      Data.Count := Data.Count + 1;
+   end Insert;
 
-      --  Search for an element equal to E. Also search for the first
-      --  No_Element in the same run.
+   ------------
+   -- Rehash --
+   ------------
 
-      for I in First_Index (Self.Elements.all)
-        .. Last_Index (Self.Elements.all)
-      loop
-         declare
-            Current : constant Element_Access
-              := Get_Access (Self.Elements.all, I);
-         begin
+   procedure Rehash (Self : in out Set; Capacity : Positive) is
+      Old : Set_Access := Self.Data;
+   begin
+      Self.Data := new Set_Record (Capacity);
+      Self.Data.Hashed := True;
+      for S of Old.Slots loop
+         if S.State = Occupied then
+            Insert (Self.Data.all, S.Element);
+         end if;
+      end loop;
+      Free (Old);
+   end Rehash;
 
-            --  We found a No_Element. Keep it for later if we have to add E to
-            --  the set.
+   ---------
+   -- Add --
+   ---------
 
-            if Current.all = No_Element then
-               First_No := El_Access (Current);
-            end if;
+   function Add (Self : in out Set; E : Element_Type) return Boolean is
+   begin
+      --  Create the inner storage if it has not been created yet
 
-            --  We found E. Return False, no need to insert anything in the
-            --  set.
+      if Self.Data = null then
+         Self.Data := new Set_Record (Small_Set_Size);
+      elsif Lookup (Self.Data.all, E) >= 0 then
+         return False;
+      end if;
 
-            if Current.all = E then
-               return False;
+      if not Self.Data.Hashed then
+         declare
+            Data : Set_Record renames Self.Data.all;
+         begin
+            if Data.Count < Data.Capacity then
+               Data.Slots (Data.Count) := (Occupied, E);
+               Data.Count := Data.Count + 1;
+               return True;
             end if;
          end;
-      end loop;
 
-      --  Add the element to the set, either at the first empty cell we found,
-      --  or in a new cell.
+         --  The small array is full: switch to a hash table
+
+         Rehash (Self, Initial_Table_Capacity);
+
+      elsif 4 * (Self.Data.Used + 1) > 3 * Self.Data.Capacity then
+
+         --  Keep the load factor (tombstones included) under 3/4. If
+         --  tombstones are what makes the table crowded, rebuilding it at the
+         --  same capacity is enough to get rid of them.
 
-      if First_No /= null then
-         First_No.all := E;
-      else
-         Append (Self.Elements.all, E);
+         Rehash (Self,
+                 (if 2 * (Self.Data.Count + 1) > Self.Data.Capacity
+                  then 2 * Self.Data.Capacity
+                  else Self.Data.Capacity));
       end if;
 
+      Insert (Self.Data.all, E);
       return True;
    end Add;
 
-   ----------
-   -- Find --
-   ----------
+   ------------
+   -- Remove --
+   ------------
 
-   function Find
-     (Self      : Set;
-      E         : Element_Type;
-      Do_Remove : Boolean := True) return Boolean
-   is
-      use Elements_Vectors;
+   function Remove (Self : Set; E : Element_Type) return Boolean is
    begin
-      --  If inner vector was not created, we're sure there is no element
+      --  If inner storage was not created, we're sure there is no element
       --  corresponding to E.
 
-      if Self.Elements = null then
+      if Self.Data = null then
          return False;
       end if;
 
-      --  Else, let's search in the inner vector for E
+      declare
+         Data  : Set_Record renames Self.Data.all;
+         Index : constant Integer := Lookup (Data, E);
+      begin
+         if Index < 0 then
+            return False;
 
-      for I in First_Index (Self.Elements.all)
-        .. Last_Index (Self.Elements.all)
-      loop
-         declare
-            Current : constant Element_Access
-              := Get_Access (Self.Elements.all, I);
-         begin
+         elsif Data.Hashed then
+            Data.Slots (Index) := (Deleted, No_Element);
 
-            --  We found something, delete the element if specified and return
-            --  True.
+         else
+            --  Keep small arrays packed: move the last element to the hole
 
-            if Current.all = E then
-               if Do_Remove then
-                  Current.all := No_Element;
-               end if;
-               return True;
-            end if;
-         end;
-      end loop;
-
-      --  We found nothing
+            Data.Slots (Index) := Data.Slots (Data.Count - 1);
+            Data.Slots (Data.Count - 1) := (Empty, No_Element);
+         end if;
 
-      return False;
-   end Find;
+         Data.Count := Data.Count - 1;
+         return True;
+      end;
+   end Remove;
 
    ---------
    -- Has --
@@ -126,41 +194,44 @@ package body Langkit_Support.Cheap_Sets is
 
    function Has (Self : Set; E : Element_Type) return Boolean is
    begin
-      return Find (Self, E, False);
+      return Self.Data /= null and then Lookup (Self.Data.all, E) >= 0;
    end Has;
 
+   ------------
+   -- Length --
+   ------------
+
+   function Length (Self : Set) return Natural is
+   begin
+      return (if Self.Data = null then 0 else Self.Data.Count);
+   end Length;
+
    -------------
    -- Destroy --
    -------------
 
    procedure Destroy (Self : in out Set) is
-      procedure Unchecked_Free is new Ada.Unchecked_Deallocation
-        (Elements_Vectors.Vector, Elements_Vector);
    begin
-      if Self.Elements /= null then
-         Elements_Vectors.Destroy (Self.Elements.all);
-         Unchecked_Free (Self.Elements);
-      end if;
+      Free (Self.Data);
    end Destroy;
 
-   package Elements_Arrays
-   is new Langkit_Support.Array_Utils
-     (Element_Type, Positive, Elements_Vectors.Elements_Array);
-
    --------------
    -- Elements --
    --------------
 
    function Elements (Self : Set) return Elements_Vectors.Elements_Array is
-
-      function Not_Null (E : Element_Type) return Boolean
-      is (E /= No_Element);
-      function Filter_Null is new Elements_Arrays.Filter_Gen (Not_Null);
+      Next_Index : Positive := 1;
    begin
-      return (if Self.Elements = null
-              then Elements_Arrays.Empty_Array
-              else Filter_Null
-                (Elements_Vectors.To_Array (Self.Elements.all)));
+      return Result : Elements_Vectors.Elements_Array (1 .. Length (Self)) do
+         if Self.Data /= null then
+            for S of Self.Data.Slots loop
+               if S.State = Occupied then
+                  Result (Next_Index) := S.Element;
+                  Next_Index := Next_Index + 1;
+               end if;
+            end loop;
+         end if;
+      end return;
    end Elements;
 
 end Langkit_Support.Cheap_Sets;
@@ -7,9 +7,17 @@ with Ada.Unchecked_Conversion;
 with System.Address_Image;
 
 with Langkit_Support.Images; use Langkit_Support.Images;
+with Langkit_Support.Locks;  use Langkit_Support.Locks;
 
 package body Langkit_Support.Lexical_Env is
 
+   Frozen_Envs_Lock : Reentrant_Lock;
+   --  Lock to serialize accesses to frozen environments
+
+   Has_Frozen_Envs : Boolean := False with Atomic;
+   --  Whether some environment was frozen. Until then, there is no need to
+   --  use Frozen_Envs_Lock.
+
    function Is_Lookup_Cache_Valid (Env : Lexical_Env) return Boolean
       with Pre => Env.Kind = Primary;
    --  Return whether Env's lookup cache is valid. This will check every
@@ -53,13 +61,79 @@ package body Langkit_Support.Lexical_Env is
    --  identical New_Env in the set of rebindings. If there are, raise a
    --  property error.
 
-   function Get_Internal
-     (Self          : Lexical_Env;
-      Key           : Symbol_Type;
-      Recursive     : Boolean := True;
-      Rebindings    : Env_Rebindings := null;
-      Metadata      : Element_Metadata := Empty_Metadata)
-      return Lookup_Result_Array;
+   type Lookup_Item_Kind is
+     (Lookup_Env,
+      --  Look for Key in Env and append the results
+
+      Visit_Refd_Envs,
+      --  Schedule the visit of Env's (non) transitive referenced envs
+
+      Visit_Refd_Env,
+      --  Look for Key in the Ref_Index'th referenced env of Env
+
+      Leave_Refd_Env,
+      --  Complete the visit of the Ref_Index'th referenced env of Env
+
+      Visit_Parent,
+      --  Look for Key in Env's parent
+
+      Release_Env,
+      --  Dec_Ref Env
+
+      Finish_Frame
+      --  Complete the lookup in the primary env Env: release Extracted and
+      --  store results in Env's lookup cache.
+     );
+
+   type Lookup_Item is record
+      Kind : Lookup_Item_Kind;
+      Env  : Lexical_Env := Null_Lexical_Env;
+
+      Recursive  : Boolean := False;
+      Rebindings : Env_Rebindings := null;
+      Metadata   : Element_Metadata := Empty_Metadata;
+      --  Parameters for the lookup. For Finish_Frame, Recursive tells whether
+      --  to store results in Env's lookup cache instead.
+
+      Transitive : Boolean := False;
+      --  For Visit_Refd_Envs/Visit_Refd_Env, whether to visit transitive
+      --  referenced envs or non transitive ones.
+
+      Ref_Index : Positive := 1;
+      --  For Visit_Refd_Env/Leave_Refd_Env, index of the referenced env
+
+      Refd_Env : Lexical_Env := Null_Lexical_Env;
+      --  For Leave_Refd_Env, referenced env that was visited
+
+      Extracted : Lexical_Env := Null_Lexical_Env;
+      --  For Visit_Parent/Finish_Frame, env that Extract_Rebinding returned
+      --  for Env.
+
+      Cache_Key : Lookup_Cache_Key;
+      --  For Finish_Frame, key for Env's lookup cache
+
+      First_Result : Positive := 1;
+      --  For Leave_Refd_Env/Finish_Frame, index in the output buffer of the
+      --  first result that the corresponding lookup produced.
+   end record;
+   --  Work item for Get_Internal
+
+   package Lookup_Item_Vectors is new Langkit_Support.Vectors
+     (Lookup_Item, Small_Vector_Capacity => 8);
+
+   procedure Get_Internal
+     (Self       : Lexical_Env;
+      Key        : Symbol_Type;
+      Recursive  : Boolean;
+      Rebindings : Env_Rebindings;
+      Metadata   : Element_Metadata;
+      Results    : in out Lookup_Result_Vector);
+   --  Look for Key in Self and append the results to Results.
+   --
+   --  Rather than recursing on parent, referenced, grouped and rebound envs,
+   --  this uses an explicit stack of work items (see Lookup_Item) and
+   --  accumulates all results in Results, so that deep env chains neither
+   --  exhaust the stack nor copy intermediate results at each level.
 
    procedure Reset_Lookup_Cache (Self : Lexical_Env);
    --  Reset Self's lexical environment lookup cache
@@ -241,53 +315,85 @@ package body Langkit_Support.Lexical_Env is
 
    function Append
      (Self             : Env_Rebindings;
-      Old_Env, New_Env : Lexical_Env) return Env_Rebindings is
-   begin
-      --  Look for an existing rebinding for the result: in the Old_Env's pool
-      --  if there is no parent, otherwise in the parent's children.
-      if Self = null then
-         if Old_Env.Env.Rebindings_Pool /= null then
-            declare
-               use Env_Rebindings_Pools;
-               Cur : constant Cursor := Old_Env.Env.Rebindings_Pool.Find
-                 (New_Env);
-            begin
-               if Cur /= Env_Rebindings_Pools.No_Element then
-                  return Element (Cur);
+      Old_Env, New_Env : Lexical_Env) return Env_Rebindings
+   is
+      function Append_Unlocked return Env_Rebindings;
+      --  Implementation of Append, without locking
+
+      ---------------------
+      -- Append_Unlocked --
+      ---------------------
+
+      function Append_Unlocked return Env_Rebindings is
+      begin
+         --  Look for an existing rebinding for the result: in the Old_Env's
+         --  pool if there is no parent, otherwise in the parent's children.
+         if Self = null then
+            if Old_Env.Env.Rebindings_Pool /= null then
+               declare
+                  use Env_Rebindings_Pools;
+                  Cur : constant Cursor := Old_Env.Env.Rebindings_Pool.Find
+                    (New_Env);
+               begin
+                  if Cur /= Env_Rebindings_Pools.No_Element then
+                     return Element (Cur);
+                  end if;
+               end;
+            end if;
+
+         else
+            for C of Self.Children loop
+               if C.Old_Env = Old_Env and then C.New_Env = New_Env then
+                  return C;
                end if;
-            end;
+            end loop;
          end if;
 
-      else
-         for C of Self.Children loop
-            if C.Old_Env = Old_Env and then C.New_Env = New_Env then
-               return C;
+         --  No luck? then create a new rebinding and register it where
+         --  required.
+         declare
+            Result : constant Env_Rebindings := new Env_Rebindings_Type'
+              (Parent   => Self,
+               Old_Env  => Old_Env,
+               New_Env  => New_Env,
+               Children => Env_Rebindings_Vectors.Empty_Vector);
+         begin
+            if Self /= null then
+               Self.Children.Append (Result);
+            else
+               if Old_Env.Env.Rebindings_Pool = null then
+                  Old_Env.Env.Rebindings_Pool :=
+                     new Env_Rebindings_Pools.Map;
+               end if;
+               Old_Env.Env.Rebindings_Pool.Insert (New_Env, Result);
             end if;
-         end loop;
+
+            Register_Rebinding (Env_Node (Old_Env), Result.all'Address);
+            Register_Rebinding (Env_Node (New_Env), Result.all'Address);
+            Check_Rebindings_Unicity (Result);
+            return Result;
+         end;
+      end Append_Unlocked;
+
+      Result : Env_Rebindings;
+   begin
+      --  Rebindings are shared through the pool of Old_Env and the children
+      --  of Self, which may belong to frozen environments: see Freeze.
+
+      if not Has_Frozen_Envs then
+         return Append_Unlocked;
       end if;
 
-      --  No luck? then create a new rebinding and register it where required
-      declare
-         Result : constant Env_Rebindings := new Env_Rebindings_Type'
-           (Parent   => Self,
-            Old_Env  => Old_Env,
-            New_Env  => New_Env,
-            Children => Env_Rebindings_Vectors.Empty_Vector);
+      Frozen_Envs_Lock.Seize;
       begin
-         if Self /= null then
-            Self.Children.Append (Result);
-         else
-            if Old_Env.Env.Rebindings_Pool = null then
-               Old_Env.Env.Rebindings_Pool := new Env_Rebindings_Pools.Map;
-            end if;
-            Old_Env.Env.Rebindings_Pool.Insert (New_Env, Result);
-         end if;
-
-         Register_Rebinding (Env_Node (Old_Env), Result.all'Address);
-         Register_Rebinding (Env_Node (New_Env), Result.all'Address);
-         Check_Rebindings_Unicity (Result);
-         return Result;
+         Result := Append_Unlocked;
+      exception
+         when others =>
+            Frozen_Envs_Lock.Release;
+            raise;
       end;
+      Frozen_Envs_Lock.Release;
+      return Result;
    end Append;
 
    ----------------------
@@ -359,7 +465,8 @@ package body Langkit_Support.Lexical_Env is
             Map                => new Internal_Envs.Map,
             Rebindings_Pool    => null,
             Lookup_Cache_Valid => True,
-            Lookup_Cache       => Lookup_Cache_Maps.Empty_Map),
+            Lookup_Cache       => Lookup_Cache_Maps.Empty_Map,
+            Frozen             => False),
          Owner => Owner);
    end Create;
 
@@ -465,42 +572,72 @@ package body Langkit_Support.Lexical_Env is
       Self.Env.Lookup_Cache_Valid := False;
    end Reference;
 
-   ---------
-   -- Get --
-   ---------
+   ------------------
+   -- Get_Internal --
+   ------------------
 
-   function Get_Internal
-     (Self          : Lexical_Env;
-      Key           : Symbol_Type;
-      Recursive     : Boolean := True;
-      Rebindings    : Env_Rebindings := null;
-      Metadata      : Element_Metadata := Empty_Metadata)
-      return Lookup_Result_Array
+   procedure Get_Internal
+     (Self       : Lexical_Env;
+      Key        : Symbol_Type;
+      Recursive  : Boolean;
+      Rebindings : Env_Rebindings;
+      Metadata   : Element_Metadata;
+      Results    : in out Lookup_Result_Vector)
    is
-
-      Local_Results      : Lookup_Result_Vector;
-      Current_Rebindings : Env_Rebindings;
-
-      procedure Get_Refd_Elements (Self : in out Referenced_Env);
+      Work : Lookup_Item_Vectors.Vector;
+      --  Stack of lookup items that remain to be processed. The last item is
+      --  the next one to process.
+
+      Locked : Boolean := False;
+      --  Whether we hold the frozen environments lock. Lookups can go through
+      --  frozen environments at any point (the root scope of an analysis
+      --  context inherits from the one of its prelude), so take it for the
+      --  whole lookup.
+
+      procedure Push (Item : Lookup_Item) with Inline;
+      --  Schedule Item for processing
+
+      procedure Process_Lookup_Env (Item : Lookup_Item);
+      procedure Process_Visit_Refd_Envs (Item : Lookup_Item);
+      procedure Process_Visit_Refd_Env (Item : Lookup_Item);
+      procedure Process_Leave_Refd_Env (Item : Lookup_Item);
+      procedure Process_Visit_Parent (Item : Lookup_Item);
+      procedure Process_Finish_Frame (Item : Lookup_Item);
+      --  Process Item, whose kind matches the name of the procedure
 
       procedure Append_Result
         (El         : Internal_Map_Element;
          MD         : Element_Metadata;
          Rebindings : Env_Rebindings);
-      --  Add E to results, if it passes the Can_Reach filter. Return whether
-      --  result was appended or not.
+      --  Add El to Results
 
       use Internal_Envs;
 
-      function Get_Elements (Env : Lexical_Env) return Boolean;
+      function Get_Elements
+        (Env        : Lexical_Env;
+         Metadata   : Element_Metadata;
+         Rebindings : Env_Rebindings) return Boolean;
       --  Lookup for matching elements in Env's internal map and append them to
-      --  Local_Results. Return whether we found some.
+      --  Results. Return whether we found some.
+
+      ----------
+      -- Push --
+      ----------
+
+      procedure Push (Item : Lookup_Item) is
+      begin
+         Work.Append (Item);
+      end Push;
 
       ------------------
       -- Get_Elements --
       ------------------
 
-      function Get_Elements (Env : Lexical_Env) return Boolean is
+      function Get_Elements
+        (Env        : Lexical_Env;
+         Metadata   : Element_Metadata;
+         Rebindings : Env_Rebindings) return Boolean
+      is
          C        : Cursor := Internal_Envs.No_Element;
          Elements : Internal_Map_Element_Vectors.Vector;
       begin
@@ -516,10 +653,7 @@ package body Langkit_Support.Lexical_Env is
 
             --  TODO??? Use "for ... of reverse" next GPL release
             for I in reverse Elements.First_Index .. Elements.Last_Index loop
-               Append_Result
-                 (Elements.Get (I),
-                  Metadata,
-                  Current_Rebindings);
+               Append_Result (Elements.Get (I), Metadata, Rebindings);
             end loop;
             return True;
          end if;
@@ -553,222 +687,397 @@ package body Langkit_Support.Lexical_Env is
                then E
                else El.Resolver.all (E));
          begin
-            Local_Results.Append
+            Results.Append
               (Lookup_Result_Item'(E                    => Resolved_Entity,
                                    Filter_From          => El.Resolver = null,
                                    Override_Filter_Node => No_Element));
          end;
       end Append_Result;
 
-      -----------------------
-      -- Get_Refd_Elements --
-      -----------------------
+      ------------------------
+      -- Process_Lookup_Env --
+      ------------------------
 
-      procedure Get_Refd_Elements (Self : in out Referenced_Env) is
-         Env        : Lexical_Env;
-      begin
-         --  Don't follow the reference environment if either:
-         --   * the node from which this reference starts cannot reach From;
-         --   * the node that created this environment reference is a parent of
-         --     From.
+      procedure Process_Lookup_Env (Item : Lookup_Item) is
+         Self       : Lexical_Env renames Item.Env;
+         Recursive  : Boolean renames Item.Recursive;
+         Rebindings : Env_Rebindings renames Item.Rebindings;
+         Metadata   : Element_Metadata renames Item.Metadata;
 
-         if (not Recursive
-             and then not Self.Is_Transitive)
-           or else Self.Being_Visited
-           or else Self.State = Inactive
-         then
+         Env                : Lexical_Env;
+         Current_Rebindings : Env_Rebindings;
+
+         Res_Key           : constant Lookup_Cache_Key :=
+           (Key, Rebindings, Metadata);
+         Cached_Res_Cursor : Lookup_Cache_Maps.Cursor;
+         Res_Val           : Lookup_Cache_Entry;
+         Inserted, Dummy   : Boolean;
+         Use_Cache         : Boolean;
+         use Lookup_Cache_Maps;
+
+      begin
+         if Self in Null_Lexical_Env | Empty_Env then
             return;
          end if;
 
-         Self.Being_Visited := True;
-         Env := Get_Env (Self.Getter);
+         if Has_Trace then
+            Traces.Trace
+              (Me, "Get_Internal env="
+               & Lexical_Env_Image (Self, Dump_Content => False)
+               & " key = " & Image (Key.all));
+         end if;
 
-         declare
-            Refd_Results : constant Lookup_Result_Array :=
-              Get_Internal
-                (Env, Key,
-                 Recursive  => Recursive and Self.Is_Transitive,
-                 Rebindings =>
-                   (if Self.Is_Transitive
-                    then Current_Rebindings
-                    else Shed_Rebindings (Env, Current_Rebindings)),
-                 Metadata   => Metadata);
-         begin
-            if Self.Getter.Dynamic then
-               for Res of Refd_Results loop
-                  declare
-                     New_Res : Lookup_Result_Item := Res;
-                  begin
-                     New_Res.Override_Filter_Node := Self.Getter.Node;
-                     Local_Results.Append (New_Res);
-                  end;
-               end loop;
-            else
-               Local_Results.Concat (Refd_Results);
-            end if;
-         end;
+         case Self.Kind is
+            when Orphaned =>
+               Push ((Lookup_Env,
+                      Env        => Self.Env.Orphaned_Env,
+                      Recursive  => False,
+                      Rebindings => Rebindings,
+                      Metadata   => Metadata,
+                      others     => <>));
+               return;
 
-         Self.Being_Visited := False;
-         Dec_Ref (Env);
+            when Grouped =>
+               --  Just concatenate lookups for all grouped environments. As
+               --  items are processed in reverse order, push them in reverse
+               --  order.
 
-      exception
-         when others =>
-            --  Make sure that we always Dec_Ref the returned environment so we
-            --  don't leak in case of error.
-            Dec_Ref (Env);
-            Self.Being_Visited := False;
-            raise;
-      end Get_Refd_Elements;
+               declare
+                  MD : constant Element_Metadata :=
+                     Combine (Self.Env.Default_MD, Metadata);
+               begin
+                  for E of reverse Self.Env.Grouped_Envs.all loop
+                     Push ((Lookup_Env,
+                            Env        => E,
+                            Recursive  => Recursive,
+                            Rebindings => Rebindings,
+                            Metadata   => MD,
+                            others     => <>));
+                  end loop;
+               end;
+               return;
 
-      Env : Lexical_Env;
+            when Rebound =>
+               Push ((Lookup_Env,
+                      Env        => Self.Env.Rebound_Env,
+                      Recursive  => Recursive,
+                      Rebindings => Combine (Self.Env.Rebindings, Rebindings),
+                      Metadata   => Metadata,
+                      others     => <>));
+               return;
 
-      Res_Key           : constant Lookup_Cache_Key :=
-        (Key, Rebindings, Metadata);
-      Cached_Res_Cursor : Lookup_Cache_Maps.Cursor;
-      Res_Val           : Lookup_Cache_Entry;
-      Inserted, Dummy   : Boolean;
-      use Lookup_Cache_Maps;
+            when Primary =>
+               null; --  Handled below to avoid extra nesting levels
+         end case;
 
-   begin
-      if Self in Null_Lexical_Env | Empty_Env then
-         return Empty_Lookup_Result_Array;
-      end if;
+         --  At this point, we know that Self is a primary lexical environment.
+         --  See the Frozen component for the restrictions on the lookup cache
+         --  of frozen environments.
 
-      if Has_Trace then
-         Traces.Trace
-           (Me, "Get_Internal env="
-            & Lexical_Env_Image (Self, Dump_Content => False)
-            & " key = " & Image (Key.all));
-      end if;
+         Use_Cache := Recursive
+                      and then (not Self.Env.Frozen
+                                or else (Rebindings = null
+                                         and then Metadata = Empty_Metadata));
 
-      case Self.Kind is
-         when Orphaned => null;
-            return Get_Internal
-              (Self.Env.Orphaned_Env, Key, False, Rebindings, Metadata);
+         if Use_Cache then
+
+            if not Is_Lookup_Cache_Valid (Self) then
+               Reset_Lookup_Cache (Self);
+            end if;
 
-         when Grouped =>
-            --  Just concatenate lookups for all grouped environments
             declare
-               MD : constant Element_Metadata :=
-                  Combine (Self.Env.Default_MD, Metadata);
+               Val : constant Lookup_Cache_Entry :=
+                 (Computing, Empty_Lookup_Result_Vector);
             begin
-               for E of Self.Env.Grouped_Envs.all loop
-                  Local_Results.Concat (Get_Internal
-                    (E, Key, Recursive, Rebindings, MD));
-               end loop;
+               Self.Env.Lookup_Cache.Insert
+                 (Res_Key, Val, Cached_Res_Cursor, Inserted);
             end;
 
-            return R : constant Lookup_Result_Array := Local_Results.To_Array
-            do
-               Local_Results.Destroy;
-            end return;
-
-         when Rebound =>
-            return Get_Internal
-              (Self.Env.Rebound_Env, Key, Recursive,
-               Combine (Self.Env.Rebindings, Rebindings),
-               Metadata);
-
-         when Primary => null; --  Handled below to avoid extra nesting levels
-      end case;
+            if not Inserted then
+               Res_Val := Element (Cached_Res_Cursor);
+
+               case Res_Val.State is
+               when Computing => return;
+               when Computed =>
+                  for R of Res_Val.Elements loop
+                     Results.Append (R);
+                  end loop;
+                  return;
+               when None => null;
+               end case;
+            end if;
+         end if;
 
-      --  At this point, we know that Self is a primary lexical environment
+         --  If there is an environment corresponding to Self in env
+         --  rebindings, we'll get it here. We'll also shed it from the set of
+         --  current rebindings.
 
-      if Recursive then
+         Current_Rebindings := Rebindings;
+         Env := Extract_Rebinding (Current_Rebindings, Self);
 
-         if not Is_Lookup_Cache_Valid (Self) then
-            Reset_Lookup_Cache (Self);
-         end if;
+         --  Schedule the completion of this lookup (release of Env and
+         --  caching of its results) first so that it is processed last.
 
-         declare
-            Val : constant Lookup_Cache_Entry :=
-              (Computing, Empty_Lookup_Result_Vector);
-         begin
-            Self.Env.Lookup_Cache.Insert
-              (Res_Key, Val, Cached_Res_Cursor, Inserted);
-         end;
+         Push ((Finish_Frame,
+                Env          => Self,
+                Recursive    => Use_Cache,
+                Extracted    => Env,
+                Cache_Key    => Res_Key,
+                First_Result => Results.Length + 1,
+                others       => <>));
 
-         if not Inserted then
-            Res_Val := Element (Cached_Res_Cursor);
+         --  Phase 1: Get elements in own env if there are any
 
-            case Res_Val.State is
-            when Computing => return Empty_Lookup_Result_Array;
-            when Computed => return Res_Val.Elements.To_Array;
-            when None => null;
-            end case;
+         if not Get_Elements (Env, Metadata, Current_Rebindings)
+           and then Env /= Self
+         then
+            Dummy := Get_Elements (Self, Metadata, Current_Rebindings);
          end if;
-      end if;
 
-      --  If there is an environment corresponding to Self in env rebindings,
-      --  we'll get it here. We'll also shed it from the set of current
-      --  rebindings.
+         --  Then schedule the following phases, in reverse order:
+         --
+         --  Phase 2: Get elements in transitive referenced envs
+         --  Phase 3: Get elements in parent envs
+         --  Phase 4: Get elements in non transitive referenced envs
+
+         Push ((Visit_Refd_Envs,
+                Env        => Self,
+                Recursive  => Recursive,
+                Rebindings => Current_Rebindings,
+                Metadata   => Metadata,
+                Transitive => False,
+                others     => <>));
+
+         if Recursive or Self.Env.Transitive_Parent then
+            Push ((Visit_Parent,
+                   Env        => Self,
+                   Rebindings => Current_Rebindings,
+                   Metadata   => Metadata,
+                   Extracted  => Env,
+                   others     => <>));
+         end if;
 
-      Current_Rebindings := Rebindings;
-      Env := Extract_Rebinding (Current_Rebindings, Self);
+         Push ((Visit_Refd_Envs,
+                Env        => Self,
+                Recursive  => Recursive,
+                Rebindings => Current_Rebindings,
+                Metadata   => Metadata,
+                Transitive => True,
+                others     => <>));
+      end Process_Lookup_Env;
+
+      -----------------------------
+      -- Process_Visit_Refd_Envs --
+      -----------------------------
+
+      procedure Process_Visit_Refd_Envs (Item : Lookup_Item) is
+         Refs : Referenced_Envs_Vectors.Vector renames
+            Item.Env.Env.Referenced_Envs;
+      begin
+         --  Schedule the visit of all referenced envs, in reverse order so
+         --  that they are processed in order. Whether each one must be visited
+         --  is determined only when it is processed.
+
+         for I in reverse Refs.First_Index .. Refs.Last_Index loop
+            Push ((Visit_Refd_Env,
+                   Env        => Item.Env,
+                   Recursive  => Item.Recursive,
+                   Rebindings => Item.Rebindings,
+                   Metadata   => Item.Metadata,
+                   Ref_Index  => I,
+                   Transitive => Item.Transitive,
+                   others     => <>));
+         end loop;
+      end Process_Visit_Refd_Envs;
 
-      --  Phase 1: Get elements in own env if there are any
+      ----------------------------
+      -- Process_Visit_Refd_Env --
+      ----------------------------
 
-      if not Get_Elements (Env) and then Env /= Self then
-         Dummy := Get_Elements (Self);
-      end if;
+      procedure Process_Visit_Refd_Env (Item : Lookup_Item) is
+         Self : constant Referenced_Envs_Vectors.Element_Access :=
+            Item.Env.Env.Referenced_Envs.Get_Access (Item.Ref_Index);
+         Env  : Lexical_Env;
+      begin
+         if Self.Is_Transitive /= Item.Transitive then
+            return;
+         end if;
 
-      --  Phase 2: Get elements in transitive referenced envs
+         --  Don't follow the reference environment if either:
+         --   * the node from which this reference starts cannot reach From;
+         --   * the node that created this environment reference is a parent of
+         --     From.
 
-      for I in Self.Env.Referenced_Envs.First_Index
-            .. Self.Env.Referenced_Envs.Last_Index
-      loop
-         if Self.Env.Referenced_Envs.Get_Access (I).Is_Transitive then
-            Get_Refd_Elements (Self.Env.Referenced_Envs.Get_Access (I).all);
+         if (not Item.Recursive
+             and then not Self.Is_Transitive)
+           or else Self.Being_Visited
+           or else Self.State = Inactive
+         then
+            return;
          end if;
-      end loop;
 
-      --  Phase 3: Get elements in parent envs
-
-      if Recursive or Self.Env.Transitive_Parent then
-         declare
-            Parent_Env        : Lexical_Env := Parent (Self);
-            Parent_Rebindings : constant Env_Rebindings :=
-              (if Env /= Self
-               then Shed_Rebindings (Parent_Env, Current_Rebindings)
-               else Current_Rebindings);
+         Self.Being_Visited := True;
          begin
-            Local_Results.Concat
-              (Get_Internal
-                 (Parent_Env, Key, True,
-                  Parent_Rebindings,
-                  Metadata));
-
-            Dec_Ref (Parent_Env);
+            Env := Get_Env (Self.Getter);
+         exception
+            when others =>
+               Self.Being_Visited := False;
+               raise;
          end;
-      end if;
 
-      --  Phase 4: Get elements in non transitive referenced envs
+         --  Schedule the end of the visit (reset of the recursion guard and
+         --  release of Env) right after the lookup in Env itself.
+
+         Push ((Leave_Refd_Env,
+                Env          => Item.Env,
+                Ref_Index    => Item.Ref_Index,
+                Refd_Env     => Env,
+                First_Result => Results.Length + 1,
+                others       => <>));
+         Push ((Lookup_Env,
+                Env        => Env,
+                Recursive  => Item.Recursive and Self.Is_Transitive,
+                Rebindings =>
+                  (if Self.Is_Transitive
+                   then Item.Rebindings
+                   else Shed_Rebindings (Env, Item.Rebindings)),
+                Metadata   => Item.Metadata,
+                others     => <>));
+      end Process_Visit_Refd_Env;
+
+      ----------------------------
+      -- Process_Leave_Refd_Env --
+      ----------------------------
+
+      procedure Process_Leave_Refd_Env (Item : Lookup_Item) is
+         Self : constant Referenced_Envs_Vectors.Element_Access :=
+            Item.Env.Env.Referenced_Envs.Get_Access (Item.Ref_Index);
+         Env  : Lexical_Env := Item.Refd_Env;
+      begin
+         if Self.Getter.Dynamic then
+            for I in Item.First_Result .. Results.Last_Index loop
+               Results.Get_Access (I).Override_Filter_Node :=
+                  Self.Getter.Node;
+            end loop;
+         end if;
 
-      for I in Self.Env.Referenced_Envs.First_Index
-            .. Self.Env.Referenced_Envs.Last_Index
-      loop
-         if not Self.Env.Referenced_Envs.Get_Access (I).Is_Transitive then
-            Get_Refd_Elements (Self.Env.Referenced_Envs.Get_Access (I).all);
+         Self.Being_Visited := False;
+         Dec_Ref (Env);
+      end Process_Leave_Refd_Env;
+
+      --------------------------
+      -- Process_Visit_Parent --
+      --------------------------
+
+      procedure Process_Visit_Parent (Item : Lookup_Item) is
+         Parent_Env        : constant Lexical_Env := Parent (Item.Env);
+         Parent_Rebindings : constant Env_Rebindings :=
+           (if Item.Extracted /= Item.Env
+            then Shed_Rebindings (Parent_Env, Item.Rebindings)
+            else Item.Rebindings);
+      begin
+         Push ((Release_Env, Env => Parent_Env, others => <>));
+         Push ((Lookup_Env,
+                Env        => Parent_Env,
+                Recursive  => True,
+                Rebindings => Parent_Rebindings,
+                Metadata   => Item.Metadata,
+                others     => <>));
+      end Process_Visit_Parent;
+
+      --------------------------
+      -- Process_Finish_Frame --
+      --------------------------
+
+      procedure Process_Finish_Frame (Item : Lookup_Item) is
+         Env : Lexical_Env := Item.Extracted;
+      begin
+         Dec_Ref (Env);
+
+         if Item.Recursive then
+            declare
+               Val : Lookup_Cache_Entry :=
+                 (Computed, Empty_Lookup_Result_Vector);
+            begin
+               for I in Item.First_Result .. Results.Last_Index loop
+                  Val.Elements.Append (Results.Get (I));
+               end loop;
+               Item.Env.Env.Lookup_Cache.Include (Item.Cache_Key, Val);
+            end;
          end if;
-      end loop;
+      end Process_Finish_Frame;
 
-      Dec_Ref (Env);
+   begin
+      if Has_Frozen_Envs then
+         Frozen_Envs_Lock.Seize;
+         Locked := True;
+      end if;
+
+      Push ((Lookup_Env,
+             Env        => Self,
+             Recursive  => Recursive,
+             Rebindings => Rebindings,
+             Metadata   => Metadata,
+             others     => <>));
 
-      if Recursive then
+      while Work.Length > 0 loop
          declare
-            Val : constant Lookup_Cache_Entry := (Computed, Local_Results);
+            Item : constant Lookup_Item := Work.Pop;
          begin
-            Self.Env.Lookup_Cache.Include (Res_Key, Val);
+            case Item.Kind is
+               when Lookup_Env      => Process_Lookup_Env (Item);
+               when Visit_Refd_Envs => Process_Visit_Refd_Envs (Item);
+               when Visit_Refd_Env  => Process_Visit_Refd_Env (Item);
+               when Leave_Refd_Env  => Process_Leave_Refd_Env (Item);
+               when Visit_Parent    => Process_Visit_Parent (Item);
+               when Finish_Frame    => Process_Finish_Frame (Item);
+               when Release_Env     =>
+                  declare
+                     Env : Lexical_Env := Item.Env;
+                  begin
+                     Dec_Ref (Env);
+                  end;
+            end case;
          end;
+      end loop;
 
-         return Local_Results.To_Array;
-      else
-         return R : constant Lookup_Result_Array := Local_Results.To_Array
-         do
-            Local_Results.Destroy;
-         end return;
+      Work.Destroy;
+      if Locked then
+         Frozen_Envs_Lock.Release;
       end if;
 
+   exception
+      when others =>
+         --  Make sure that we always reset recursion guards and Dec_Ref the
+         --  environments we hold, so that we don't leak in case of error.
+
+         while Work.Length > 0 loop
+            declare
+               Item : constant Lookup_Item := Work.Pop;
+               Env  : Lexical_Env;
+            begin
+               case Item.Kind is
+                  when Leave_Refd_Env =>
+                     Item.Env.Env.Referenced_Envs.Get_Access
+                       (Item.Ref_Index).Being_Visited := False;
+                     Env := Item.Refd_Env;
+                     Dec_Ref (Env);
+                  when Release_Env =>
+                     Env := Item.Env;
+                     Dec_Ref (Env);
+                  when Finish_Frame =>
+                     Env := Item.Extracted;
+                     Dec_Ref (Env);
+                  when others =>
+                     null;
+               end case;
+            end;
+         end loop;
+         Work.Destroy;
+         if Locked then
+            Frozen_Envs_Lock.Release;
+         end if;
+         raise;
    end Get_Internal;
 
    ---------
@@ -792,9 +1101,9 @@ package body Langkit_Support.Lexical_Env is
       end if;
 
       declare
-         Results : constant Lookup_Result_Array :=
-            Get_Internal (Self, Key, Recursive, null, Empty_Metadata);
+         Results : Lookup_Result_Vector;
       begin
+         Get_Internal (Self, Key, Recursive, null, Empty_Metadata, Results);
          for El of Results loop
             if From = No_Element
               or else (if El.Override_Filter_Node /= No_Element
@@ -805,6 +1114,7 @@ package body Langkit_Support.Lexical_Env is
                FV.Append (El.E);
             end if;
          end loop;
+         Results.Destroy;
 
          if Has_Trace then
             Traces.Trace
@@ -841,9 +1151,9 @@ package body Langkit_Support.Lexical_Env is
       end if;
 
       declare
-         V : constant Lookup_Result_Array :=
-           Get_Internal (Self, Key, Recursive, null, Empty_Metadata);
+         V : Lookup_Result_Vector;
       begin
+         Get_Internal (Self, Key, Recursive, null, Empty_Metadata, V);
 
          for El of V loop
             if From = No_Element
@@ -855,6 +1165,7 @@ package body Langkit_Support.Lexical_Env is
                FV.Append (El.E);
             end if;
          end loop;
+         V.Destroy;
 
          if Has_Trace then
             Traces.Trace
@@ -1657,8 +1968,27 @@ package body Langkit_Support.Lexical_Env is
       case Self.Kind is
          when Primary =>
             declare
-               Ret : constant Lexical_Env := Get_Env (Self.Env.Parent);
+               Frozen : constant Boolean := Self.Env.Frozen;
+               Ret    : Lexical_Env;
             begin
+               --  Getting the parent of a frozen environment may resolve and
+               --  cache its dynamic parent link: see Freeze.
+
+               if Frozen then
+                  Frozen_Envs_Lock.Seize;
+               end if;
+               begin
+                  Ret := Get_Env (Self.Env.Parent);
+               exception
+                  when others =>
+                     if Frozen then
+                        Frozen_Envs_Lock.Release;
+                     end if;
+                     raise;
+               end;
+               if Frozen then
+                  Frozen_Envs_Lock.Release;
+               end if;
                return (if Ret = Null_Lexical_Env then Empty_Env else Ret);
             end;
          when Orphaned =>
@@ -1728,6 +2058,46 @@ package body Langkit_Support.Lexical_Env is
       end loop;
    end Recompute_Referenced_Envs;
 
+   ------------
+   -- Freeze --
+   ------------
+
+   procedure Freeze (Self : Lexical_Env) is
+   begin
+      if Self in Null_Lexical_Env | Empty_Env then
+         return;
+      end if;
+
+      --  Lookups with rebindings or metadata will not use the lookup cache
+      --  anymore: get rid of the results it already contains.
+
+      Reset_Lookup_Cache (Self);
+      Self.Env.Frozen := True;
+      Has_Frozen_Envs := True;
+   end Freeze;
+
+   ----------------------
+   -- Lock_Frozen_Envs --
+   ----------------------
+
+   procedure Lock_Frozen_Envs is
+   begin
+      if Has_Frozen_Envs then
+         Frozen_Envs_Lock.Seize;
+      end if;
+   end Lock_Frozen_Envs;
+
+   ------------------------
+   -- Unlock_Frozen_Envs --
+   ------------------------
+
+   procedure Unlock_Frozen_Envs is
+   begin
+      if Has_Frozen_Envs then
+         Frozen_Envs_Lock.Release;
+      end if;
+   end Unlock_Frozen_Envs;
+
    --------------
    -- Is_Stale --
    --------------
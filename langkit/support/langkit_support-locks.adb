@@ -0,0 +1,46 @@
+package body Langkit_Support.Locks is
+
+   --------------------
+   -- Reentrant_Lock --
+   --------------------
+
+   protected body Reentrant_Lock is
+
+      -----------
+      -- Seize --
+      -----------
+
+      entry Seize when True is
+      begin
+         if Depth > 0 and then Owner = Seize'Caller then
+            Depth := Depth + 1;
+         else
+            requeue Wait_Release;
+         end if;
+      end Seize;
+
+      -------------
+      -- Release --
+      -------------
+
+      procedure Release is
+      begin
+         Depth := Depth - 1;
+         if Depth = 0 then
+            Owner := Null_Task_Id;
+         end if;
+      end Release;
+
+      ------------------
+      -- Wait_Release --
+      ------------------
+
+      entry Wait_Release when Depth = 0 is
+      begin
+         Owner := Wait_Release'Caller;
+         Depth := 1;
+      end Wait_Release;
+
+   end Reentrant_Lock;
+
+end Langkit_Support.Locks;
@@ -6,7 +6,13 @@ with System.Storage_Elements; use System.Storage_Elements;
 package body Langkit_Support.Symbols is
 
    procedure Deallocate is new Ada.Unchecked_Deallocation
-     (Sets.Set, Symbol_Table);
+     (Symbol_Table_Type, Symbol_Table);
+
+   function Find_Unlocked
+     (ST     : Symbol_Table;
+      T      : Text_Type;
+      Create : Boolean) return Symbol_Type;
+   --  Implementation of Find, without locking
 
    ------------
    -- Create --
@@ -14,23 +20,22 @@ package body Langkit_Support.Symbols is
 
    function Create return Symbol_Table is
    begin
-      return new Sets.Set;
+      return new Symbol_Table_Type;
    end Create;
 
-   ----------
-   -- Find --
-   ----------
+   -------------------
+   -- Find_Unlocked --
+   -------------------
 
-   function Find
+   function Find_Unlocked
      (ST     : Symbol_Table;
       T      : Text_Type;
-      Create : Boolean := True)
-      return Symbol_Type
+      Create : Boolean) return Symbol_Type
    is
       use Sets;
 
       T_Acc  : Symbol_Type := T'Unrestricted_Access;
-      Result : constant Cursor := ST.Find (T_Acc);
+      Result : constant Cursor := ST.Symbols.Find (T_Acc);
    begin
       --  If we already have such a symbol, return the access we already
       --  internalized. Otherwise, give up if asked to.
@@ -44,17 +49,54 @@ package body Langkit_Support.Symbols is
       --  At this point, we know we have to internalize a new symbol
 
       T_Acc := new Text_Type'(T);
-      ST.Insert (T_Acc);
+      ST.Symbols.Insert (T_Acc);
       return T_Acc;
+   end Find_Unlocked;
+
+   ----------
+   -- Find --
+   ----------
+
+   function Find
+     (ST     : Symbol_Table;
+      T      : Text_Type;
+      Create : Boolean := True)
+      return Symbol_Type is
+   begin
+      if not ST.Shared then
+         return Find_Unlocked (ST, T, Create);
+      end if;
+
+      ST.Lock.Seize;
+      declare
+         Result : Symbol_Type;
+      begin
+         Result := Find_Unlocked (ST, T, Create);
+         ST.Lock.Release;
+         return Result;
+      exception
+         when others =>
+            ST.Lock.Release;
+            raise;
+      end;
    end Find;
 
+   -----------
+   -- Share --
+   -----------
+
+   procedure Share (ST : Symbol_Table) is
+   begin
+      ST.Shared := True;
+   end Share;
+
    -------------
    -- Destroy --
    -------------
 
    procedure Destroy (ST : in out Symbol_Table) is
       use Sets;
-      C : Cursor := ST.First;
+      C : Cursor := ST.Symbols.First;
    begin
       while Has_Element (C) loop
          declare
@@ -1,5 +1,10 @@
+with Ada.Unchecked_Deallocation;
+
 package body Langkit_Support.Token_Data_Handlers is
 
+   procedure Free is new Ada.Unchecked_Deallocation
+     (Line_Cache, Line_Cache_Access);
+
    function Internal_Get_Trivias
      (TDH   : Token_Data_Handler;
       Index : Token_Index) return Token_Index_Vectors.Elements_Array;
@@ -17,7 +22,9 @@ package body Langkit_Support.Token_Data_Handlers is
               Tokens            => <>,
               Symbols           => Symbols,
               Tokens_To_Trivias => <>,
-              Trivias           => <>);
+              Trivias           => <>,
+              Line_Starts       => <>,
+              Last_Line         => new Line_Cache);
    end Initialize;
 
    -----------
@@ -39,6 +46,20 @@ package body Langkit_Support.Token_Data_Handlers is
       Clear (TDH.Tokens);
       Clear (TDH.Trivias);
       Clear (TDH.Tokens_To_Trivias);
+
+      if TDH.Last_Line = null then
+         TDH.Last_Line := new Line_Cache;
+      else
+         TDH.Last_Line.Line := 1;
+      end if;
+
+      Clear (TDH.Line_Starts);
+      Append (TDH.Line_Starts, Source_First);
+      for I in Source_First .. Source_Last loop
+         if Source_Buffer (I) = Wide_Wide_Character'Val (10) then
+            Append (TDH.Line_Starts, I + 1);
+         end if;
+      end loop;
    end Reset;
 
    ----------
@@ -51,9 +72,70 @@ package body Langkit_Support.Token_Data_Handlers is
       Destroy (TDH.Tokens);
       Destroy (TDH.Trivias);
       Destroy (TDH.Tokens_To_Trivias);
+      Destroy (TDH.Line_Starts);
+      Free (TDH.Last_Line);
       TDH.Symbols := No_Symbol_Table;
    end Free;
 
+   ---------------------
+   -- Get_Line_Number --
+   ---------------------
+
+   function Get_Line_Number
+     (TDH   : Token_Data_Handler;
+      Index : Positive) return Line_Number
+   is
+      Last_Line : constant Positive := Last_Index (TDH.Line_Starts);
+
+      function Contains (Line : Positive) return Boolean is
+        (Get (TDH.Line_Starts, Line) <= Index
+         and then (Line = Last_Line
+                   or else Get (TDH.Line_Starts, Line + 1) > Index));
+      --  Return whether Index belongs to Line
+
+      First : Positive := First_Index (TDH.Line_Starts);
+      Last  : Positive := Last_Line;
+   begin
+      --  First check the line we found last time and the next one: this
+      --  covers most lookups.
+
+      if TDH.Last_Line /= null then
+         declare
+            Hint : Positive renames TDH.Last_Line.Line;
+         begin
+            if Hint <= Last_Line then
+               if Contains (Hint) then
+                  return Line_Number (Hint);
+               elsif Hint < Last_Line and then Contains (Hint + 1) then
+                  Hint := Hint + 1;
+                  return Line_Number (Hint);
+               end if;
+            end if;
+         end;
+      end if;
+
+      --  Otherwise, look for the last line that starts at or before Index. As
+      --  the first line starts at Source_First, the answer is in First ..
+      --  Last.
+
+      while First < Last loop
+         declare
+            Middle : constant Positive := (First + Last + 1) / 2;
+         begin
+            if Get (TDH.Line_Starts, Middle) <= Index then
+               First := Middle;
+            else
+               Last := Middle - 1;
+            end if;
+         end;
+      end loop;
+
+      if TDH.Last_Line /= null then
+         TDH.Last_Line.Line := First;
+      end if;
+      return Line_Number (First);
+   end Get_Line_Number;
+
    --------------------------
    -- Internal_Get_Trivias --
    --------------------------
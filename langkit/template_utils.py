@@ -1,8 +1,10 @@
 from __future__ import absolute_import, division, print_function
 
+import hashlib
 import os.path
 import sys
 
+import mako
 import mako.exceptions
 from mako.lookup import TemplateLookup
 
@@ -43,12 +45,64 @@ _template_dirs = []
 _template_lookup = None
 ":type: mako.utils.TemplateLookup"
 
+_template_cache_dir = None
+"""
+Directory in which to store compiled templates, if any.
 
-def add_template_dir(path):
+:type: str|None
+"""
+
+
+def _template_module_name(filename, uri):
+    """
+    Return the name of the file in which to store the Python module compiled
+    for the `filename` template.
+
+    This name contains a hash of the template content and of the Mako version,
+    so that a compiled module is reused only for the very same template, even
+    when extension template directories override templates.
+
+    :param str filename: Path to the template source file.
+    :param str uri: Template URI (unused).
+    :rtype: str
+    """
+    del uri
+    with open(filename, 'rb') as f:
+        digest = hashlib.md5(f.read())
+    digest.update(mako.__version__.encode('ascii'))
+    basename = os.path.splitext(os.path.basename(filename))[0]
+    return os.path.join(_template_cache_dir,
+                        '{}-{}.py'.format(basename, digest.hexdigest()))
+
+
+def _create_template_lookup():
     global _template_lookup
-    _template_dirs.append(path)
+    kwargs = {}
+    if _template_cache_dir:
+        kwargs = {'module_directory': _template_cache_dir,
+                  'modulename_callable': _template_module_name}
     _template_lookup = TemplateLookup(directories=_template_dirs,
-                                      strict_undefined=True)
+                                      strict_undefined=True,
+                                      **kwargs)
+
+
+def add_template_dir(path):
+    _template_dirs.append(path)
+    _create_template_lookup()
+
+
+def set_template_cache_dir(path):
+    """
+    Store compiled templates in the `path` directory, so that later runs can
+    load them instead of compiling templates again. If `path` is None, do not
+    store compiled templates at all.
+
+    :param str|None path: Directory for compiled templates. It is created if
+        needed.
+    """
+    global _template_cache_dir
+    _template_cache_dir = path
+    _create_template_lookup()
 
 
 add_template_dir(os.path.join(os.path.dirname(os.path.realpath(__file__)),
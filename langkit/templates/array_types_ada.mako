@@ -33,7 +33,8 @@
 
    function Create (Items_Count : Natural) return ${cls.name};
    --  Create a new array for N uninitialized elements and give its only
-   --  ownership share to the caller.
+   --  ownership share to the caller. All empty arrays share the same
+   --  statically allocated record, so creating them allocates nothing.
 
    ## Helper getter generated for properties code. Used in CollectionGet's code
    function Get
@@ -46,6 +47,8 @@
 
    ## Helper getter generated for properties code. Used in CollectionGet's code
    function Concat (L, R : ${cls.name}) return ${cls.name};
+   --  Return the concatenation of L and R. As arrays are never modified once
+   --  built, the result shares L's or R's storage when the other is empty.
 
    ## Helper for properties code
    function Length (T : ${cls.name}) return Natural;
@@ -68,12 +71,22 @@
 
 <%def name="body(cls)">
 
-   <% elt_type = cls.element_type.name %>
+   <%
+      elt_type = cls.element_type.name
+      empty_record = Name('Empty') + cls.pointed
+      empty_array = Name('Empty') + cls.name
+   %>
 
    % if cls.element_type != ctx.root_grammar_class:
       package ${cls.pkg_vector} is new Langkit_Support.Vectors (${elt_type});
    % endif
 
+   ${empty_record} : aliased ${cls.pointed} :=
+     (N => 0, Ref_Count => 1, Items => (others => <>));
+   ${empty_array} : constant ${cls.name} := ${empty_record}'Access;
+   --  Array returned by all calls to Create for empty arrays. Inc_Ref and
+   --  Dec_Ref ignore it, so that it is never deallocated.
+
    ---------
    -- Get --
    ---------
@@ -114,8 +127,17 @@
    ------------
 
    function Concat (L, R : ${cls.name}) return ${cls.name} is
-      Ret : ${cls.name} := Create (Length (L) + Length (R));
+      Ret : ${cls.name};
    begin
+      if Length (L) = 0 then
+         Inc_Ref (R);
+         return R;
+      elsif Length (R) = 0 then
+         Inc_Ref (L);
+         return L;
+      end if;
+
+      Ret := Create (Length (L) + Length (R));
       Ret.Items := (L.Items & R.Items);
       % if cls.element_type.is_refcounted:
          for Item of Ret.Items loop
@@ -131,7 +153,9 @@
 
    procedure Inc_Ref (T : ${cls.name}) is
    begin
-      T.Ref_Count := T.Ref_Count + 1;
+      if T /= ${empty_array} then
+         T.Ref_Count := T.Ref_Count + 1;
+      end if;
    end Inc_Ref;
 
    ------------
@@ -148,6 +172,9 @@
    begin
       if T = null then
          return;
+      elsif T = ${empty_array} then
+         T := null;
+         return;
       end if;
 
       if T.Ref_Count = 1 then
@@ -170,14 +197,19 @@
    ------------
 
    function Create (Items_Count : Natural) return ${cls.name} is
-     (new ${cls.pointed}'(N => Items_Count, Ref_Count => 1, Items => <>));
+     (if Items_Count = 0
+      then ${empty_array}
+      else new ${cls.pointed}'
+             (N => Items_Count, Ref_Count => 1, Items => <>));
 
    % if cls.element_type == T.root_node.entity:
    function Create (Items : AST_Envs.Entity_Array) return ${cls.name}
-   is (new ${cls.pointed}'
-         (N         => Items'Length,
-          Items     => Implementation.${cls.array_type_name} (Items),
-          Ref_Count => 1));
+   is (if Items'Length = 0
+       then ${empty_array}
+       else new ${cls.pointed}'
+              (N         => Items'Length,
+               Items     => Implementation.${cls.array_type_name} (Items),
+               Ref_Count => 1));
    % else:
    pragma Warnings (Off, "referenced");
    function Create (Items : ${cls.array_type_name}) return ${cls.name} is
@@ -187,6 +219,9 @@
             Inc_Ref (El);
          end loop;
       % endif
+      if Items'Length = 0 then
+         return ${empty_array};
+      end if;
       return
         new ${cls.pointed}'(N => Items'Length, Ref_Count => 1, Items => Items);
    end Create;
@@ -184,8 +184,9 @@
    % if not cls.abstract:
 
       % if ctx.generate_pp:
-      overriding function PP
-        (Node : access ${type_name}) return String;
+      overriding procedure Unparse
+        (Node   : access ${type_name};
+         Output : in out Unparsing_Output'Class);
       % endif
 
    % endif
@@ -289,11 +290,12 @@
    % if not cls.abstract:
 
       % if ctx.generate_pp:
-      overriding function PP (Node : access ${type_name}) return String
-      is
+      overriding procedure Unparse
+        (Node   : access ${type_name};
+         Output : in out Unparsing_Output'Class) is
       begin
-         ${pretty_printers.pretty_printer(cls)}
-      end PP;
+         ${pretty_printers.unparser(cls)}
+      end Unparse;
       % endif
 
    % endif
@@ -6,7 +6,10 @@
 <%namespace name="enum_types"    file="enum_types_c.mako" />
 <%namespace name="exts" file="../extensions.mako" />
 
-<% entity_type = root_entity.c_type(capi).name %>
+<%
+   entity_type = root_entity.c_type(capi).name
+   entity_array_type = T.entity.array.c_type(capi).name
+%>
 
 #ifndef ${capi.header_guard_id}
 #define ${capi.header_guard_id}
@@ -204,6 +207,17 @@ ${capi.get_name("context_discard_errors_in_populate_lexical_env")}(
         ${analysis_context_type} context,
         int discard);
 
+${c_doc('langkit.context_set_ast_cache_directory')}
+extern void
+${capi.get_name("context_set_ast_cache_directory")}(
+        ${analysis_context_type} context,
+        const char *directory);
+
+${c_doc('langkit.context_dump_memoization_statistics')}
+extern void
+${capi.get_name("context_dump_memoization_statistics")}(
+        ${analysis_context_type} context);
+
 ${c_doc('langkit.destroy_context')}
 extern void
 ${capi.get_name("destroy_analysis_context")}(
@@ -235,6 +249,11 @@ ${capi.get_name("get_analysis_unit_from_provider")}(
         ${unit_kind_type} kind,
         const char *charset,
         int reparse);
+
+${c_doc('langkit.invalidate_unit_provider_cache')}
+extern void
+${capi.get_name("context_invalidate_unit_provider_cache")}(
+        ${analysis_context_type} context);
 % endif
 
 ${c_doc('langkit.remove_unit')}
@@ -247,6 +266,13 @@ extern void
 ${capi.get_name("unit_root")}(${analysis_unit_type} unit,
                               ${entity_type} *result_p);
 
+${c_doc('langkit.unit_nodes_of_kind')}
+extern void
+${capi.get_name("unit_nodes_of_kind")}(${analysis_unit_type} unit,
+                                       ${node_kind_type} first_kind,
+                                       ${node_kind_type} last_kind,
+                                       ${entity_array_type} *result_p);
+
 ${c_doc('langkit.unit_first_token')}
 extern void
 ${capi.get_name('unit_first_token')}(${analysis_unit_type} unit,
@@ -455,6 +481,13 @@ ${capi.get_name('token_range_text')}(${token_type} *first,
                                      ${token_type} *last,
                                      ${text_type} *result);
 
+${c_doc('langkit.token_range_fill')}
+extern int
+${capi.get_name('token_range_fill')}(${token_type} *first,
+                                     ${token_type} *last,
+                                     ${token_type} *tokens,
+                                     int size);
+
 ${c_doc('langkit.token_is_equivalent')}
 extern void
 ${capi.get_name('token_is_equivalent')}(${token_type} *left,
@@ -25,6 +25,7 @@ with Langkit_Support.Extensions;  use Langkit_Support.Extensions;
 with Langkit_Support.Text;        use Langkit_Support.Text;
 
 with ${ada_lib_name}.Analysis; use ${ada_lib_name}.Analysis;
+with ${ada_lib_name}.Debug;
 with ${ada_lib_name}.Lexer;    use ${ada_lib_name}.Lexer;
 
 ${exts.with_clauses(with_clauses)}
@@ -140,6 +141,23 @@ package body ${ada_lib_name}.Analysis.Implementation.C is
       Discard_Errors_In_Populate_Lexical_Env (C, Discard /= 0);
    end;
 
+   procedure ${capi.get_name("context_set_ast_cache_directory")}
+     (Context   : ${analysis_context_type};
+      Directory : chars_ptr)
+   is
+      C : constant Analysis_Context := Unwrap (Context);
+   begin
+      Set_AST_Cache_Directory (C, Value (Directory));
+   end;
+
+   procedure ${capi.get_name("context_dump_memoization_statistics")}
+     (Context : ${analysis_context_type})
+   is
+      C : constant Analysis_Context := Unwrap (Context);
+   begin
+      Debug.Dump_Memoization_Statistics (C);
+   end;
+
    procedure ${capi.get_name("destroy_analysis_context")}
      (Context : ${analysis_context_type})
    is
@@ -239,6 +257,21 @@ package body ${ada_lib_name}.Analysis.Implementation.C is
             Set_Last_Exception (Exc);
             return ${analysis_unit_type} (System.Null_Address);
       end;
+
+      procedure ${capi.get_name('context_invalidate_unit_provider_cache')}
+        (Context : ${analysis_context_type}) is
+      begin
+         Clear_Last_Exception;
+
+         declare
+            C : constant Analysis_Context := Unwrap (Context);
+         begin
+            Invalidate_Unit_Provider_Cache (C);
+         end;
+      exception
+         when Exc : others =>
+            Set_Last_Exception (Exc);
+      end;
    % endif
 
    function ${capi.get_name("remove_analysis_unit")}
@@ -280,6 +313,35 @@ package body ${ada_lib_name}.Analysis.Implementation.C is
          Set_Last_Exception (Exc);
    end;
 
+   procedure ${capi.get_name('unit_nodes_of_kind')}
+     (Unit       : ${analysis_unit_type};
+      First_Kind : ${node_kind_type};
+      Last_Kind  : ${node_kind_type};
+      Result_P   : access ${T.entity.array.name}) is
+   begin
+      Clear_Last_Exception;
+
+      declare
+         U      : constant Analysis_Unit := Unwrap (Unit);
+         First  : constant ${root_node_kind_name} :=
+            ${root_node_kind_name}'Enum_Val (First_Kind);
+         Last   : constant ${root_node_kind_name} :=
+            ${root_node_kind_name}'Enum_Val (Last_Kind);
+         Nodes  : ${T.root_node.array.name} :=
+            Nodes_Of_Kind (U, First, Last);
+         Result : constant ${T.entity.array.name} := Create (Nodes.N);
+      begin
+         for I in Result.Items'Range loop
+            Result.Items (I) := (Nodes.Items (I), No_Entity_Info);
+         end loop;
+         Dec_Ref (Nodes);
+         Result_P.all := Result;
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
    procedure ${capi.get_name('unit_first_token')}
      (Unit  : ${analysis_unit_type};
       Token : access ${token_type}) is
@@ -908,6 +970,51 @@ package body ${ada_lib_name}.Analysis.Implementation.C is
          return 0;
    end;
 
+   function ${capi.get_name('token_range_fill')}
+     (First, Last : ${token_type};
+      Tokens      : System.Address;
+      Size        : int) return int
+   is
+   begin
+      Clear_Last_Exception;
+      declare
+         Result : array (1 .. Natural (Size)) of ${token_type}
+            with Import  => True,
+                 Address => Tokens;
+
+         L      : constant Token_Type := Unwrap (Last);
+         F      : Token_Type := Unwrap (First);
+         Count  : Natural := 0;
+
+         Buffer : Token_Buffer (1 .. 256);
+         --  Get tokens by chunks, so that the stack usage does not depend on
+         --  Size.
+      begin
+         while Count < Result'Length loop
+            declare
+               Chunk_Size : constant Natural :=
+                  Natural'Min (Buffer'Length, Result'Length - Count);
+               Chunk      : Natural;
+            begin
+               Fill_Token_Range (F, L, Buffer (1 .. Chunk_Size), Chunk);
+               for I in 1 .. Chunk loop
+                  Result (Count + I) := Wrap (Buffer (I));
+               end loop;
+               Count := Count + Chunk;
+
+               exit when Chunk < Chunk_Size;
+               F := Next (Buffer (Chunk));
+               exit when F = No_Token;
+            end;
+         end loop;
+         return int (Count);
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return -1;
+   end;
+
    function ${capi.get_name('token_is_equivalent')}
      (Left  : ${token_type};
       Right : ${token_type}) return ${bool_type}
@@ -183,6 +183,23 @@ package ${ada_lib_name}.Analysis.Implementation.C is
               'context_discard_errors_in_populate_lexical_env')}";
    ${ada_c_doc('langkit.context_discard_errors_in_populate_lexical_env', 3)}
 
+   procedure ${capi.get_name("context_set_ast_cache_directory")}
+     (Context   : ${analysis_context_type};
+      Directory : chars_ptr)
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name(
+              'context_set_ast_cache_directory')}";
+   ${ada_c_doc('langkit.context_set_ast_cache_directory', 3)}
+
+   procedure ${capi.get_name("context_dump_memoization_statistics")}
+     (Context : ${analysis_context_type})
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name(
+              'context_dump_memoization_statistics')}";
+   ${ada_c_doc('langkit.context_dump_memoization_statistics', 3)}
+
    procedure ${capi.get_name('destroy_analysis_context')}
      (Context : ${analysis_context_type})
       with Export        => True,
@@ -226,6 +243,14 @@ package ${ada_lib_name}.Analysis.Implementation.C is
               External_name =>
                  "${capi.get_name('get_analysis_unit_from_provider')}";
       ${ada_c_doc('langkit.get_unit_from_provider', 6)}
+
+      procedure ${capi.get_name('context_invalidate_unit_provider_cache')}
+        (Context : ${analysis_context_type})
+         with Export        => True,
+              Convention    => C,
+              External_name => "${capi.get_name(
+                 'context_invalidate_unit_provider_cache')}";
+      ${ada_c_doc('langkit.invalidate_unit_provider_cache', 6)}
    % endif
 
    function ${capi.get_name('remove_analysis_unit')}
@@ -244,6 +269,16 @@ package ${ada_lib_name}.Analysis.Implementation.C is
            External_name => "${capi.get_name('unit_root')}";
    ${ada_c_doc('langkit.unit_root', 3)}
 
+   procedure ${capi.get_name('unit_nodes_of_kind')}
+     (Unit       : ${analysis_unit_type};
+      First_Kind : ${node_kind_type};
+      Last_Kind  : ${node_kind_type};
+      Result_P   : access ${T.entity.array.name})
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('unit_nodes_of_kind')}";
+   ${ada_c_doc('langkit.unit_nodes_of_kind', 3)}
+
    procedure ${capi.get_name('unit_first_token')}
      (Unit  : ${analysis_unit_type};
       Token : access ${token_type})
@@ -563,6 +598,15 @@ package ${ada_lib_name}.Analysis.Implementation.C is
            External_Name => "${capi.get_name('token_range_text')}";
    ${ada_c_doc('langkit.token_range_text', 3)}
 
+   function ${capi.get_name('token_range_fill')}
+     (First, Last : ${token_type};
+      Tokens      : System.Address;
+      Size        : int) return int
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('token_range_fill')}";
+   ${ada_c_doc('langkit.token_range_fill', 3)}
+
    function ${capi.get_name('token_is_equivalent')}
      (Left  : ${token_type};
       Right : ${token_type}) return ${bool_type}
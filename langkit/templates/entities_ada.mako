@@ -231,6 +231,14 @@
    --------------------
 
    function PP (Node : ${root_entity.api_name}'Class) return String;
+   --  Return the source code for Node, as computed by the pretty-printer
+
+   % if ctx.generate_pp:
+   procedure PP (Node : ${root_entity.api_name}'Class; Filename : String);
+   --  Write the source code for Node to the Filename file. Unlike the PP
+   --  function, this writes text as the tree is traversed instead of building
+   --  it in memory first.
+   % endif
 
    -------------------
    -- Debug helpers --
@@ -511,6 +519,17 @@
       return Node.Node.PP;
    end PP;
 
+   % if ctx.generate_pp:
+   --------
+   -- PP --
+   --------
+
+   procedure PP (Node : ${root_entity.api_name}'Class; Filename : String) is
+   begin
+      Node.Node.PP (Filename);
+   end PP;
+   % endif
+
    -----------
    -- Print --
    -----------
@@ -157,6 +157,13 @@ package body ${ada_lib_name}.Lexer is
           Column_Number (Token.End_Column)));
       --  Create a sloc range value corresponding to Token
 
+      function Start_Column return Column_Number is
+        (Column_Number (Token.Start_Column));
+      function End_Column return Column_Number is
+        (Column_Number (Token.End_Column));
+      --  Columns for the start and end of Token. Unlike Sloc_Range, these are
+      --  stored in token data.
+
       procedure Prepare_For_Trivia
         with Inline;
       --  Append an entry for the current token in the Tokens_To_Trivias
@@ -240,7 +247,8 @@ package body ${ada_lib_name}.Lexer is
                                    Source_First => Source_First,
                                    Source_Last  => Source_Last,
                                    Symbol       => null,
-                                   Sloc_Range   => Sloc_Range)));
+                                   Start_Column => Start_Column,
+                                   End_Column   => End_Column)));
 
                   Last_Token_Was_Trivia := True;
                end if;
@@ -277,7 +285,8 @@ package body ${ada_lib_name}.Lexer is
                               then TDH.Source_Last
                               else Source_Last),
              Symbol       => Symbol,
-             Sloc_Range   => Sloc_Range));
+             Start_Column => Start_Column,
+             End_Column   => End_Column));
 
          ##  This whole section is only emitted if the user chose to track
          ##  indentation in the lexer. It has complex machinery to emit
@@ -293,7 +302,8 @@ package body ${ada_lib_name}.Lexer is
                    Source_First => TDH.Source_Last + 1,
                    Source_Last  => TDH.Source_Last,
                    Symbol       => null,
-                   Sloc_Range   => Sloc_Range));
+                   Start_Column => Start_Column,
+                   End_Column   => End_Column));
                Columns_Stack_Len := Columns_Stack_Len - 1;
             end loop;
          end if;
@@ -329,9 +339,8 @@ package body ${ada_lib_name}.Lexer is
                   Source_First => Source_First + 1,
                   Source_Last  => Source_First,
                   Symbol       => null,
-                  Sloc_Range   =>
-                    (Sloc_Range.Start_Line, Sloc_Range.Start_Line,
-                     Sloc_Range.Start_Column, Sloc_Range.Start_Column));
+                  Start_Column => Start_Column,
+                  End_Column   => Start_Column);
             begin
                if Sloc_Range.Start_Column < Get_Col then
                   --  Emit every necessary dedent token if the line is
@@ -375,7 +384,8 @@ package body ${ada_lib_name}.Lexer is
                                  then TDH.Source_Last
                                  else Source_Last),
                 Symbol       => Symbol,
-                Sloc_Range   => Sloc_Range));
+                Start_Column => Start_Column,
+                End_Column   => End_Column));
          end if;
          % endif
 
@@ -675,4 +685,130 @@ package body ${ada_lib_name}.Lexer is
       return T.Symbol;
    end Force_Symbol;
 
+   ------------------
+   -- Write_Tokens --
+   ------------------
+
+   procedure Write_Tokens
+     (Stream : not null access Root_Stream_Type'Class;
+      TDH    : Token_Data_Handler)
+   is
+      procedure Write_Token (T : Token_Data_Type);
+      --  Write T to Stream
+
+      -----------------
+      -- Write_Token --
+      -----------------
+
+      procedure Write_Token (T : Token_Data_Type) is
+      begin
+         Token_Kind'Write (Stream, T.Kind);
+         Positive'Write (Stream, T.Source_First);
+         Natural'Write (Stream, T.Source_Last);
+         Column_Number'Write (Stream, T.Start_Column);
+         Column_Number'Write (Stream, T.End_Column);
+
+         --  Symbols only make sense in their symbol table: write their text
+         --  instead.
+
+         Boolean'Write (Stream, T.Symbol /= null);
+         if T.Symbol /= null then
+            Natural'Write (Stream, T.Symbol'Length);
+            Text_Type'Write (Stream, T.Symbol.all);
+         end if;
+      end Write_Token;
+
+   begin
+      Positive'Write (Stream, TDH.Source_First);
+      Natural'Write (Stream, TDH.Source_Last);
+      Text_Type'Write
+        (Stream, TDH.Source_Buffer (TDH.Source_First .. TDH.Source_Last));
+
+      Natural'Write (Stream, Length (TDH.Tokens));
+      for T of TDH.Tokens loop
+         Write_Token (T);
+      end loop;
+
+      Natural'Write (Stream, Length (TDH.Trivias));
+      for T of TDH.Trivias loop
+         Write_Token (T.T);
+         Boolean'Write (Stream, T.Has_Next);
+      end loop;
+
+      Natural'Write (Stream, Length (TDH.Tokens_To_Trivias));
+      for I of TDH.Tokens_To_Trivias loop
+         Integer'Write (Stream, I);
+      end loop;
+   end Write_Tokens;
+
+   -----------------
+   -- Read_Tokens --
+   -----------------
+
+   procedure Read_Tokens
+     (Stream : not null access Root_Stream_Type'Class;
+      TDH    : in out Token_Data_Handler)
+   is
+      function Read_Token return Token_Data_Type;
+      --  Read a token from Stream
+
+      ----------------
+      -- Read_Token --
+      ----------------
+
+      function Read_Token return Token_Data_Type is
+         Has_Symbol : Boolean;
+      begin
+         return T : Token_Data_Type do
+            Token_Kind'Read (Stream, T.Kind);
+            Positive'Read (Stream, T.Source_First);
+            Natural'Read (Stream, T.Source_Last);
+            Column_Number'Read (Stream, T.Start_Column);
+            Column_Number'Read (Stream, T.End_Column);
+
+            Boolean'Read (Stream, Has_Symbol);
+            if Has_Symbol then
+               declare
+                  Symbol : Text_Type (1 .. Natural'Input (Stream));
+               begin
+                  Text_Type'Read (Stream, Symbol);
+                  T.Symbol := Find (TDH.Symbols, Symbol);
+               end;
+            else
+               T.Symbol := null;
+            end if;
+         end return;
+      end Read_Token;
+
+      Source_First : constant Positive := Positive'Input (Stream);
+      Source_Last  : constant Natural := Natural'Input (Stream);
+      Buffer       : Text_Access :=
+         new Text_Type (Source_First .. Source_Last);
+   begin
+      begin
+         Text_Type'Read (Stream, Buffer.all);
+      exception
+         when others =>
+            Free (Buffer);
+            raise;
+      end;
+      Reset (TDH, Buffer, Source_First, Source_Last);
+
+      for I in 1 .. Natural'Input (Stream) loop
+         Append (TDH.Tokens, Read_Token);
+      end loop;
+
+      for I in 1 .. Natural'Input (Stream) loop
+         declare
+            T : constant Token_Data_Type := Read_Token;
+         begin
+            Append (TDH.Trivias, (T => T, Has_Next => Boolean'Input (Stream)));
+         end;
+      end loop;
+
+      for I in 1 .. Natural'Input (Stream) loop
+         Append (TDH.Tokens_To_Trivias, Integer'Input (Stream));
+      end loop;
+   end Read_Tokens;
+
 end ${ada_lib_name}.Lexer;
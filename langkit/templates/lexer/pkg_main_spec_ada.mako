@@ -1,5 +1,7 @@
 ## vim: filetype=makoada
 
+with Ada.Streams; use Ada.Streams;
+
 with Langkit_Support.Diagnostics; use Langkit_Support.Diagnostics;
 with Langkit_Support.Slocs;       use Langkit_Support.Slocs;
 with Langkit_Support.Symbols;     use Langkit_Support.Symbols;
@@ -25,24 +27,27 @@ package ${ada_lib_name}.Lexer is
    % endif
 
    type Token_Data_Type is record
-      Kind         : Token_Kind;
+      Kind                     : Token_Kind;
       --  Kind for this token
 
-      Source_First : Positive;
-      Source_Last  : Natural;
+      Start_Column, End_Column : Column_Number;
+      --  Columns for the source location range of this token. Note that the
+      --  end bound is exclusive. Tokens do not store line numbers, as these
+      --  can be recomputed from source buffer indexes: see the Sloc_Range
+      --  function below.
+
+      Source_First             : Positive;
+      Source_Last              : Natural;
       --  Bounds in the source buffer corresponding to this token
 
-      Symbol       : Symbol_Type;
+      Symbol                   : Symbol_Type;
       --  Depending on the token kind (according to the lexer specification),
       --  this is either null or the symbolization of the token text.
       --
       --  For instance: null for keywords but actual text for identifiers.
-
-      Sloc_Range   : Source_Location_Range;
-      --  Source location range for this token. Note that the end bound is
-      --  exclusive.
-
    end record;
+   --  There can be millions of tokens in a single analysis unit, so keep this
+   --  record small: components are ordered to minimize padding.
 
    package Token_Data_Handlers is new Langkit_Support.Token_Data_Handlers
      (Token_Data_Type);
@@ -95,6 +100,16 @@ package ${ada_lib_name}.Lexer is
    --  Debug helper: return a human-readable representation of T, a token that
    --  belongs to TDH.
 
+   function Sloc_Range
+     (TDH : Token_Data_Handler;
+      T   : Token_Data_Type) return Source_Location_Range
+   is ((Start_Line   => Get_Line_Number (TDH, T.Source_First),
+        End_Line     => Get_Line_Number (TDH, T.Source_Last + 1),
+        Start_Column => T.Start_Column,
+        End_Column   => T.End_Column));
+   --  Return the source location range for T, a token that belongs to TDH.
+   --  Note that the end bound is exclusive.
+
    type Symbolization_Result (Success : Boolean; Size : Natural) is record
       case Success is
          when True  => Symbol : Text_Type (1 .. Size);
@@ -113,4 +128,17 @@ package ${ada_lib_name}.Lexer is
    --  If T has a symbol, return it. Otherwise, force its symbolization and
    --  return the symbol.
 
+   procedure Write_Tokens
+     (Stream : not null access Root_Stream_Type'Class;
+      TDH    : Token_Data_Handler);
+   --  Write the source buffer, the tokens and the trivia in TDH to Stream, so
+   --  that Read_Tokens can restore them later.
+
+   procedure Read_Tokens
+     (Stream : not null access Root_Stream_Type'Class;
+      TDH    : in out Token_Data_Handler);
+   --  Replace the source buffer, the tokens and the trivia in TDH with the
+   --  ones that Write_Tokens wrote to Stream. Token symbols are re-created in
+   --  TDH's symbol table.
+
 end ${ada_lib_name}.Lexer;
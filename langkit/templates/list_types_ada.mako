@@ -33,8 +33,9 @@
 
    % if not element_type.has_abstract_list:
       % if ctx.generate_pp:
-      overriding function PP
-        (Node : access ${value_type}) return String;
+      overriding procedure Unparse
+        (Node   : access ${value_type};
+         Output : in out Unparsing_Output'Class);
       % endif
    % endif
 
@@ -63,12 +64,12 @@
    % if not element_type.has_abstract_list:
 
       % if ctx.generate_pp:
-      overriding function PP
-        (Node : access ${value_type}) return String
-      is
+      overriding procedure Unparse
+        (Node   : access ${value_type};
+         Output : in out Unparsing_Output'Class) is
       begin
-         ${pretty_printers.pretty_printer(list_type)}
-      end PP;
+         ${pretty_printers.unparser(list_type)}
+      end Unparse;
       % endif
 
    % endif
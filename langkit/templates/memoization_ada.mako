@@ -36,7 +36,14 @@ type Mmz_Key is record
    Items    : Mmz_Key_Array_Access;
 end record;
 
+package Mmz_Key_Lists is new Ada.Containers.Doubly_Linked_Lists (Mmz_Key);
+
 type Mmz_Value (Kind : Mmz_Value_Kind := Mmz_Evaluating) is record
+   LRU_Position : Mmz_Key_Lists.Cursor;
+   --  For properties that have a memoization limit, position of this entry's
+   --  key in the LRU list of the owning unit (see
+   --  Analysis_Unit_Type.Memoization_LRU). No_Element otherwise.
+
    case Kind is
       when Mmz_Evaluating | Mmz_Property_Error =>
          null;
@@ -58,6 +65,46 @@ procedure Destroy (Map : in out Memoization_Maps.Map);
 --  Free all resources stored in a memoization map. This includes destroying
 --  ref-count shares the map owns.
 
+procedure Destroy (Key : in out Mmz_Key_Array_Access);
+procedure Destroy (Value : in out Mmz_Value);
+--  Free resources for a single memoization entry
+
+Mmz_Limits : constant array (Mmz_Property) of Natural :=
+  (${', '.join('{} => {}'.format(p.memoization_enum, p.memoization_limit or 0)
+               for p in memoized_props)});
+--  For each memoized property, maximum number of entries to keep in the
+--  memoization map of each analysis unit, or 0 if there is no limit.
+
+function Mmz_Property_Name (Property : Mmz_Property) return String;
+--  Return the fully qualified name of Property
+
+type Mmz_Property_Stats is record
+   Hits : Long_Long_Integer := 0;
+   --  Number of lookups that found an existing entry
+
+   Misses : Long_Long_Integer := 0;
+   --  Number of lookups that had to create an entry
+
+   Evictions : Long_Long_Integer := 0;
+   --  Number of entries removed to respect the memoization limit
+
+   Entries : Natural := 0;
+   --  Number of entries currently in the memoization map
+
+   Bytes : Long_Long_Integer := 0;
+   --  Approximate number of bytes used by the entries currently in the
+   --  memoization map. This covers the keys and values themselves, but not
+   --  the data they reference.
+end record;
+--  Runtime statistics about the memoization of a property
+
+type Mmz_Stats_Array is array (Mmz_Property) of Mmz_Property_Stats;
+type Mmz_LRU_Array is array (Mmz_Property) of Mmz_Key_Lists.List;
+
+function Entry_Size (Key : Mmz_Key) return Long_Long_Integer;
+--  Return the approximate number of bytes used by a memoization entry for
+--  Key (see Mmz_Property_Stats.Bytes).
+
 </%def>
 
 <%def name="body()">
@@ -65,11 +112,38 @@ procedure Destroy (Map : in out Memoization_Maps.Map);
 <%
    key_types = ctx.sorted_types(ctx.memoization_keys)
    value_types = ctx.sorted_types(ctx.memoization_values)
+
+   memoized_props = sorted(ctx.memoized_properties,
+                           key=lambda p: p.qualname)
 %>
 
 function Hash (Key : Mmz_Key_Item) return Hash_Type;
 function Equivalent (L, R : Mmz_Key_Item) return Boolean;
-procedure Destroy (Key : in out Mmz_Key_Array_Access);
+
+-----------------------
+-- Mmz_Property_Name --
+-----------------------
+
+function Mmz_Property_Name (Property : Mmz_Property) return String is
+begin
+   case Property is
+      % for p in memoized_props:
+         when ${p.memoization_enum} =>
+            return "${p.qualname}";
+      % endfor
+   end case;
+end Mmz_Property_Name;
+
+----------------
+-- Entry_Size --
+----------------
+
+function Entry_Size (Key : Mmz_Key) return Long_Long_Integer is
+begin
+   return Long_Long_Integer
+     ((Mmz_Key'Size + Mmz_Value'Size
+       + Key.Items'Length * Mmz_Key_Item'Size) / System.Storage_Unit);
+end Entry_Size;
 
 ----------------
 -- Equivalent --
@@ -178,18 +252,29 @@ begin
       Destroy (K_Array);
    end loop;
 
+   for V of Values loop
+      Destroy (V);
+   end loop;
+end Destroy;
+
+-------------
+-- Destroy --
+-------------
+
+procedure Destroy (Value : in out Mmz_Value) is
+begin
    <% refcounted_value_types = [t for t in value_types if t.is_refcounted] %>
    % if refcounted_value_types:
-      for V of Values loop
-         case V.Kind is
-            % for t in refcounted_value_types:
-               when ${t.memoization_kind} =>
-                  Dec_Ref (V.As_${t.name});
-            % endfor
-
-            when others => null;
-         end case;
-      end loop;
+      case Value.Kind is
+         % for t in refcounted_value_types:
+            when ${t.memoization_kind} =>
+               Dec_Ref (Value.As_${t.name});
+         % endfor
+
+         when others => null;
+      end case;
+   % else:
+      pragma Unreferenced (Value);
    % endif
 end Destroy;
 
@@ -145,13 +145,13 @@ package body ${ada_lib_name}.Analysis.Parsers is
             Get_Token (Parser.TDH.all, Parser.Last_Fail.Pos);
          D : constant Diagnostic :=
            (if Parser.Last_Fail.Kind = Token_Fail then
-             Create (Last_Token.Sloc_Range, To_Text
+             Create (Sloc_Range (Parser.TDH.all, Last_Token), To_Text
                ("Expected "
                 & Token_Error_Image (Parser.Last_Fail.Expected_Token_Id)
                 & ", got "
                 & Token_Error_Image (Parser.Last_Fail.Found_Token_Id)))
             else
-              Create (Last_Token.Sloc_Range,
+              Create (Sloc_Range (Parser.TDH.all, Last_Token),
                       To_Text (Parser.Last_Fail.Custom_Message.all)));
       begin
          Parser.Diagnostics.Append (D);
@@ -173,7 +173,8 @@ package body ${ada_lib_name}.Analysis.Parsers is
                First_Garbage_Token : Lexer.Token_Data_Type renames
                   Get_Token (Parser.TDH.all, Parser.Current_Pos);
             begin
-               Append (Parser.Diagnostics, First_Garbage_Token.Sloc_Range,
+               Append (Parser.Diagnostics,
+                       Sloc_Range (Parser.TDH.all, First_Garbage_Token),
                        To_Text ("End of input expected, got """
                                 & Token_Kind_Name (First_Garbage_Token.Kind)
                                 & """"));
@@ -212,6 +213,150 @@ package body ${ada_lib_name}.Analysis.Parsers is
       return Parsed_Node (Result);
    end Parse;
 
+   <%
+      concrete_nodes = [cls for cls in ctx.astnode_types if not cls.abstract]
+      fieldless_nodes = [cls for cls in concrete_nodes
+                         if not cls.is_list_type
+                         and not cls.get_parse_fields()]
+   %>
+
+   ----------------
+   -- Write_Tree --
+   ----------------
+
+   procedure Write_Tree
+     (Stream : not null access Root_Stream_Type'Class; Root : Parsed_Node)
+   is
+      procedure Write_Node (Node : access ${root_node_value_type}'Class);
+      --  Write Node and then its children to Stream
+
+      ----------------
+      -- Write_Node --
+      ----------------
+
+      procedure Write_Node (Node : access ${root_node_value_type}'Class) is
+      begin
+         Boolean'Write (Stream, Node /= null);
+         if Node = null then
+            return;
+         end if;
+
+         ${root_node_kind_name}'Write (Stream, Node.Kind);
+         Token_Index'Write (Stream, Node.Token_Start_Index);
+         Token_Index'Write (Stream, Node.Token_End_Index);
+
+         case Node.Kind is
+            % for cls in concrete_nodes:
+               % if cls.is_list_type:
+                  when ${cls.ada_kind_name} =>
+                     declare
+                        N : constant ${cls.name} := ${cls.name} (Node);
+                     begin
+                        Natural'Write (Stream, N.Count);
+                        for Child of N.Nodes (1 .. N.Count) loop
+                           Write_Node (Child);
+                        end loop;
+                     end;
+               % elif cls.get_parse_fields():
+                  when ${cls.ada_kind_name} =>
+                     declare
+                        N : constant ${cls.name} := ${cls.name} (Node);
+                     begin
+                        % for field in cls.get_parse_fields():
+                           % if field.type.is_ast_node:
+                              Write_Node (N.${field.name});
+                           % else:
+                              ${field.type.storage_type_name}'Write
+                                (Stream, N.${field.name});
+                           % endif
+                        % endfor
+                     end;
+               % endif
+            % endfor
+            % if fieldless_nodes:
+               when ${' | '.join(cls.ada_kind_name
+                                 for cls in fieldless_nodes)} =>
+                  null;
+            % endif
+         end case;
+      end Write_Node;
+
+   begin
+      Write_Node (Root);
+   end Write_Tree;
+
+   ---------------
+   -- Read_Tree --
+   ---------------
+
+   function Read_Tree
+     (Stream : not null access Root_Stream_Type'Class;
+      Unit   : Analysis_Unit;
+      Pool   : Bump_Ptr_Pool) return Parsed_Node
+   is
+      function Read_Node return ${root_node_type_name};
+      --  Read a node and then its children from Stream
+
+      ---------------
+      -- Read_Node --
+      ---------------
+
+      function Read_Node return ${root_node_type_name} is
+         Kind        : ${root_node_kind_name};
+         Token_Start : Token_Index;
+         Token_End   : Token_Index;
+         Result      : ${root_node_type_name};
+      begin
+         if not Boolean'Input (Stream) then
+            return null;
+         end if;
+
+         ${root_node_kind_name}'Read (Stream, Kind);
+         Token_Index'Read (Stream, Token_Start);
+         Token_Index'Read (Stream, Token_End);
+
+         case Kind is
+            % for cls in concrete_nodes:
+               when ${cls.ada_kind_name} =>
+                  declare
+                     N : constant ${cls.name} :=
+                        ${cls.name} (${cls.name}_Alloc.Alloc (Pool));
+                  begin
+                     Result := ${root_node_type_name} (N);
+                     % if cls.is_list_type:
+                        N.Count := Natural'Input (Stream);
+                        N.Nodes := Alloc_AST_List_Array.Alloc (Pool, N.Count);
+                        for I in 1 .. N.Count loop
+                           N.Nodes (I) := Read_Node;
+                        end loop;
+                     % else:
+                        % for field in cls.get_parse_fields():
+                           % if field.type.is_ast_node:
+                              N.${field.name} :=
+                                 ${field.type.storage_type_name} (Read_Node);
+                           % else:
+                              ${field.type.storage_type_name}'Read
+                                (Stream, N.${field.name});
+                           % endif
+                        % endfor
+                     % endif
+                  end;
+            % endfor
+         end case;
+
+         Result.Kind := Kind;
+         Result.Unit := Unit;
+         Result.Token_Start_Index := Token_Start;
+         Result.Token_End_Index := Token_End;
+         return Result;
+      end Read_Node;
+
+      Result : constant ${root_node_type_name} := Read_Node;
+   begin
+      Set_Parents (Result, null);
+      return Parsed_Node (Result);
+   end Read_Tree;
+
    % for parser in ctx.generated_parsers:
    ${parser.body}
    % endfor
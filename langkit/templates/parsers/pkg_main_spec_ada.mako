@@ -1,5 +1,7 @@
 ## vim: filetype=makoada
 
+with Ada.Streams; use Ada.Streams;
+
 with Langkit_Support.Bump_Ptr;    use Langkit_Support.Bump_Ptr;
 with Langkit_Support.Diagnostics; use Langkit_Support.Diagnostics;
 
@@ -83,6 +85,20 @@ package ${ada_lib_name}.Analysis.Parsers is
    --  consider the case when the parser could not consume all the input tokens
    --  as an error.
 
+   procedure Write_Tree
+     (Stream : not null access Root_Stream_Type'Class; Root : Parsed_Node);
+   --  Write the tree of AST nodes rooted at Root to Stream, so that Read_Tree
+   --  can restore it later. Only the data that parsers compute is written, so
+   --  Root should come straight from Parse.
+
+   function Read_Tree
+     (Stream : not null access Root_Stream_Type'Class;
+      Unit   : Analysis_Unit;
+      Pool   : Bump_Ptr_Pool) return Parsed_Node;
+   --  Read a tree of AST nodes that Write_Tree wrote to Stream. Nodes are
+   --  allocated in Pool and belong to Unit, whose tokens must be the ones
+   --  that the nodes were parsed from.
+
    procedure Reset (Parser : in out Parser_Type);
    --  Reset the parser so that it is ready to parse again
 
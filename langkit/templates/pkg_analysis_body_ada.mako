@@ -13,13 +13,21 @@ with Ada.Containers.Hashed_Maps;
 % if not ctx.separate_properties:
 with Ada.Containers.Vectors;
 % endif
+with Ada.Directories;
 with Ada.Exceptions;
+with Ada.IO_Exceptions;
+with Ada.Numerics.Discrete_Random;
+with Ada.Streams.Stream_IO;
 with Ada.Strings.Unbounded;      use Ada.Strings.Unbounded;
 with Ada.Strings.Wide_Wide_Unbounded;
 with Ada.Text_IO;                use Ada.Text_IO;
 with Ada.Unchecked_Conversion;
 with Ada.Unchecked_Deallocation;
 
+with GNAT.OS_Lib;
+with GNAT.SHA1;
+
+with GNATCOLL.Mmap;
 with GNATCOLL.Traces;
 
 % if not ctx.separate_properties:
@@ -27,6 +35,7 @@ with GNATCOLL.Traces;
 % endif
 
 with Langkit_Support.Images; use Langkit_Support.Images;
+with Langkit_Support.Locks;  use Langkit_Support.Locks;
 with Langkit_Support.Slocs;  use Langkit_Support.Slocs;
 with Langkit_Support.Text;   use Langkit_Support.Text;
 
@@ -86,15 +95,67 @@ package body ${ada_lib_name}.Analysis is
    --  If Charset is an empty string, do nothing. Otherwise, update
    --  Unit.Charset field to Charset.
 
+   function Lookup_Prelude
+     (Context : Analysis_Context; Filename : Unbounded_String)
+      return Analysis_Unit;
+   --  Return the unit for Filename in Context's prelude (or in the prelude of
+   --  this prelude, and so on), or null if there is no such unit.
+
+   Frozen_Contexts_Lock : Reentrant_Lock;
+   --  Lock to serialize updates to the reference count of frozen contexts,
+   --  which several tasks can share as a prelude.
+
+   % if ctx.default_unit_provider:
+   procedure Remove_From_Unit_Provider_Cache (Unit : Analysis_Unit);
+   --  Remove all the entries that reference Unit from the unit provider cache
+   --  of Unit's context.
+   % endif
+
    procedure Do_Parsing
      (Unit        : Analysis_Unit;
       Read_BOM    : Boolean;
       Init_Parser : access procedure (Unit     : Analysis_Unit;
                                       Read_BOM : Boolean;
-                                      Parser   : in out Parser_Type));
+                                      Parser   : in out Parser_Type);
+      Filename    : String := "");
    --  Helper for Get_Unit and the public Reparse procedures: parse an analysis
    --  unit using Init_Parser and replace Unit's AST_Root and the diagnostics
    --  with the parsers's output.
+   --
+   --  If Filename is not empty, Init_Parser reads the source from this file,
+   --  so Do_Parsing can use the AST cache instead of parsing. Note that on
+   --  cache misses, the source file is hashed twice to compute the cache key:
+   --  once before parsing and once after.
+
+   package Stream_IO renames Ada.Streams.Stream_IO;
+
+   AST_Cache_Signature : constant String := "${ctx.ast_cache_signature}";
+   --  Hash of the lexer, the parsers and the node layouts of this library.
+   --  AST cache entries are valid only for the signature they were created
+   --  with.
+
+   function AST_Cache_File
+     (Unit     : Analysis_Unit;
+      Filename : String;
+      Read_BOM : Boolean) return String;
+   --  Return the name of the AST cache entry for Unit if it is parsed from
+   --  Filename. Return an empty string if the AST cache is disabled or if
+   --  Filename cannot be read.
+
+   function Load_From_AST_Cache
+     (Unit : Analysis_Unit; Cache_File : String) return Boolean;
+   --  Try to load Unit's tokens and AST from the Cache_File AST cache entry
+   --  and return whether this succeeded. If it did not, Unit has no AST.
+
+   procedure Save_To_AST_Cache (Unit : Analysis_Unit; Cache_File : String);
+   --  Save Unit's tokens and AST to the Cache_File AST cache entry. As the
+   --  cache is just an optimization, I/O errors are ignored.
+
+   package AST_Cache_Random is new Ada.Numerics.Discrete_Random (Natural);
+
+   AST_Cache_Generator : AST_Cache_Random.Generator;
+   --  Source of the random suffixes for the temporary files that
+   --  Save_To_AST_Cache creates. Reset when this package is elaborated.
 
    function Create_Unit
      (Context           : Analysis_Context;
@@ -111,11 +172,13 @@ package body ${ada_lib_name}.Analysis is
         access procedure (Unit     : Analysis_Unit;
                           Read_BOM : Boolean;
                           Parser   : in out Parser_Type);
-      Rule              : Grammar_Rule)
+      Rule              : Grammar_Rule;
+      From_File         : Boolean)
       return Analysis_Unit;
    --  Helper for Get_From_File and Get_From_Buffer: do all the common work
    --  using Init_Parser to either parse from a file or from a buffer. Return
-   --  the resulting analysis unit.
+   --  the resulting analysis unit. From_File must be whether Init_Parser
+   --  reads the source from Filename.
 
    % if ctx.symbol_literals:
       function Create_Symbol_Literals
@@ -151,6 +214,31 @@ package body ${ada_lib_name}.Analysis is
       end if;
    end Update_Charset;
 
+   --------------------
+   -- Lookup_Prelude --
+   --------------------
+
+   function Lookup_Prelude
+     (Context : Analysis_Context; Filename : Unbounded_String)
+      return Analysis_Unit
+   is
+      use Units_Maps;
+
+      Prelude : Analysis_Context := Context.Prelude;
+   begin
+      while Prelude /= null loop
+         declare
+            Cur : constant Cursor := Prelude.Units_Map.Find (Filename);
+         begin
+            if Has_Element (Cur) then
+               return Element (Cur);
+            end if;
+         end;
+         Prelude := Prelude.Prelude;
+      end loop;
+      return null;
+   end Lookup_Prelude;
+
    ------------
    -- Create --
    ------------
@@ -161,6 +249,7 @@ package body ${ada_lib_name}.Analysis is
       % if ctx.default_unit_provider:
          ; Unit_Provider : Unit_Provider_Access_Cst := null
       % endif
+      ; Prelude     : Analysis_Context := No_Analysis_Context
      ) return Analysis_Context
    is
       % if ctx.default_unit_provider:
@@ -171,9 +260,23 @@ package body ${ada_lib_name}.Analysis is
       % endif
       Actual_Charset : constant String :=
         (if Charset = "" then Default_Charset else Charset);
-      Symbols        : constant Symbol_Table := Create;
+      Symbols        : Symbol_Table;
+      Root_Parent    : AST_Envs.Env_Getter := AST_Envs.No_Env_Getter;
       Context        : Analysis_Context;
    begin
+      --  Symbols are compared by reference, so a context must use the symbol
+      --  table of its prelude in order to look up its lexical environments.
+
+      if Prelude = null then
+         Symbols := Create;
+      elsif not Prelude.Frozen then
+         raise Constraint_Error with "prelude context must be frozen";
+      else
+         Inc_Ref (Prelude);
+         Symbols := Prelude.Symbols;
+         Root_Parent := AST_Envs.Simple_Env_Getter (Prelude.Root_Scope);
+      end if;
+
       Context := new Analysis_Context_Type'
         (Ref_Count   => 1,
          Units_Map   => <>,
@@ -181,12 +284,13 @@ package body ${ada_lib_name}.Analysis is
          Charset     => To_Unbounded_String (Actual_Charset),
          With_Trivia => With_Trivia,
          Root_Scope  => AST_Envs.Create
-                          (Parent => AST_Envs.No_Env_Getter,
+                          (Parent => Root_Parent,
                            Node   => null,
                            Owner  => No_Analysis_Unit),
 
          % if ctx.default_unit_provider:
-         Unit_Provider => P,
+         Unit_Provider       => P,
+         Unit_Provider_Cache => <>,
          % endif
 
          % if ctx.symbol_literals:
@@ -195,10 +299,15 @@ package body ${ada_lib_name}.Analysis is
 
          Parser => <>,
 
+         AST_Page_Cache => Create_Page_Cache,
+
          Discard_Errors_In_Populate_Lexical_Env => <>,
          Logic_Resolution_Timeout => <>,
          In_Populate_Lexical_Env => False,
-         Cache_Version => <>);
+         Cache_Version => <>,
+         AST_Cache_Directory => <>,
+         Prelude => Prelude,
+         Frozen => False);
 
       Initialize (Context.Parser);
       ${exts.include_extension(ctx.ext('analysis', 'context', 'create'))}
@@ -256,7 +365,15 @@ package body ${ada_lib_name}.Analysis is
 
    procedure Inc_Ref (Context : Analysis_Context) is
    begin
-      Context.Ref_Count := Context.Ref_Count + 1;
+      --  Several tasks can share frozen contexts: see Frozen_Contexts_Lock
+
+      if Context.Frozen then
+         Frozen_Contexts_Lock.Seize;
+         Context.Ref_Count := Context.Ref_Count + 1;
+         Frozen_Contexts_Lock.Release;
+      else
+         Context.Ref_Count := Context.Ref_Count + 1;
+      end if;
    end Inc_Ref;
 
    -------------
@@ -264,13 +381,93 @@ package body ${ada_lib_name}.Analysis is
    -------------
 
    procedure Dec_Ref (Context : in out Analysis_Context) is
+      Is_Last : Boolean;
    begin
-      Context.Ref_Count := Context.Ref_Count - 1;
-      if Context.Ref_Count = 0 then
+      --  Several tasks can share frozen contexts: see Frozen_Contexts_Lock
+
+      if Context.Frozen then
+         Frozen_Contexts_Lock.Seize;
+         Context.Ref_Count := Context.Ref_Count - 1;
+         Is_Last := Context.Ref_Count = 0;
+         Frozen_Contexts_Lock.Release;
+      else
+         Context.Ref_Count := Context.Ref_Count - 1;
+         Is_Last := Context.Ref_Count = 0;
+      end if;
+
+      if Is_Last then
          Destroy (Context);
       end if;
    end Dec_Ref;
 
+   ------------
+   -- Freeze --
+   ------------
+
+   procedure Freeze (Context : Analysis_Context) is
+
+      procedure Freeze_Envs (Node : ${root_node_type_name});
+      --  Freeze the primary lexical environments that Node and its children
+      --  own.
+
+      -----------------
+      -- Freeze_Envs --
+      -----------------
+
+      procedure Freeze_Envs (Node : ${root_node_type_name}) is
+      begin
+         if Node = null then
+            return;
+         end if;
+         if Node.Self_Env.Kind = Primary then
+            AST_Envs.Freeze (Node.Self_Env);
+         end if;
+         for I in 1 .. Node.Child_Count loop
+            Freeze_Envs (Node.Child (I));
+         end loop;
+      end Freeze_Envs;
+
+   begin
+      --  Populating lexical environments can load new units, which would
+      --  tamper with Context.Units_Map if we iterated on it: iterate on copies
+      --  instead, until no new unit shows up.
+
+      loop
+         declare
+            Units : constant Units_Maps.Map := Context.Units_Map;
+         begin
+            for Unit of Units loop
+               Populate_Lexical_Env (Unit);
+            end loop;
+            exit when Context.Units_Map.Length = Units.Length;
+         end;
+      end loop;
+
+      --  From now on, other contexts can use Context from several tasks at the
+      --  same time. Make sure that the caches of its units are up to date, so
+      --  that evaluating properties does not reset them anymore, and that the
+      --  shared symbol table and lexical environments serialize their
+      --  accesses.
+
+      for Unit of Context.Units_Map loop
+         Reset_Caches (Unit);
+         Freeze_Envs (Unit.AST_Root);
+      end loop;
+      AST_Envs.Freeze (Context.Root_Scope);
+      Share (Context.Symbols);
+
+      Context.Frozen := True;
+   end Freeze;
+
+   ---------------
+   -- Is_Frozen --
+   ---------------
+
+   function Is_Frozen (Context : Analysis_Context) return Boolean is
+   begin
+      return Context.Frozen;
+   end Is_Frozen;
+
    --------------------------------------------
    -- Discard_Errors_In_Populate_Lexical_Env --
    --------------------------------------------
@@ -287,6 +484,16 @@ package body ${ada_lib_name}.Analysis is
       Context.Logic_Resolution_Timeout := Timeout;
    end Set_Logic_Resolution_Timeout;
 
+   -----------------------------
+   -- Set_AST_Cache_Directory --
+   -----------------------------
+
+   procedure Set_AST_Cache_Directory
+     (Context : Analysis_Context; Directory : String) is
+   begin
+      Context.AST_Cache_Directory := To_Unbounded_String (Directory);
+   end Set_AST_Cache_Directory;
+
    -----------------
    -- Create_Unit --
    -----------------
@@ -314,10 +521,13 @@ package body ${ada_lib_name}.Analysis is
          Foreign_Nodes           =>
             ${root_node_type_name}_Vectors.Empty_Vector,
          Rebindings              => Env_Rebindings_Vectors.Empty_Vector,
+         Kind_Index              => null,
          Cache_Version           => <>,
          Unit_Version            => <>
          % if ctx.has_memoization:
          , Memoization_Map   => <>
+         , Memoization_LRU   => <>
+         , Memoization_Stats => <>
          % endif
       );
    begin
@@ -338,7 +548,8 @@ package body ${ada_lib_name}.Analysis is
         access procedure (Unit     : Analysis_Unit;
                           Read_BOM : Boolean;
                           Parser   : in out Parser_Type);
-      Rule              : Grammar_Rule)
+      Rule              : Grammar_Rule;
+      From_File         : Boolean)
       return Analysis_Unit
    is
       use Units_Maps;
@@ -357,6 +568,27 @@ package body ${ada_lib_name}.Analysis is
       Actual_Charset : Unbounded_String;
 
    begin
+      --  Units from the prelude are shared with other contexts: return them
+      --  as-is.
+
+      if Created then
+         Unit := Lookup_Prelude (Context, Fname);
+         if Unit /= null then
+            if not From_File then
+               raise Constraint_Error with
+                  "cannot parse a buffer for a prelude unit";
+            elsif Reparse then
+               raise Constraint_Error with "cannot reparse a prelude unit";
+            end if;
+            return Unit;
+         end if;
+      end if;
+
+      if Context.Frozen and then (Created or else Reparse) then
+         raise Constraint_Error with
+            "cannot load or reparse units in a frozen context";
+      end if;
+
       --  Determine which encoding to use.  The parameter comes first, then the
       --  unit-specific default, then the context-specific one.
 
@@ -380,7 +612,8 @@ package body ${ada_lib_name}.Analysis is
       --  (Re)parse it if needed
 
       if Created or else Reparse then
-         Do_Parsing (Unit, Read_BOM, Init_Parser);
+         Do_Parsing (Unit, Read_BOM, Init_Parser,
+                     (if From_File then Filename else ""));
       end if;
 
       --  If we're in a reparse, do necessary updates
@@ -397,9 +630,12 @@ package body ${ada_lib_name}.Analysis is
 
    function Has_Unit
      (Context       : Analysis_Context;
-      Unit_Filename : String) return Boolean is
+      Unit_Filename : String) return Boolean
+   is
+      Fname : constant Unbounded_String := To_Unbounded_String (Unit_Filename);
    begin
-      return Context.Units_Map.Contains (To_Unbounded_String (Unit_Filename));
+      return Context.Units_Map.Contains (Fname)
+             or else Lookup_Prelude (Context, Fname) /= null;
    end Has_Unit;
 
    ----------------
@@ -412,12 +648,16 @@ package body ${ada_lib_name}.Analysis is
       Init_Parser :
         access procedure (Unit     : Analysis_Unit;
                           Read_BOM : Boolean;
-                          Parser   : in out Parser_Type))
+                          Parser   : in out Parser_Type);
+      Filename    : String := "")
    is
 
       procedure Add_Diagnostic (Message : String);
       --  Helper to add a sloc-less diagnostic to Unit
 
+      Cache_File : Unbounded_String;
+      --  Name of the AST cache entry for Unit, if the cache is enabled
+
       --------------------
       -- Add_Diagnostic --
       --------------------
@@ -437,7 +677,8 @@ package body ${ada_lib_name}.Analysis is
       Destroy_Rebindings (Unit.Rebindings'Access);
 
       --  If we have an AST_Mem_Pool already, we are reparsing. We want to
-      --  destroy it to free all the allocated memory.
+      --  destroy it to free all the allocated memory (its pages go back to
+      --  the context's page cache, ready for the new AST).
       if Unit.AST_Root /= null then
          Unit.AST_Root.Destroy;
       end if;
@@ -445,6 +686,7 @@ package body ${ada_lib_name}.Analysis is
          Free (Unit.AST_Mem_Pool);
       end if;
       Unit.AST_Root := null;
+      Destroy_Kind_Index (Unit);
       Unit.Diagnostics.Clear;
 
       --  As (re-)loading a unit can change how any AST node property in the
@@ -452,6 +694,19 @@ package body ${ada_lib_name}.Analysis is
       --  likely overkill, but kill all caches here as it's easy to do.
       Reset_Caches (Unit.Context);
 
+      --  If the AST cache has an entry for this source, restore the unit from
+      --  it instead of parsing.
+
+      if Filename'Length > 0 then
+         Cache_File := To_Unbounded_String
+           (AST_Cache_File (Unit, Filename, Read_BOM));
+         if Cache_File /= Null_Unbounded_String
+            and then Load_From_AST_Cache (Unit, To_String (Cache_File))
+         then
+            return;
+         end if;
+      end if;
+
       --  Now create the parser. This is where lexing occurs, so this is where
       --  we get most "setup" issues: missing input file, bad charset, etc.
       --  If we have such an error, catch it, turn it into diagnostics and
@@ -491,14 +746,226 @@ package body ${ada_lib_name}.Analysis is
       --  We have correctly setup a parser! Now let's parse and return what we
       --  get.
 
-      Unit.AST_Mem_Pool := Create;
+      Unit.AST_Mem_Pool := Create (Unit.Context.AST_Page_Cache);
       Unit.Context.Parser.Mem_Pool := Unit.AST_Mem_Pool;
 
       Unit.AST_Root := ${root_node_type_name}
         (Parse (Unit.Context.Parser, Rule => Unit.Rule));
       Unit.Diagnostics.Append (Unit.Context.Parser.Diagnostics);
+
+      --  Cache entries do not contain diagnostics, so save only units that
+      --  have none. Cache_File was computed from the source file before
+      --  Init_Parser read it: if the file changed in between, the AST we got
+      --  does not match Cache_File, so compute the key again and save only if
+      --  it did not change.
+
+      if Cache_File /= Null_Unbounded_String
+         and then Unit.Diagnostics.Is_Empty
+         and then AST_Cache_File (Unit, Filename, Read_BOM)
+                  = To_String (Cache_File)
+      then
+         Save_To_AST_Cache (Unit, To_String (Cache_File));
+      end if;
    end Do_Parsing;
 
+   --------------------
+   -- AST_Cache_File --
+   --------------------
+
+   function AST_Cache_File
+     (Unit     : Analysis_Unit;
+      Filename : String;
+      Read_BOM : Boolean) return String
+   is
+      use GNATCOLL.Mmap;
+
+      Directory : constant String :=
+         To_String (Unit.Context.AST_Cache_Directory);
+      Key       : GNAT.SHA1.Context := GNAT.SHA1.Initial_Context;
+      File      : Mapped_File;
+      Region    : Mapped_Region;
+   begin
+      if Directory'Length = 0 then
+         return "";
+      end if;
+
+      --  Cache entries depend on the library, on how the source is decoded
+      --  and parsed, and of course on the source itself.
+
+      GNAT.SHA1.Update
+        (Key, AST_Cache_Signature
+              & ASCII.NUL & To_String (Unit.Charset)
+              & ASCII.NUL & Boolean'Image (Read_BOM)
+              & ASCII.NUL & Boolean'Image (Unit.Context.With_Trivia)
+              & ASCII.NUL & Grammar_Rule'Image (Unit.Rule)
+              & ASCII.NUL);
+
+      begin
+         File := Open_Read (Filename);
+      exception
+         when others =>
+            return "";
+      end;
+
+      --  Make sure the mapping is released whatever happens while hashing
+      --  the source. Empty sources have no data to hash.
+
+      begin
+         Region := Read (File);
+         if Last (Region) > 0 then
+            declare
+               Buffer : String (1 .. Last (Region));
+               for Buffer'Address use Data (Region).all'Address;
+            begin
+               GNAT.SHA1.Update (Key, Buffer);
+            end;
+         end if;
+         Free (Region);
+         Close (File);
+      exception
+         when others =>
+            Free (Region);
+            Close (File);
+            return "";
+      end;
+
+      return Ada.Directories.Compose
+        (Directory, GNAT.SHA1.Digest (Key), "ast");
+   end AST_Cache_File;
+
+   -------------------------
+   -- Load_From_AST_Cache --
+   -------------------------
+
+   function Load_From_AST_Cache
+     (Unit : Analysis_Unit; Cache_File : String) return Boolean
+   is
+      File : Stream_IO.File_Type;
+   begin
+      if not Ada.Directories.Exists (Cache_File) then
+         return False;
+      end if;
+
+      Stream_IO.Open (File, Stream_IO.In_File, Cache_File);
+      declare
+         S         : constant Stream_IO.Stream_Access :=
+            Stream_IO.Stream (File);
+         Signature : String (AST_Cache_Signature'Range);
+      begin
+         String'Read (S, Signature);
+         if Signature = AST_Cache_Signature then
+            Lexer.Read_Tokens (S, Unit.TDH);
+            Unit.AST_Mem_Pool := Create (Unit.Context.AST_Page_Cache);
+            Unit.AST_Root := ${root_node_type_name}
+              (Read_Tree (S, Unit, Unit.AST_Mem_Pool));
+         end if;
+      end;
+      Stream_IO.Close (File);
+      return Unit.AST_Root /= null;
+
+   exception
+      --  The entry may be corrupted or truncated (which can make decoding
+      --  raise anything from End_Error to Storage_Error), or another process
+      --  may have removed it: consider this as a cache miss so that the caller
+      --  parses the source instead.
+
+      when others =>
+         if Stream_IO.Is_Open (File) then
+            Stream_IO.Close (File);
+         end if;
+         if Unit.AST_Mem_Pool /= No_Pool then
+            Free (Unit.AST_Mem_Pool);
+         end if;
+         Unit.AST_Root := null;
+         return False;
+   end Load_From_AST_Cache;
+
+   -----------------------
+   -- Save_To_AST_Cache --
+   -----------------------
+
+   procedure Save_To_AST_Cache (Unit : Analysis_Unit; Cache_File : String) is
+      use GNAT.OS_Lib;
+
+      Max_Attempts : constant := 8;
+      --  Number of temporary file names to try before giving up
+
+      Temp_File : Unbounded_String;
+      FD        : File_Descriptor := Invalid_FD;
+      File      : Stream_IO.File_Type;
+      Success   : Boolean;
+
+      procedure Cleanup;
+      --  Close File if it is open and remove Temp_File if it was created
+
+      -------------
+      -- Cleanup --
+      -------------
+
+      procedure Cleanup is
+      begin
+         if Stream_IO.Is_Open (File) then
+            Stream_IO.Close (File);
+         end if;
+         if FD /= Invalid_FD then
+            Delete_File (To_String (Temp_File), Success);
+         end if;
+      end Cleanup;
+
+   begin
+      --  Write the entry to a temporary file that is renamed at the end, so
+      --  that other processes never read incomplete entries. Each writer gets
+      --  its own temporary file: its name contains our process ID and a
+      --  random suffix, and Create_New_File fails if it already exists, in
+      --  which case we just try another suffix.
+
+      for Attempt in 1 .. Max_Attempts loop
+         Temp_File := To_Unbounded_String
+           (Cache_File & "."
+            & Stripped_Image (Pid_To_Integer (Current_Process_Id)) & "."
+            & Stripped_Image (AST_Cache_Random.Random (AST_Cache_Generator))
+            & ".tmp");
+         FD := Create_New_File (To_String (Temp_File), Binary);
+         exit when FD /= Invalid_FD;
+      end loop;
+      if FD = Invalid_FD then
+         return;
+      end if;
+      Close (FD);
+
+      Stream_IO.Open (File, Stream_IO.Out_File, To_String (Temp_File));
+      declare
+         S : constant Stream_IO.Stream_Access := Stream_IO.Stream (File);
+      begin
+         String'Write (S, AST_Cache_Signature);
+         Lexer.Write_Tokens (S, Unit.TDH);
+         Write_Tree (S, Parsed_Node (Unit.AST_Root));
+      end;
+      Stream_IO.Close (File);
+
+      --  On POSIX systems, this is an atomic rename(2): readers see either
+      --  the previous entry or the complete new one.
+
+      Rename_File (To_String (Temp_File), Cache_File, Success);
+      if not Success then
+         Delete_File (To_String (Temp_File), Success);
+      end if;
+
+   exception
+      when Ada.IO_Exceptions.Name_Error
+         | Ada.IO_Exceptions.Use_Error
+         | Ada.IO_Exceptions.Device_Error
+      =>
+         Cleanup;
+
+      when others =>
+         --  Do not leave garbage in the cache directory, but this is not an
+         --  I/O error: let the caller know about it.
+
+         Cleanup;
+         raise;
+   end Save_To_AST_Cache;
+
    -------------------
    -- Get_From_File --
    -------------------
@@ -522,7 +989,8 @@ package body ${ada_lib_name}.Analysis is
       end Init_Parser;
    begin
       return Get_Unit
-        (Context, Filename, Charset, Reparse, Init_Parser'Access, Rule);
+        (Context, Filename, Charset, Reparse, Init_Parser'Access, Rule,
+         From_File => True);
    end Get_From_File;
 
    ---------------------
@@ -549,7 +1017,7 @@ package body ${ada_lib_name}.Analysis is
       end Init_Parser;
    begin
       return Get_Unit (Context, Filename, Charset, True, Init_Parser'Access,
-                       Rule);
+                       Rule, From_File => False);
    end Get_From_Buffer;
 
    % if ctx.default_unit_provider:
@@ -566,17 +1034,72 @@ package body ${ada_lib_name}.Analysis is
       Reparse     : Boolean := False)
       return Analysis_Unit
    is
+      use Ada.Strings.Wide_Wide_Unbounded;
+      use Unit_Provider_Cache_Maps;
+
+      function Error_Message return String is
+        ("Invalid unit name: " & Image (Name, With_Quotes => True)
+         & " (" & Unit_Kind'Image (Kind) & ")");
+
+      Key  : constant Unit_Provider_Cache_Key :=
+        (Name => To_Unbounded_Wide_Wide_String (Name), Kind => Kind);
+      Cur  : constant Cursor := Context.Unit_Provider_Cache.Find (Key);
+      Unit : Analysis_Unit;
    begin
-      return Context.Unit_Provider.Get_Unit
-        (Context, Name, Kind, Charset, Reparse);
+      --  Unless we are asked to reparse the unit, reuse the result of a
+      --  previous query for the same unit, if any: unit providers often need
+      --  to look for files, which is costly.
 
-   exception
-      when Property_Error =>
-         raise Invalid_Unit_Name_Error with
-            "Invalid unit name: " & Image (Name, With_Quotes => True)
-            & " (" & Unit_Kind'Image (Kind) & ")";
+      if not Reparse and then Has_Element (Cur) then
+         Unit := Element (Cur);
+         if Unit = null then
+            raise Invalid_Unit_Name_Error with Error_Message;
+         end if;
+         if not Unit.Context.Frozen then
+            Update_Charset (Unit, Charset);
+         end if;
+         return Unit;
+      end if;
+
+      --  The caches of frozen contexts are read-only, as they may be shared
+
+      begin
+         Unit := Context.Unit_Provider.Get_Unit
+           (Context, Name, Kind, Charset, Reparse);
+      exception
+         when Property_Error =>
+            if not Context.Frozen then
+               Context.Unit_Provider_Cache.Include (Key, null);
+            end if;
+            raise Invalid_Unit_Name_Error with Error_Message;
+      end;
+
+      if not Context.Frozen then
+         Context.Unit_Provider_Cache.Include (Key, Unit);
+      end if;
+      return Unit;
    end Get_From_Provider;
 
+   -------------------------------------
+   -- Remove_From_Unit_Provider_Cache --
+   -------------------------------------
+
+   procedure Remove_From_Unit_Provider_Cache (Unit : Analysis_Unit) is
+      use Unit_Provider_Cache_Maps;
+
+      Cache : Map renames Unit.Context.Unit_Provider_Cache;
+      Cur      : Cursor := Cache.First;
+      Next_Cur : Cursor;
+   begin
+      while Has_Element (Cur) loop
+         Next_Cur := Next (Cur);
+         if Element (Cur) = Unit then
+            Cache.Delete (Cur);
+         end if;
+         Cur := Next_Cur;
+      end loop;
+   end Remove_From_Unit_Provider_Cache;
+
    % endif
 
    --------------------
@@ -594,10 +1117,23 @@ package body ${ada_lib_name}.Analysis is
    is
       use Units_Maps;
 
-      Fname : constant Unbounded_String := To_Unbounded_String (Filename);
-      Cur   : constant Cursor := Context.Units_Map.Find (Fname);
+      Fname        : constant Unbounded_String :=
+         To_Unbounded_String (Filename);
+      Cur          : constant Cursor := Context.Units_Map.Find (Fname);
+      Prelude_Unit : constant Analysis_Unit :=
+        (if Cur = No_Element
+         then Lookup_Prelude (Context, Fname)
+         else null);
    begin
-      if Cur = No_Element then
+      if Prelude_Unit /= null then
+         return Prelude_Unit;
+
+      elsif Cur = No_Element then
+         if Context.Frozen then
+            raise Constraint_Error with
+               "cannot load units in a frozen context";
+         end if;
+
          declare
             Unit : constant Analysis_Unit :=
                Create_Unit (Context, Filename, Charset, Rule);
@@ -624,6 +1160,9 @@ package body ${ada_lib_name}.Analysis is
    begin
       if Cur = No_Element then
          raise Constraint_Error with "No such analysis unit";
+      elsif Context.Frozen then
+         raise Constraint_Error with
+            "cannot remove units from a frozen context";
       end if;
 
       --  We remove the corresponding analysis unit from this context but
@@ -641,6 +1180,10 @@ package body ${ada_lib_name}.Analysis is
          --  Remove all lexical environment artifacts from this analysis unit
          Remove_Exiled_Entries (Unit);
 
+         % if ctx.default_unit_provider:
+         Remove_From_Unit_Provider_Cache (Unit);
+         % endif
+
          Unit.Context := null;
          Dec_Ref (Unit);
       end;
@@ -654,13 +1197,30 @@ package body ${ada_lib_name}.Analysis is
 
    procedure Destroy (Context : in out Analysis_Context) is
    begin
+      % if ctx.default_unit_provider:
+      Context.Unit_Provider_Cache.Clear;
+      % endif
       for Unit of Context.Units_Map loop
          Unit.Context := null;
          Dec_Ref (Unit);
       end loop;
       AST_Envs.Destroy (Context.Root_Scope);
-      Destroy (Context.Symbols);
+
+      --  Symbols belong to the prelude, if any. The caches of the prelude
+      --  cannot reference our nodes (see Freeze), so there is no need to reset
+      --  them.
+
+      if Context.Prelude = null then
+         Destroy (Context.Symbols);
+      else
+         Dec_Ref (Context.Prelude);
+      end if;
       Destroy (Context.Parser);
+
+      --  Units that are still referenced hold their own share of the page
+      --  cache, so it is actually freed only once they are destroyed.
+
+      Dec_Ref (Context.AST_Page_Cache);
       Free (Context);
    end Destroy;
 
@@ -725,6 +1285,10 @@ package body ${ada_lib_name}.Analysis is
       end Unregister;
 
    begin
+      --  Rebindings can belong to frozen lexical environments, which other
+      --  tasks may use at the same time.
+
+      AST_Envs.Lock_Frozen_Envs;
       while Rebindings.Length > 0 loop
          declare
             R : constant Env_Rebindings := Rebindings.Get (1);
@@ -744,6 +1308,7 @@ package body ${ada_lib_name}.Analysis is
             Recurse (R);
          end;
       end loop;
+      AST_Envs.Unlock_Frozen_Envs;
    end Destroy_Rebindings;
 
    -------------
@@ -895,8 +1460,12 @@ package body ${ada_lib_name}.Analysis is
             Unit, Parser);
       end Init_Parser;
    begin
+      if Unit.Context.Frozen then
+         raise Constraint_Error with "cannot reparse a prelude unit";
+      end if;
       Update_Charset (Unit, Charset);
-      Do_Parsing (Unit, Charset'Length = 0, Init_Parser'Access);
+      Do_Parsing (Unit, Charset'Length = 0, Init_Parser'Access,
+                  To_String (Unit.File_Name));
       Update_After_Reparse (Unit);
    end Reparse;
 
@@ -919,6 +1488,9 @@ package body ${ada_lib_name}.Analysis is
            (Buffer, To_String (Unit.Charset), Read_BOM, Unit, Parser);
       end Init_Parser;
    begin
+      if Unit.Context.Frozen then
+         raise Constraint_Error with "cannot reparse a prelude unit";
+      end if;
       Update_Charset (Unit, Charset);
       Do_Parsing (Unit, Charset'Length = 0, Init_Parser'Access);
       Unit.Charset := To_Unbounded_String (Charset);
@@ -937,12 +1509,13 @@ package body ${ada_lib_name}.Analysis is
       Analysis_Unit_Sets.Destroy (Unit.Referenced_Units);
 
       % if ctx.has_memoization:
-         Destroy (Unit.Memoization_Map);
+         Destroy_Memoization (Unit);
       % endif
 
       Destroy_Rebindings (Unit.Rebindings'Access);
       Unit.Rebindings.Destroy;
 
+      Destroy_Kind_Index (Unit);
       if Unit.AST_Root /= null then
          Destroy (Unit.AST_Root);
       end if;
@@ -1081,6 +1654,15 @@ package body ${ada_lib_name}.Analysis is
    function Unit_Provider
      (Context : Analysis_Context)
       return Unit_Provider_Access_Cst is (Context.Unit_Provider);
+
+   ------------------------------------
+   -- Invalidate_Unit_Provider_Cache --
+   ------------------------------------
+
+   procedure Invalidate_Unit_Provider_Cache (Context : Analysis_Context) is
+   begin
+      Context.Unit_Provider_Cache.Clear;
+   end Invalidate_Unit_Provider_Cache;
    % endif
 
    ----------
@@ -1118,6 +1700,14 @@ package body ${ada_lib_name}.Analysis is
    function Trivia_Count (Unit : Analysis_Unit) return Natural is
      (Unit.TDH.Trivias.Length);
 
+   ---------------------------
+   -- AST_Memory_Statistics --
+   ---------------------------
+
+   function AST_Memory_Statistics
+     (Unit : Analysis_Unit) return Pool_Statistics is
+     (Statistics (Unit.AST_Mem_Pool));
+
    -----------------
    -- Get_Context --
    -----------------
@@ -1167,6 +1757,35 @@ package body ${ada_lib_name}.Analysis is
       return Unit.Unit_Version;
    end Version;
 
+   -------------------
+   -- Nodes_Of_Kind --
+   -------------------
+
+   function Nodes_Of_Kind
+     (Unit        : Analysis_Unit;
+      First, Last : ${root_node_kind_name})
+      return ${root_entity.array.api_name}
+   is
+      Nodes : ${root_node_array.name} :=
+         Implementation.Nodes_Of_Kind (Unit, First, Last);
+   begin
+      return Result : ${root_entity.array.api_name} (1 .. Nodes.N) do
+         for I in Result'Range loop
+            Result (I) := (Nodes.Items (I), No_Public_Entity_Info);
+         end loop;
+         Dec_Ref (Nodes);
+      end return;
+   end Nodes_Of_Kind;
+
+   -------------------
+   -- Nodes_Of_Kind --
+   -------------------
+
+   function Nodes_Of_Kind
+     (Unit : Analysis_Unit;
+      Kind : ${root_node_kind_name}) return ${root_entity.array.api_name} is
+     (Nodes_Of_Kind (Unit, Kind, Kind));
+
    --------------------------
    -- Register_Destroyable --
    --------------------------
@@ -1451,6 +2070,185 @@ package body ${ada_lib_name}.Analysis is
    function Element (Self : Token_Iterator; Tok : Token_Type) return Token_Type
    is (Tok);
 
+   ---------------
+   -- To_Cursor --
+   ---------------
+
+   function To_Cursor (Token : Token_Type) return Token_Cursor is
+   begin
+      if Token.TDH = null then
+         return No_Token_Cursor;
+      elsif Token.Trivia /= No_Token_Index then
+         return (Token, Token.Trivia - 1);
+      end if;
+
+      --  Token is a regular token: the last trivia before it is the last
+      --  trivia that comes after the closest token before it that has some.
+      --  Recall that the first entry in Tokens_To_Trivias is for leading
+      --  trivia.
+
+      declare
+         use Trivia_Vectors, Token_Data_Handlers.Integer_Vectors;
+         TDH    : Token_Data_Handler renames Token.TDH.all;
+         Result : Token_Index := No_Token_Index;
+      begin
+         if Length (TDH.Tokens_To_Trivias) /= 0 then
+            for I in reverse 1 .. Natural (Token.Token) loop
+               Result := Token_Index (Get (TDH.Tokens_To_Trivias, I));
+               exit when Result /= No_Token_Index;
+            end loop;
+
+            if Result /= No_Token_Index then
+               while Get (TDH.Trivias, Natural (Result)).Has_Next loop
+                  Result := Result + 1;
+               end loop;
+            end if;
+         end if;
+
+         return (Token, Result);
+      end;
+   end To_Cursor;
+
+   -------------
+   -- Current --
+   -------------
+
+   function Current (Cursor : Token_Cursor) return Token_Type is
+   begin
+      return Cursor.Token;
+   end Current;
+
+   ----------
+   -- Next --
+   ----------
+
+   procedure Next (Cursor : in out Token_Cursor) is
+   begin
+      if Cursor.Token.TDH = null then
+         return;
+      end if;
+
+      declare
+         use Token_Vectors, Trivia_Vectors,
+             Token_Data_Handlers.Integer_Vectors;
+         TDH    : Token_Data_Handler renames Cursor.Token.TDH.all;
+         Token  : constant Token_Index := Cursor.Token.Token;
+         Trivia : constant Token_Index := Cursor.Token.Trivia;
+      begin
+         if Trivia /= No_Token_Index then
+            --  Cursor is on a trivia: go to the next trivia for the same
+            --  token, if any.
+
+            Cursor.Last_Trivia := Trivia;
+            if Get (TDH.Trivias, Natural (Trivia)).Has_Next then
+               Cursor.Token.Trivia := Trivia + 1;
+               return;
+            end if;
+
+         elsif Length (TDH.Tokens_To_Trivias) /= 0 then
+            --  Cursor is on a regular token: go to its first trivia, if any
+
+            declare
+               First_Trivia : constant Token_Index := Token_Index
+                 (Get (TDH.Tokens_To_Trivias, Natural (Token) + 1));
+            begin
+               if First_Trivia /= No_Token_Index then
+                  Cursor.Token.Trivia := First_Trivia;
+                  return;
+               end if;
+            end;
+         end if;
+
+         --  Otherwise, go to the next regular token
+
+         if Token < Token_Index (Last_Index (TDH.Tokens)) then
+            Cursor.Token := (Cursor.Token.TDH, Token + 1, No_Token_Index);
+         else
+            Cursor := No_Token_Cursor;
+         end if;
+      end;
+   end Next;
+
+   --------------
+   -- Previous --
+   --------------
+
+   procedure Previous (Cursor : in out Token_Cursor) is
+   begin
+      if Cursor.Token.TDH = null then
+         return;
+      end if;
+
+      declare
+         use Token_Data_Handlers.Integer_Vectors;
+         TDH    : Token_Data_Handler renames Cursor.Token.TDH.all;
+         Token  : constant Token_Index := Cursor.Token.Token;
+         Trivia : constant Token_Index := Cursor.Token.Trivia;
+      begin
+         if Trivia /= No_Token_Index then
+            --  Cursor is on a trivia: go to the previous trivia for the same
+            --  token if Trivia is not the first one, and to the token itself
+            --  otherwise.
+
+            if Token_Index (Get (TDH.Tokens_To_Trivias, Natural (Token) + 1))
+               /= Trivia
+            then
+               Cursor := ((Cursor.Token.TDH, Token, Trivia - 1), Trivia - 2);
+            elsif Token = No_Token_Index then
+               Cursor := No_Token_Cursor;
+            else
+               Cursor.Token.Trivia := No_Token_Index;
+            end if;
+
+         elsif Cursor.Last_Trivia /= No_Token_Index
+               and then Token_Index
+                 (Get (TDH.Tokens_To_Trivias, Natural (Token)))
+                 /= No_Token_Index
+         then
+            --  Cursor is on a regular token and the previous token has trivia:
+            --  as trivia are stored in source order, the last one is the last
+            --  trivia before the current token.
+
+            Cursor := ((Cursor.Token.TDH, Token - 1, Cursor.Last_Trivia),
+                       Cursor.Last_Trivia - 1);
+
+         elsif Token > First_Token_Index then
+            Cursor.Token.Token := Token - 1;
+
+         else
+            Cursor := No_Token_Cursor;
+         end if;
+      end;
+   end Previous;
+
+   ----------------------
+   -- Fill_Token_Range --
+   ----------------------
+
+   procedure Fill_Token_Range
+     (First, Last : Token_Type;
+      Result      : out Token_Buffer;
+      Count       : out Natural)
+   is
+      Cursor : Token_Cursor := (First, No_Token_Index);
+      --  Only Previous needs Last_Trivia to be accurate, so do not bother
+      --  computing it with To_Cursor.
+   begin
+      if First.TDH /= Last.TDH then
+         raise Constraint_Error;
+      end if;
+
+      Count := 0;
+      while Count < Result'Length
+            and then Cursor.Token /= No_Token
+            and then not (Last < Cursor.Token)
+      loop
+         Result (Result'First + Count) := Cursor.Token;
+         Count := Count + 1;
+         Next (Cursor);
+      end loop;
+   end Fill_Token_Range;
+
    --------------
    -- Raw_Data --
    --------------
@@ -1707,4 +2505,6 @@ package body ${ada_lib_name}.Analysis is
       ${entities.bodies()}
    % endif
 
+begin
+   AST_Cache_Random.Reset (AST_Cache_Generator);
 end ${ada_lib_name}.Analysis;
@@ -136,9 +136,37 @@ package ${ada_lib_name}.Analysis is
       % if ctx.default_unit_provider:
          ; Unit_Provider : Unit_Provider_Access_Cst := null
       % endif
+      ; Prelude     : Analysis_Context := No_Analysis_Context
      ) return Analysis_Context;
    ${ada_doc('langkit.create_context', 3)}
 
+   procedure Freeze (Context : Analysis_Context);
+   --  Populate the lexical environments of all the analysis units in Context
+   --  and then freeze it: after this, loading new units in Context, reparsing
+   --  or removing its units raises a Constraint_Error, and adding entries to
+   --  its lexical environments raises a Property_Error.
+   --
+   --  A frozen context can then be used as the prelude for other contexts
+   --  (see Create): this makes it possible to parse and populate lexical
+   --  environments for units that never change (runtime units, for instance)
+   --  only once.
+   --
+   --  Contexts that share the same frozen context can be used from different
+   --  tasks at the same time (but each context must still be used from one
+   --  task at a time). To make this possible, the frozen context changes as
+   --  follows:
+   --
+   --  * Accesses to its symbol table and to its lexical environments are
+   --    serialized with locks.
+   --
+   --  * The memoization tables of its units become read-only: properties
+   --    evaluated on them reuse the results memoized before the call to
+   --    Freeze, but they do not memoize new results. This also means that
+   --    infinite recursion detection is not available for them anymore.
+
+   function Is_Frozen (Context : Analysis_Context) return Boolean;
+   --  Return whether Freeze was called on Context
+
    procedure Inc_Ref (Context : Analysis_Context);
    ${ada_doc('langkit.context_incref', 3)}
 
@@ -153,6 +181,10 @@ package ${ada_lib_name}.Analysis is
      (Context : Analysis_Context; Timeout : Natural);
    ${ada_doc('langkit.context_set_logic_resolution_timeout', 3)}
 
+   procedure Set_AST_Cache_Directory
+     (Context : Analysis_Context; Directory : String);
+   ${ada_doc('langkit.context_set_ast_cache_directory', 3)}
+
    function Get_From_File
      (Context  : Analysis_Context;
       Filename : String;
@@ -176,7 +208,8 @@ package ${ada_lib_name}.Analysis is
    function Has_Unit
      (Context       : Analysis_Context;
       Unit_Filename : String) return Boolean;
-   --  Returns whether Context contains a unit correponding to Unit_Filename
+   --  Returns whether Context contains a unit correponding to Unit_Filename.
+   --  This includes the units of Context's prelude, if any.
 
    % if ctx.default_unit_provider:
 
@@ -204,6 +237,9 @@ package ${ada_lib_name}.Analysis is
    function Unit_Provider
      (Context : Analysis_Context) return Unit_Provider_Access_Cst;
    --  Object to translate unit names to file names
+
+   procedure Invalidate_Unit_Provider_Cache (Context : Analysis_Context);
+   ${ada_doc('langkit.invalidate_unit_provider_cache', 3)}
    % endif
 
    procedure Remove
@@ -265,6 +301,11 @@ package ${ada_lib_name}.Analysis is
    function Trivia_Count (Unit : Analysis_Unit) return Natural;
    ${ada_doc('langkit.unit_trivia_count', 3)}
 
+   function AST_Memory_Statistics
+     (Unit : Analysis_Unit) return Pool_Statistics;
+   --  Return statistics about the memory allocated to store the AST of Unit:
+   --  number of pages, bytes allocated and bytes wasted at the end of pages.
+
    procedure Dump_Lexical_Env (Unit : Analysis_Unit);
    --  Debug helper: output the lexical envs for given analysis unit
 
@@ -400,6 +441,40 @@ package ${ada_lib_name}.Analysis is
      (Self : Token_Iterator; Tok : Token_Type) return Boolean;
    function Element (Self : Token_Iterator; Tok : Token_Type) return Token_Type;
 
+   ------------------
+   -- Token Cursor --
+   ------------------
+
+   type Token_Cursor is private;
+   --  Cursor to go through the tokens and trivia of an analysis unit. Unlike
+   --  Next and Previous on Token_Type values, which have to look for trivia
+   --  in the token stream, moving a cursor in either direction is done in
+   --  constant time.
+
+   No_Token_Cursor : constant Token_Cursor;
+
+   function To_Cursor (Token : Token_Type) return Token_Cursor;
+   --  Return a cursor on Token. This can take linear time in the number of
+   --  tokens in the unit, so create cursors once and then move them.
+
+   function Current (Cursor : Token_Cursor) return Token_Type;
+   --  Return the token or trivia that Cursor designates. This is No_Token if
+   --  Cursor went past either end of the token stream.
+
+   procedure Next (Cursor : in out Token_Cursor);
+   --  Move Cursor to the next token or trivia in the token stream
+
+   procedure Previous (Cursor : in out Token_Cursor);
+   --  Move Cursor to the previous token or trivia in the token stream
+
+   type Token_Buffer is array (Positive range <>) of Token_Type;
+
+   procedure Fill_Token_Range
+     (First, Last : Token_Type;
+      Result      : out Token_Buffer;
+      Count       : out Natural);
+   ${ada_doc('langkit.token_range_fill', 3)}
+
    -----------------------
    -- Enumeration types --
    -----------------------
@@ -420,6 +495,21 @@ package ${ada_lib_name}.Analysis is
       % endif
    % endfor
 
+   --------------------------
+   -- Node lookups by kind --
+   --------------------------
+
+   function Nodes_Of_Kind
+     (Unit        : Analysis_Unit;
+      First, Last : ${root_node_kind_name})
+      return ${root_entity.array.api_name};
+   ${ada_doc('langkit.unit_nodes_of_kind', 3)}
+
+   function Nodes_Of_Kind
+     (Unit : Analysis_Unit;
+      Kind : ${root_node_kind_name}) return ${root_entity.array.api_name};
+   --  Shortcut for Nodes_Of_Kind (Unit, Kind, Kind)
+
    % if not ctx.separate_properties:
       ${entities.decls3()}
    % endif
@@ -540,6 +630,22 @@ private
    function Last_Token (TDH : Token_Data_Handler_Access) return Token_Type;
    --  Internal helper. Return a reference to the last token in TDH.
 
+   ------------------------------
+   -- Token Cursor (internals) --
+   ------------------------------
+
+   type Token_Cursor is record
+      Token       : Token_Type;
+      --  Token or trivia that this cursor designates
+
+      Last_Trivia : Token_Index;
+      --  Index in TDH.Trivias for the last trivia that comes before Token in
+      --  the token stream, or No_Token_Index if there is no such trivia. This
+      --  is what makes it possible for Previous to run in constant time.
+   end record;
+
+   No_Token_Cursor : constant Token_Cursor := (No_Token, No_Token_Index);
+
    --------------------------------
    -- Token Iterator (internals) --
    --------------------------------
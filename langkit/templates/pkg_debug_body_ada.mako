@@ -51,7 +51,7 @@ package body ${ada_lib_name}.Debug is
          begin
             Put (Token_Kind_Name (D.Kind));
             Put (" " & Image (Text (TDH.all, D), With_Quotes => True));
-            Put_Line (" [" & Image (D.Sloc_Range) & "]");
+            Put_Line (" [" & Image (Sloc_Range (TDH.all, D)) & "]");
          end;
       end if;
    end PTok;
@@ -81,4 +81,47 @@ package body ${ada_lib_name}.Debug is
       return Symbol.Success and then Image (S.all) = Image (Symbol.Symbol);
    end Sym_Matches;
 
+   ---------------------------------
+   -- Dump_Memoization_Statistics --
+   ---------------------------------
+
+   procedure Dump_Memoization_Statistics
+     (Context : Analysis.Analysis_Context) is
+   % if ctx.has_memoization:
+      function Img (N : Long_Long_Integer) return String;
+      --  Return the image of N without the leading space
+
+      ---------
+      -- Img --
+      ---------
+
+      function Img (N : Long_Long_Integer) return String is
+         Result : constant String := Long_Long_Integer'Image (N);
+      begin
+         return Result (Result'First + 1 .. Result'Last);
+      end Img;
+
+      Stats : constant Mmz_Stats_Array := Memoization_Statistics (Context);
+   begin
+      for P in Stats'Range loop
+         declare
+            S : Mmz_Property_Stats renames Stats (P);
+         begin
+            Put_Line
+              (Mmz_Property_Name (P) & ":"
+               & " hits=" & Img (S.Hits)
+               & " misses=" & Img (S.Misses)
+               & " evictions=" & Img (S.Evictions)
+               & " entries=" & Img (Long_Long_Integer (S.Entries))
+               & " bytes=" & Img (S.Bytes)
+               & " limit=" & Img (Long_Long_Integer (Mmz_Limits (P))));
+         end;
+      end loop;
+   % else:
+      pragma Unreferenced (Context);
+   begin
+      Put_Line ("No memoized property");
+   % endif
+   end Dump_Memoization_Statistics;
+
 end ${ada_lib_name}.Debug;
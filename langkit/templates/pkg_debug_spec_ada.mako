@@ -34,4 +34,11 @@ package ${ada_lib_name}.Debug is
    --  Return whether the text associated to S matches Text. There is a bug in
    --  GDB that makes comparison with "=" always return false.
 
+   procedure Dump_Memoization_Statistics
+     (Context : Analysis.Analysis_Context);
+   --  Print statistics about the memoization of properties in all the units
+   --  of Context. For each memoized property, this includes the number of
+   --  cache hits, misses and evictions, and the number of entries currently
+   --  in caches as well as their approximate memory footprint.
+
 end ${ada_lib_name}.Debug;
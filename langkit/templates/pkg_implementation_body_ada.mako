@@ -11,7 +11,9 @@
 <% root_node_array = T.root_node.array %>
 
 with Ada.Containers;                  use Ada.Containers;
+with Ada.Containers.Generic_Array_Sort;
 with Ada.Strings.Wide_Wide_Unbounded; use Ada.Strings.Wide_Wide_Unbounded;
+with Ada.Strings.Wide_Wide_Unbounded.Wide_Wide_Hash;
 with Ada.Text_IO;                     use Ada.Text_IO;
 with Ada.Unchecked_Conversion;
 with Ada.Unchecked_Deallocation;
@@ -168,6 +170,19 @@ package body ${ada_lib_name}.Analysis.Implementation is
             end if;
          % endif
 
+         --  Lexical environments that belong to frozen contexts can be shared
+         --  by several contexts, so they must not change. Root scopes are the
+         --  only environments with no node: if Env is not ours, it belongs to
+         --  a prelude.
+         if Env /= Empty_Env
+            and then Env /= Root_Scope
+            and then (Env.Env.Node = null
+                      or else Env.Env.Node.Unit.Context.Frozen)
+         then
+            raise Property_Error with "Cannot add_to_env into a lexical"
+                                      & " environment of a frozen context";
+         end if;
+
          --  Add the element to the environment
          Add (Self  => Env,
               Key   => Mapping.F_Key,
@@ -530,9 +545,9 @@ package body ${ada_lib_name}.Analysis.Implementation is
          Convert (Node.Unit).TDH;
       Sloc_Start, Sloc_End : Source_Location;
 
-      function Get
-        (Index : Token_Index) return Lexer.Token_Data_Type is
-        (Get_Token (TDH, Index));
+      function Token_Sloc
+        (Index : Token_Index) return Source_Location_Range is
+        (Lexer.Sloc_Range (TDH, Get_Token (TDH, Index)));
 
    begin
       if Node.Is_Synthetic then
@@ -560,15 +575,15 @@ package body ${ada_lib_name}.Analysis.Implementation is
             Tok_End : constant Token_Index :=
               Token_Index'Min (Node.Token_End_Index + 1, Last_Token (TDH));
          begin
-            Sloc_Start := End_Sloc (Get (Tok_Start).Sloc_Range);
-            Sloc_End := Start_Sloc (Get (Tok_End).Sloc_Range);
+            Sloc_Start := End_Sloc (Token_Sloc (Tok_Start));
+            Sloc_End := Start_Sloc (Token_Sloc (Tok_End));
          end;
       else
-         Sloc_Start := Start_Sloc (Get (Node.Token_Start_Index).Sloc_Range);
+         Sloc_Start := Start_Sloc (Token_Sloc (Node.Token_Start_Index));
          Sloc_End :=
            (if Node.Token_End_Index /= No_Token_Index
-            then End_Sloc (Get (Node.Token_End_Index).Sloc_Range)
-            else Start_Sloc (Get (Node.Token_Start_Index).Sloc_Range));
+            then End_Sloc (Token_Sloc (Node.Token_End_Index))
+            else Start_Sloc (Token_Sloc (Node.Token_Start_Index)));
       end if;
       return Make_Range (Sloc_Start, Sloc_End);
    end Sloc_Range;
@@ -606,42 +621,67 @@ package body ${ada_lib_name}.Analysis.Implementation is
       --  assume that all lookups fall into this node's sloc range.
       pragma Assert (Compare (Sloc_Range (Node, Snap), Sloc) = Inside);
 
-      Children : constant ${root_node_array.api_name} := Node.Children;
-      Pos      : Relative_Position;
-      Result   : ${root_node_type_name};
-   begin
       --  Look for a child node that contains Sloc (i.e. return the most
       --  precise result).
+      --
+      --  Note that we assume here that child nodes are ordered so that the
+      --  first one has a sloc range that is before the sloc range of the
+      --  second child node, etc. This means that Sloc is after all children
+      --  up to some index, and then it is inside or before the others: do a
+      --  binary search for the first child for which Sloc is not after. This
+      --  avoids both allocating the array of children and going through all
+      --  of them, which matters for big list nodes.
+
+      Low       : Positive := 1;
+      High      : Natural := Node.Child_Count;
+      Candidate : ${root_node_type_name} := null;
+      Pos       : Relative_Position := Before;
+   begin
+      while Low <= High loop
+         declare
+            Middle : constant Positive := Low + (High - Low) / 2;
+            Index  : Positive := Middle;
+            Child  : ${root_node_type_name} := Node.Child (Index);
+         begin
+            --  Null children have no sloc range: use the first non-null child
+            --  in Middle .. High instead.
 
-      for Child of Children loop
-         --  Note that we assume here that child nodes are ordered so that the
-         --  first one has a sloc range that is before the sloc range of the
-         --  second child node, etc.
+            while Child = null and then Index < High loop
+               Index := Index + 1;
+               Child := Node.Child (Index);
+            end loop;
 
-         if Child /= null then
-            Lookup_Relative (Child, Sloc, Pos, Result, Snap);
-            case Pos is
-               when Before =>
-                   --  If this is the first node, Sloc is before it, so we can
-                   --  stop here.  Otherwise, Sloc is between the previous
-                   --  child node and the next one...  so we can stop here,
-                   --  too.
-                   return Node;
-
-               when Inside =>
-                   return Result;
-
-               when After =>
-                   --  Sloc is after the current child node, so see with the
-                   --  next one.
-                   null;
-            end case;
-         end if;
+            if Child = null then
+               --  All children in Middle .. High are null: look before
+               High := Middle - 1;
+
+            else
+               declare
+                  Child_Pos : constant Relative_Position :=
+                     Compare (Child, Sloc, Snap);
+               begin
+                  if Child_Pos = After then
+                     Low := Index + 1;
+                  else
+                     Candidate := Child;
+                     Pos := Child_Pos;
+                     High := Middle - 1;
+                  end if;
+               end;
+            end if;
+         end;
       end loop;
 
-      --  If we reach this point, we found no children that covers Sloc, but
-      --  Node still covers it (see the assertion).
-      return Node;
+      --  If Sloc is inside the first child for which it is not after, look
+      --  for a more precise result in it. Otherwise, Sloc is before the first
+      --  child, between two children or after the last one: no child covers
+      --  it, but Node still covers it (see the assertion).
+
+      if Candidate /= null and then Pos = Inside then
+         return Lookup_Internal (Candidate, Sloc, Snap);
+      else
+         return Node;
+      end if;
    end Lookup_Internal;
 
    -------------
@@ -908,6 +948,26 @@ package body ${ada_lib_name}.Analysis.Implementation is
       return H (Node);
    end Hash;
 
+   ----------
+   -- Hash --
+   ----------
+
+   function Hash (Unit : Analysis_Unit) return Hash_Type is
+      function H is new Hash_Access (Analysis_Unit_Type, Analysis_Unit);
+   begin
+      return H (Unit);
+   end Hash;
+
+   % if ctx.default_unit_provider:
+   ----------
+   -- Hash --
+   ----------
+
+   function Hash (Key : Unit_Provider_Cache_Key) return Hash_Type is
+     (Combine (Wide_Wide_Hash (Key.Name),
+               Hash_Type (Unit_Kind'Pos (Key.Kind))));
+   % endif
+
    % if T.BoolType.requires_hash_function:
       function Hash (B : Boolean) return Hash_Type is (Boolean'Pos (B));
    % endif
@@ -1236,7 +1296,7 @@ package body ${ada_lib_name}.Analysis.Implementation is
               Source_Buffer => Text_Cst_Access (TDH.Source_Buffer),
               Source_First  => Raw_Data.Source_First,
               Source_Last   => Raw_Data.Source_Last,
-              Sloc_Range    => Raw_Data.Sloc_Range);
+              Sloc_Range    => Lexer.Sloc_Range (TDH, Raw_Data));
    end Convert;
 
    -----------
@@ -1610,6 +1670,18 @@ package body ${ada_lib_name}.Analysis.Implementation is
       return Image (Result);
    end Image;
 
+   ----------
+   -- Hash --
+   ----------
+
+   function Hash (Ent : ${T.entity.name}) return Hash_Type is
+   begin
+      --  Entities that only differ by their entity info are rare, so hashing
+      --  the node is enough.
+
+      return Hash (Ent.El);
+   end Hash;
+
    ---------------
    -- Can_Reach --
    ---------------
@@ -1825,6 +1897,74 @@ package body ${ada_lib_name}.Analysis.Implementation is
       end Trace_Image;
    % endif
 
+   % if ctx.generate_pp:
+   type Buffer_Output is new Unparsing_Output with record
+      Buffer : Unbounded_String;
+   end record;
+   --  Unparsing output that accumulates the source code in a string buffer
+
+   overriding procedure Put (Output : in out Buffer_Output; Text : String);
+
+   type File_Output is new Unparsing_Output with record
+      File : File_Type;
+   end record;
+   --  Unparsing output that writes the source code to a file
+
+   overriding procedure Put (Output : in out File_Output; Text : String);
+
+   ---------
+   -- Put --
+   ---------
+
+   overriding procedure Put (Output : in out Buffer_Output; Text : String) is
+   begin
+      Append (Output.Buffer, Text);
+   end Put;
+
+   ---------
+   -- Put --
+   ---------
+
+   overriding procedure Put (Output : in out File_Output; Text : String) is
+   begin
+      Ada.Text_IO.Put (Output.File, Text);
+   end Put;
+
+   --------
+   -- PP --
+   --------
+
+   function PP
+     (Node : access ${root_node_value_type}'Class) return String
+   is
+      Output : Buffer_Output;
+   begin
+      Node.Unparse (Output);
+      return To_String (Output.Buffer);
+   end PP;
+
+   --------
+   -- PP --
+   --------
+
+   procedure PP
+     (Node     : access ${root_node_value_type}'Class;
+      Filename : String)
+   is
+      Output : File_Output;
+   begin
+      Create (Output.File, Out_File, Filename);
+      Node.Unparse (Output);
+      Close (Output.File);
+   exception
+      when others =>
+         if Is_Open (Output.File) then
+            Close (Output.File);
+         end if;
+         raise;
+   end PP;
+   % endif
+
    Kind_Names : array (${root_node_kind_name}) of Unbounded_String :=
      (${", \n".join(cls.ada_kind_name
                     + " => To_Unbounded_String (\""
@@ -2040,11 +2180,167 @@ package body ${ada_lib_name}.Analysis.Implementation is
          Unit.Cache_Version := Unit.Context.Cache_Version;
          Reset_Envs (Unit);
          % if ctx.has_memoization:
-            Destroy (Unit.Memoization_Map);
+            Destroy_Memoization (Unit);
          % endif
       end if;
    end Reset_Caches;
 
+   function Build_Kind_Index
+     (Root : ${root_node_type_name}) return Node_Kind_Index_Access;
+   --  Create an index by kind for all the nodes in the Root tree
+
+   function "<" (Left, Right : Kind_Index_Entry) return Boolean is
+     (Left.Position < Right.Position);
+
+   procedure Sort_By_Position is new Ada.Containers.Generic_Array_Sort
+     (Index_Type   => Positive,
+      Element_Type => Kind_Index_Entry,
+      Array_Type   => Kind_Index_Entry_Array);
+
+   procedure Free is new Ada.Unchecked_Deallocation
+     (Kind_Index_Entry_Array, Kind_Index_Entry_Array_Access);
+
+   ----------------------
+   -- Build_Kind_Index --
+   ----------------------
+
+   function Build_Kind_Index
+     (Root : ${root_node_type_name}) return Node_Kind_Index_Access
+   is
+      Counts   : Kind_Index_Bounds := (others => 0);
+      Next     : Kind_Index_Bounds;
+      Position : Natural := 0;
+      Size     : Natural := 0;
+      Result   : Node_Kind_Index_Access;
+
+      function Count
+        (Node : access ${root_node_value_type}'Class) return Visit_Status;
+      --  Count Node in Counts
+
+      function Fill
+        (Node : access ${root_node_value_type}'Class) return Visit_Status;
+      --  Add Node to Result.Entries
+
+      -----------
+      -- Count --
+      -----------
+
+      function Count
+        (Node : access ${root_node_value_type}'Class) return Visit_Status is
+      begin
+         Counts (Node.Kind) := Counts (Node.Kind) + 1;
+         return Into;
+      end Count;
+
+      ----------
+      -- Fill --
+      ----------
+
+      function Fill
+        (Node : access ${root_node_value_type}'Class) return Visit_Status is
+      begin
+         Position := Position + 1;
+         Result.Entries (Next (Node.Kind)) :=
+           (Position, ${root_node_type_name} (Node));
+         Next (Node.Kind) := Next (Node.Kind) + 1;
+         return Into;
+      end Fill;
+
+   begin
+      --  First count the nodes of each kind, so that we can allocate the
+      --  index and reserve a slice of its entries for each kind. Then go
+      --  through the tree again to fill these slices: nodes end up in
+      --  document order in each of them.
+
+      Traverse (Root, Count'Access);
+      for C of Counts loop
+         Size := Size + C;
+      end loop;
+
+      Result := new Node_Kind_Index (Size);
+      declare
+         First : Positive := 1;
+      begin
+         for K in Counts'Range loop
+            Result.First (K) := First;
+            Result.Last (K) := First + Counts (K) - 1;
+            First := First + Counts (K);
+         end loop;
+      end;
+
+      Next := Result.First;
+      Traverse (Root, Fill'Access);
+      return Result;
+   end Build_Kind_Index;
+
+   -------------------
+   -- Nodes_Of_Kind --
+   -------------------
+
+   function Nodes_Of_Kind
+     (Unit        : Analysis_Unit;
+      First, Last : ${root_node_kind_name}) return ${root_node_array.name}
+   is
+      Kinds_Count : Natural := 0;
+   begin
+      if First > Last then
+         return Create (0);
+      elsif Unit.Kind_Index = null then
+         Unit.Kind_Index := Build_Kind_Index (Unit.AST_Root);
+      end if;
+
+      declare
+         Index  : Node_Kind_Index renames Unit.Kind_Index.all;
+         Lower  : constant Positive := Index.First (First);
+         Upper  : constant Natural := Index.Last (Last);
+         Result : constant ${root_node_array.name} :=
+            Create (Upper - Lower + 1);
+      begin
+         for K in First .. Last loop
+            if Index.First (K) <= Index.Last (K) then
+               Kinds_Count := Kinds_Count + 1;
+            end if;
+         end loop;
+
+         if Kinds_Count <= 1 then
+            --  All nodes have the same kind, so they are already in document
+            --  order.
+
+            for I in Result.Items'Range loop
+               Result.Items (I) := Index.Entries (Lower + I - 1).Node;
+            end loop;
+
+         else
+            --  Nodes for each kind are in document order, but we have to
+            --  interleave them.
+
+            declare
+               Entries : Kind_Index_Entry_Array_Access :=
+                  new Kind_Index_Entry_Array'(Index.Entries (Lower .. Upper));
+            begin
+               Sort_By_Position (Entries.all);
+               for I in Result.Items'Range loop
+                  Result.Items (I) := Entries (Lower + I - 1).Node;
+               end loop;
+               Free (Entries);
+            end;
+         end if;
+
+         return Result;
+      end;
+   end Nodes_Of_Kind;
+
+   ------------------------
+   -- Destroy_Kind_Index --
+   ------------------------
+
+   procedure Destroy_Kind_Index (Unit : Analysis_Unit) is
+      procedure Free is new Ada.Unchecked_Deallocation
+        (Node_Kind_Index, Node_Kind_Index_Access);
+   begin
+      Free (Unit.Kind_Index);
+   end Destroy_Kind_Index;
+
    % if ctx.has_memoization:
 
       ----------------------------
@@ -2056,21 +2352,160 @@ package body ${ada_lib_name}.Analysis.Implementation is
          Key    : in out Mmz_Key;
          Cursor : out Memoization_Maps.Cursor) return Boolean
       is
+         Property : constant Mmz_Property := Key.Property;
+         Limit    : constant Natural := Mmz_Limits (Property);
+         LRU      : Mmz_Key_Lists.List renames
+            Unit.Memoization_LRU (Property);
+         Stats    : Mmz_Property_Stats renames
+            Unit.Memoization_Stats (Property);
+
          Inserted : Boolean;
-         Value    : constant Mmz_Value := (Kind => Mmz_Evaluating);
+         Value    : constant Mmz_Value :=
+           (Kind => Mmz_Evaluating, others => <>);
       begin
+         --  Several tasks can use the units of frozen contexts at the same
+         --  time, so their memoization tables are read-only. Their caches are
+         --  never stale (see Freeze).
+
+         if Unit.Context.Frozen then
+            Cursor := Unit.Memoization_Map.Find (Key);
+            if Memoization_Maps.Has_Element (Cursor)
+               and then Memoization_Maps.Element (Cursor).Kind
+                        /= Mmz_Evaluating
+            then
+               Destroy (Key.Items);
+               Key := Memoization_Maps.Key (Cursor);
+               return False;
+            end if;
+
+            Destroy (Key.Items);
+            Cursor := Memoization_Maps.No_Element;
+            return True;
+         end if;
+
          --  Make sure that we don't lookup stale caches
          Reset_Caches (Unit);
 
          Unit.Memoization_Map.Insert (Key, Value, Cursor, Inserted);
 
          if not Inserted then
+            Stats.Hits := Stats.Hits + 1;
             Destroy (Key.Items);
             Key := Memoization_Maps.Key (Cursor);
+
+            --  This entry is now the most recently used one
+            if Limit /= 0 then
+               LRU.Splice
+                 (Before   => LRU.First,
+                  Position => Memoization_Maps.Element (Cursor).LRU_Position);
+            end if;
+            return False;
+         end if;
+
+         Stats.Misses := Stats.Misses + 1;
+         Stats.Entries := Stats.Entries + 1;
+         Stats.Bytes := Stats.Bytes + Entry_Size (Key);
+
+         if Limit /= 0 then
+            LRU.Prepend (Key);
+            Unit.Memoization_Map.Replace_Element
+              (Cursor, (Kind => Mmz_Evaluating, LRU_Position => LRU.First));
+
+            --  Evict the least recently used entries until we are back under
+            --  the limit. Entries that are being evaluated must stay, as their
+            --  evaluation holds cursors to them.
+
+            declare
+               Position : Mmz_Key_Lists.Cursor := LRU.Last;
+            begin
+               while Stats.Entries > Limit
+                     and then Mmz_Key_Lists.Has_Element (Position)
+               loop
+                  declare
+                     use Memoization_Maps;
+
+                     Previous    : constant Mmz_Key_Lists.Cursor :=
+                        Mmz_Key_Lists.Previous (Position);
+                     Evicted_Key : Mmz_Key := Mmz_Key_Lists.Element (Position);
+                     Map_Cursor  : Memoization_Maps.Cursor :=
+                        Unit.Memoization_Map.Find (Evicted_Key);
+                     Evicted     : Mmz_Value := Element (Map_Cursor);
+                  begin
+                     if Evicted.Kind /= Mmz_Evaluating then
+                        Unit.Memoization_Map.Delete (Map_Cursor);
+                        LRU.Delete (Position);
+                        Stats.Evictions := Stats.Evictions + 1;
+                        Stats.Entries := Stats.Entries - 1;
+                        Stats.Bytes := Stats.Bytes - Entry_Size (Evicted_Key);
+                        Destroy (Evicted_Key.Items);
+                        Destroy (Evicted);
+                     end if;
+                     Position := Previous;
+                  end;
+               end loop;
+            end;
          end if;
 
-         return Inserted;
+         return True;
       end Lookup_Memoization_Map;
+
+      --------------------------
+      -- Store_Memoized_Value --
+      --------------------------
+
+      procedure Store_Memoized_Value
+        (Unit   : Analysis_Unit;
+         Cursor : Memoization_Maps.Cursor;
+         Value  : in out Mmz_Value) is
+      begin
+         if not Memoization_Maps.Has_Element (Cursor) then
+            return;
+         end if;
+
+         Value.LRU_Position :=
+            Memoization_Maps.Element (Cursor).LRU_Position;
+         Unit.Memoization_Map.Replace_Element (Cursor, Value);
+      end Store_Memoized_Value;
+
+      -------------------------
+      -- Destroy_Memoization --
+      -------------------------
+
+      procedure Destroy_Memoization (Unit : Analysis_Unit) is
+      begin
+         Destroy (Unit.Memoization_Map);
+         for P in Mmz_Property loop
+            Unit.Memoization_LRU (P).Clear;
+            Unit.Memoization_Stats (P).Entries := 0;
+            Unit.Memoization_Stats (P).Bytes := 0;
+         end loop;
+      end Destroy_Memoization;
+
+      ----------------------------
+      -- Memoization_Statistics --
+      ----------------------------
+
+      function Memoization_Statistics
+        (Context : Analysis_Context) return Mmz_Stats_Array
+      is
+         Result : Mmz_Stats_Array;
+      begin
+         for Unit of Context.Units_Map loop
+            for P in Mmz_Property loop
+               declare
+                  R : Mmz_Property_Stats renames Result (P);
+                  S : Mmz_Property_Stats renames Unit.Memoization_Stats (P);
+               begin
+                  R.Hits := R.Hits + S.Hits;
+                  R.Misses := R.Misses + S.Misses;
+                  R.Evictions := R.Evictions + S.Evictions;
+                  R.Entries := R.Entries + S.Entries;
+                  R.Bytes := R.Bytes + S.Bytes;
+               end;
+            end loop;
+         end loop;
+         return Result;
+      end Memoization_Statistics;
    % endif
 
 end ${ada_lib_name}.Analysis.Implementation;
@@ -16,9 +16,13 @@
 %>
 
 with Ada.Containers; use Ada.Containers;
+% if ctx.has_memoization:
+with Ada.Containers.Doubly_Linked_Lists;
+% endif
 with Ada.Containers.Hashed_Maps;
 with Ada.Strings.Unbounded; use Ada.Strings.Unbounded;
 with Ada.Strings.Unbounded.Hash;
+with Ada.Strings.Wide_Wide_Unbounded;
 with Ada.Unchecked_Deallocation;
 
 with System;
@@ -237,8 +241,29 @@ package ${ada_lib_name}.Analysis.Implementation is
    % endfor
 
    % if ctx.generate_pp:
+   type Unparsing_Output is abstract tagged limited null record;
+   --  Destination for the source code that Unparse produces
+
+   procedure Put
+     (Output : in out Unparsing_Output; Text : String) is abstract;
+   --  Append Text to Output
+
+   procedure Unparse
+     (Node   : access ${root_node_value_type};
+      Output : in out Unparsing_Output'Class) is abstract;
+   --  Write the source code for Node to Output. Text is written as the tree
+   --  is traversed, so this runs in linear time and the only memory it
+   --  needs is what Output needs to store the text.
+
    function PP
-     (Node : access ${root_node_value_type}) return String is abstract;
+     (Node : access ${root_node_value_type}'Class) return String;
+   --  Return the source code for Node, as computed by Unparse
+
+   procedure PP
+     (Node     : access ${root_node_value_type}'Class;
+      Filename : String);
+   --  Write the source code for Node, as computed by Unparse, to the Filename
+   --  file. The text is not built in memory first.
    % else:
    function PP
      (Node : access ${root_node_value_type}) return String
@@ -433,6 +458,9 @@ package ${ada_lib_name}.Analysis.Implementation is
    function Image (Ent : ${T.entity.name}) return String;
    ${ada_doc('langkit.entity_image', 3)}
 
+   function Hash (Ent : ${T.entity.name}) return Hash_Type;
+   --  Hash function for entities, used to memoize logic predicates
+
    package Eq_Node is new Langkit_Support.Adalog.Eq_Same
      (LR_Type       => ${T.entity.name},
       Element_Image => Image);
@@ -758,8 +786,10 @@ package ${ada_lib_name}.Analysis.Implementation is
    package Destroyable_Vectors is new Langkit_Support.Vectors
      (Destroyable_Type);
 
+   function Hash (Unit : Analysis_Unit) return Hash_Type;
+
    package Analysis_Unit_Sets is new Langkit_Support.Cheap_Sets
-     (Analysis_Unit, null);
+     (Analysis_Unit, null, Hash);
 
    package Units_Maps is new Ada.Containers.Hashed_Maps
      (Key_Type        => Unbounded_String,
@@ -767,6 +797,53 @@ package ${ada_lib_name}.Analysis.Implementation is
       Hash            => Ada.Strings.Unbounded.Hash,
       Equivalent_Keys => "=");
 
+   % if ctx.default_unit_provider:
+   type Unit_Provider_Cache_Key is record
+      Name : Ada.Strings.Wide_Wide_Unbounded.Unbounded_Wide_Wide_String;
+      Kind : Unit_Kind;
+   end record;
+   --  Unit names are not turned into symbols so that looking up the cache
+   --  does not grow the context's symbol table.
+
+   function Hash (Key : Unit_Provider_Cache_Key) return Hash_Type;
+
+   package Unit_Provider_Cache_Maps is new Ada.Containers.Hashed_Maps
+     (Key_Type        => Unit_Provider_Cache_Key,
+      Element_Type    => Analysis_Unit,
+      Hash            => Hash,
+      Equivalent_Keys => "=");
+   --  Cache for the results of unit providers. Keys are the name and kind of
+   --  requested units, and elements are the corresponding units, or null for
+   --  names that the unit provider rejected.
+   % endif
+
+   type Kind_Index_Entry is record
+      Position : Positive;
+      --  Index of Node in a prefix traversal of its unit's tree, i.e. rank of
+      --  Node in document order.
+
+      Node : ${root_node_type_name};
+   end record;
+
+   type Kind_Index_Entry_Array is
+      array (Positive range <>) of Kind_Index_Entry;
+   type Kind_Index_Entry_Array_Access is access all Kind_Index_Entry_Array;
+
+   type Kind_Index_Bounds is array (${root_node_kind_name}) of Natural;
+
+   type Node_Kind_Index (Size : Natural) is record
+      First, Last : Kind_Index_Bounds;
+      --  For each node kind K, the nodes of kind K are
+      --  Entries (First (K) .. Last (K)).
+
+      Entries : Kind_Index_Entry_Array (1 .. Size);
+      --  All the nodes in a unit, sorted by kind first and then in document
+      --  order. As the kinds for the subclasses of a node type form a range,
+      --  the nodes of this type are contiguous in this array.
+   end record;
+   type Node_Kind_Index_Access is access all Node_Kind_Index;
+   --  Index of the nodes in an analysis unit by kind
+
    % if ctx.symbol_literals:
       type Symbol_Literal_Type is (
          <%
@@ -801,6 +878,11 @@ package ${ada_lib_name}.Analysis.Implementation is
       % if ctx.default_unit_provider:
       Unit_Provider : Unit_Provider_Access_Cst;
       --  Object to translate unit names to file names
+
+      Unit_Provider_Cache : Unit_Provider_Cache_Maps.Map;
+      --  Results of previous queries to Unit_Provider, so that
+      --  Get_From_Provider does not invoke it again for the same units. See
+      --  Invalidate_Unit_Provider_Cache.
       % endif
 
       % if ctx.symbol_literals:
@@ -812,6 +894,11 @@ package ${ada_lib_name}.Analysis.Implementation is
       --  Main parser type. TODO: If we want to parse in several tasks, we'll
       --  replace that by an array of parsers.
 
+      AST_Page_Cache : Page_Cache;
+      --  Cache of free pages for the AST memory pools of this context's
+      --  units, so that reparsing units reuses pages instead of going through
+      --  the system allocator.
+
       Discard_Errors_In_Populate_Lexical_Env : Boolean := True;
       --  See the eponym procedure
 
@@ -830,6 +917,17 @@ package ${ada_lib_name}.Analysis.Implementation is
       --  Version number used to invalidate memoization caches in a lazy
       --  fashion. If an analysis unit's version number is strictly inferior to
       --  this, its memoization map should be cleared.
+
+      AST_Cache_Directory : Unbounded_String;
+      --  Directory for the AST cache, or empty string if the AST cache is
+      --  disabled. See the Set_AST_Cache_Directory procedure.
+
+      Prelude : Analysis_Context := null;
+      --  Frozen context whose units this context shares, if any. This context
+      --  owns a reference to it, and shares its symbol table.
+
+      Frozen : Boolean := False;
+      --  Whether this context was frozen. See the Freeze procedure.
    end record;
 
    type Analysis_Unit_Type is record
@@ -894,9 +992,23 @@ package ${ada_lib_name}.Analysis.Implementation is
       --  unit. When this unit gets destroyed or reparsed, these rebindings
       --  need to be destroyed too (see Destroy_Rebindings).
 
+      Kind_Index : Node_Kind_Index_Access;
+      --  Index of the nodes in this unit by kind. This is built the first time
+      --  it is needed (see Nodes_Of_Kind) and destroyed when the unit is
+      --  reparsed.
+
       % if ctx.has_memoization:
          Memoization_Map : Memoization_Maps.Map;
          --  Mapping of arguments tuple to property result for memoization
+
+         Memoization_LRU : Mmz_LRU_Array;
+         --  For each memoized property that has a memoization limit, keys of
+         --  its entries in Memoization_Map, from the most recently used to the
+         --  least recently used one.
+
+         Memoization_Stats : Mmz_Stats_Array;
+         --  For each memoized property, statistics about its entries in
+         --  Memoization_Map.
       % endif
 
       Cache_Version : Natural := 0;
@@ -915,6 +1027,18 @@ package ${ada_lib_name}.Analysis.Implementation is
    --  Destroy Unit's memoization cache. This resets Unit's version number to
    --  Unit.Context.Cache_Version.
 
+   function Nodes_Of_Kind
+     (Unit        : Analysis_Unit;
+      First, Last : ${root_node_kind_name}) return ${root_node_array.name};
+   --  Return all the nodes in Unit whose kind is in First .. Last, in document
+   --  order. The first call builds an index of Unit's nodes by kind, so that
+   --  this costs a time proportional to the number of nodes returned rather
+   --  than to the size of Unit's tree.
+
+   procedure Destroy_Kind_Index (Unit : Analysis_Unit);
+   --  Destroy Unit's index of nodes by kind, if it was built. This must be
+   --  called every time Unit's tree changes.
+
    % if ctx.has_memoization:
       function Lookup_Memoization_Map
         (Unit   : Analysis_Unit;
@@ -923,6 +1047,29 @@ package ${ada_lib_name}.Analysis.Implementation is
       --  Look for a memoization entry in Unit.Memoization_Map that correspond
       --  to Key, creating one if none is found, and store it in Cursor. If one
       --  was created, return True. Otherwise, destroy Key and return False.
+      --
+      --  If Key's property has a memoization limit and creating an entry makes
+      --  the unit exceed it, evict the least recently used entries for this
+      --  property (entries being evaluated are never evicted).
+      --
+      --  The memoization tables of frozen contexts are read-only: if Unit
+      --  belongs to one and no entry is found, destroy Key, set Cursor to
+      --  No_Element and return True.
+
+      procedure Store_Memoized_Value
+        (Unit   : Analysis_Unit;
+         Cursor : Memoization_Maps.Cursor;
+         Value  : in out Mmz_Value);
+      --  Replace the value of the memoization entry that Cursor designates in
+      --  Unit.Memoization_Map with Value. Do nothing if Cursor is No_Element.
+
+      procedure Destroy_Memoization (Unit : Analysis_Unit);
+      --  Destroy all the memoization entries in Unit. Note that lookup
+      --  statistics (hits, misses and evictions) are preserved.
+
+      function Memoization_Statistics
+        (Context : Analysis_Context) return Mmz_Stats_Array;
+      --  Return memoization statistics aggregated for all units in Context
    % endif
 
 end ${ada_lib_name}.Analysis.Implementation;
@@ -92,7 +92,11 @@ package ${ada_lib_name}.Iterators is
    record
       Kind : ${root_node_kind_name};
    end record;
-   --  Predicate that returns true for all AST nodes of some kind
+   --  Predicate that returns true for all AST nodes of some kind.
+   --
+   --  Note that Find with this predicate goes through the whole tree under
+   --  its root node: to look for all the nodes of some kind in a unit, use
+   --  Analysis.Nodes_Of_Kind instead, which relies on a per-unit index.
 
    function Evaluate
      (P : access ${root_entity.api_name}_Kind_Filter;
@@ -28,7 +28,7 @@
 
    % if not node_type and creates_node(parser):
       if ${ast_el} /= null then
-         Append (Buffer, ${ast_el}.PP);
+         ${ast_el}.Unparse (Output);
       end if;
    % elif is_transform(parser):
 
@@ -43,7 +43,7 @@
       for I in 1 .. Length (Node) loop
          <% assert creates_node (parser.parser) %>
 
-         Append (Buffer, Item (Node, I).PP);
+         Item (Node, I).Unparse (Output);
 
          % if parser.sep:
             if I < Length (Node) then
@@ -83,23 +83,23 @@
    % elif is_tok(parser):
 
       % if parser.match_text:
-         Append (Buffer, "${parser.match_text}");
+         Put (Output, "${parser.match_text}");
       % elif parser.val.matcher:
-         Append (Buffer, "${parser.val.matcher.to_match}");
+         Put (Output, "${parser.val.matcher.to_match}");
       % elif ast_el != "Node":
-         Append
-           (Buffer,
+         Put
+           (Output,
             Image (Text (Token (Node, ${ast_el})), With_Quotes => False));
       % else:
          <% assert False %>
       % endif
 
-      Append (Buffer, " ");
+      Put (Output, " ");
 
    % elif creates_node(parser):
 
       if ${ast_el} /= null then
-         Append (Buffer, ${ast_el}.PP);
+         ${ast_el}.Unparse (Output);
       end if;
 
    % elif is_null(parser):
@@ -115,19 +115,12 @@
 </%def>
 
 
-<%def name="pretty_printer(node_type)">
-   --  In pretty_printer::
+<%def name="unparser(node_type)">
+   --  In unparser::
    --     ${node_type}
+   null;
 % if node_type.parser:
-   declare
-      Buffer : Unbounded_String;
-   begin
-      null;
-      ${emit_parser_pp_code(node_type.parser, node_type, "Node")}
-      return To_String (Buffer);
-   end;
-% else:
-   return "";
+   ${emit_parser_pp_code(node_type.parser, node_type, "Node")}
 % endif
 
 </%def>
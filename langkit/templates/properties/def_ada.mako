@@ -70,9 +70,20 @@ is
             key_length = 1 + len(property.arguments)
             if property.uses_entity_info:
                key_length += 1
+
+            # Frozen contexts only read their memoization tables (see
+            # Lookup_Memoization_Map), but returning a memoized refcounted
+            # value would still update its reference count, which other tasks
+            # may do at the same time.
+            memoization_guards = []
+            if not property.memoize_in_populate:
+               memoization_guards.append(
+                  'not Node.Unit.Context.In_Populate_Lexical_Env')
+            if property.type.is_refcounted:
+               memoization_guards.append('not Node.Unit.Context.Frozen')
+            memoization_guard = ' and then '.join(memoization_guards)
          %>
          use Memoization_Maps;
-         Mmz_Map : Map renames Node.Unit.Memoization_Map;
          Mmz_Cur : Cursor;
          Mmz_K   : Mmz_Key;
          Mmz_Val : Mmz_Value;
@@ -110,8 +121,8 @@ begin
       ## Analysis_Context_Type.In_Populate_Lexical_Env for the rationale about
       ## the test that follows.
 
-      % if not property.memoize_in_populate:
-      if not Node.Unit.Context.In_Populate_Lexical_Env then
+      % if memoization_guard:
+      if ${memoization_guard} then
       % endif
 
          Mmz_K :=
@@ -170,7 +181,7 @@ begin
             ${gdb_end()}
          end if;
 
-      % if not property.memoize_in_populate:
+      % if memoization_guard:
       end if;
       % endif
    % endif
@@ -187,17 +198,18 @@ begin
    % if property.memoized:
       ## If memoization is enabled for this property, save the result for later
       ## re-use.
-      % if not property.memoize_in_populate:
-      if not Node.Unit.Context.In_Populate_Lexical_Env then
+      % if memoization_guard:
+      if ${memoization_guard} then
       % endif
 
          Mmz_Val := (Kind => ${property.type.memoization_kind},
-                       As_${property.type.name} => Property_Result);
-         Mmz_Map.Replace_Element (Mmz_Cur, Mmz_Val);
+                       As_${property.type.name} => Property_Result,
+                       others => <>);
+         Store_Memoized_Value (Node.Unit, Mmz_Cur, Mmz_Val);
          % if property.type.is_refcounted:
             Inc_Ref (Property_Result);
          % endif
-      % if not property.memoize_in_populate:
+      % if memoization_guard:
       end if;
       % endif
    % endif
@@ -220,13 +232,13 @@ begin
          % endfor
 
          % if property.memoized:
-            % if not property.memoize_in_populate:
-            if not Node.Unit.Context.In_Populate_Lexical_Env then
+            % if memoization_guard:
+            if ${memoization_guard} then
             % endif
 
-               Mmz_Map.Replace_Element (Mmz_Cur, Mmz_Val);
+               Store_Memoized_Value (Node.Unit, Mmz_Cur, Mmz_Val);
 
-            % if not property.memoize_in_populate:
+            % if memoization_guard:
             end if;
             % endif
          % endif
@@ -257,12 +257,21 @@
       Free (Self.Dbg_Img);
    end Free;
 
+   % if len(formal_node_types) == 1 and prop.memoized:
+   package ${package_name} is new Memoized_Predicate
+   % else:
    package ${package_name} is new Predicate_${len(formal_node_types)}
+   % endif
      (El_Type        => ${T.entity.name},
       Var            => Eq_Node.Refs.Raw_Logic_Var,
       Predicate_Type => ${type_name},
       Free           => Free,
+      % if len(formal_node_types) == 1 and prop.memoized:
+      Image          => Image,
+      Hash           => Hash);
+      % else:
       Image          => Image);
+      % endif
 
    % endfor
 </%def>
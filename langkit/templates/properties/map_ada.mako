@@ -8,14 +8,27 @@
 
    array_var = map.result_var.name
 
+   # When there is no filtering and no concatenation, there are as many items
+   # in the result as in the input collection: build the result array in place
+   # instead of going through a vector.
+   in_place = not (map.filter or map.take_while or map.do_concat)
+
    vec_var = map.result_var.name + Name('Vec')
    vec_pkg = map.type.pkg_vector
+
+   items_var = map.result_var.name + Name('Items')
+   next_var = map.result_var.name + Name('Next')
 %>
 
 ${map.collection.render_pre()}
 
 declare
-   ${vec_var} : ${map.type.vector()};
+   % if in_place:
+      ${items_var} : ${map.type.name};
+      ${next_var}  : Positive := 1;
+   % else:
+      ${vec_var} : ${map.type.vector()};
+   % endif
 begin
 
    <%def name="build_loop_body()">
@@ -47,7 +60,12 @@ begin
             % if map.type.element_type.is_refcounted:
                Inc_Ref (Item_To_Append);
             % endif
-            ${vec_pkg}.Append (${vec_var}, Item_To_Append);
+            % if in_place:
+               ${items_var}.Items (${next_var}) := Item_To_Append;
+               ${next_var} := ${next_var} + 1;
+            % else:
+               ${vec_pkg}.Append (${vec_var}, Item_To_Append);
+            % endif
          end;
       % endif
    </%def>
@@ -57,8 +75,21 @@ begin
          ${map.index_var.name} := 0;
       % endif
 
-      ## First, build a vector for all the resulting elements
       <% coll_expr = map.collection.render_expr() %>
+
+      ## First, build a vector for all the resulting elements, or directly
+      ## allocate the result array.
+      % if in_place:
+         ${items_var} := Create
+           (Items_Count =>
+            % if map.collection.type.is_list_type:
+               ${coll_expr}.Count
+            % else:
+               ${coll_expr}.N
+            % endif
+           );
+      % endif
+
       for ${codegen_element_var} of
          % if map.collection.type.is_list_type:
             ${coll_expr}.Nodes (1 .. ${coll_expr}.Count)
@@ -101,15 +132,19 @@ begin
          ${scopes.finalize_scope(map.iter_scope)}
       end loop;
 
-      ## Then convert the vector into the final array type
-      ${array_var} := Create
-        (Items_Count => Natural (${vec_pkg}.Length (${vec_var})));
-      for I in ${array_var}.Items'Range loop
-         ${array_var}.Items (I) := ${vec_pkg}.Get
-           (${vec_var},
-            I + ${vec_pkg}.Index_Type'First - ${array_var}.Items'First);
-      end loop;
-      ${vec_pkg}.Destroy (${vec_var});
+      % if in_place:
+         ${array_var} := ${items_var};
+      % else:
+         ## Then convert the vector into the final array type
+         ${array_var} := Create
+           (Items_Count => Natural (${vec_pkg}.Length (${vec_var})));
+         for I in ${array_var}.Items'Range loop
+            ${array_var}.Items (I) := ${vec_pkg}.Get
+              (${vec_var},
+               I + ${vec_pkg}.Index_Type'First - ${array_var}.Items'First);
+         end loop;
+         ${vec_pkg}.Destroy (${vec_var});
+      % endif
    </%def>
 
    % if map.collection.type.is_list_type:
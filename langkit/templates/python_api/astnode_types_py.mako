@@ -71,6 +71,14 @@
     _kind_name = ${repr(cls.kwless_raw_name.camel)}
     % endif
 
+    <% concrete_subclasses = cls.concrete_subclasses %>
+    % if concrete_subclasses:
+    _kind_range = (${ctx.node_kind_constants[concrete_subclasses[0]]},
+                   ${ctx.node_kind_constants[concrete_subclasses[-1]]})
+    % else:
+    _kind_range = None
+    % endif
+
     % if cls.is_list_type:
     is_list_type = True
     % endif
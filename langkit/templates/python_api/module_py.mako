@@ -22,6 +22,7 @@ from __future__ import (absolute_import, division, print_function,
     root_astnode_name = T.root_node.kwless_raw_name.camel
     c_node = '_ASTNodeExtension.c_type'
     c_entity = '{}._c_type'.format(root_entity.name.camel)
+    entity_array = pyapi.array_wrapper(T.entity.array)
 %>
 
 
@@ -261,6 +262,10 @@ class AnalysisContext(object):
             raise InvalidUnitNameError('Invalid unit name: {} ({})'.format(
                 repr(name), kind
             ))
+
+    def invalidate_unit_provider_cache(self):
+        ${py_doc('langkit.invalidate_unit_provider_cache', 8)}
+        _invalidate_unit_provider_cache(self._c_value)
 % endif
 
     def remove(self, filename):
@@ -272,6 +277,10 @@ class AnalysisContext(object):
         ${py_doc('langkit.context_discard_errors_in_populate_lexical_env', 8)}
         _discard_errors_in_populate_lexical_env(self._c_value, bool(discard))
 
+    def set_ast_cache_directory(self, directory):
+        ${py_doc('langkit.context_set_ast_cache_directory', 8)}
+        _set_ast_cache_directory(self._c_value, directory or '')
+
     class _c_type(ctypes.c_void_p):
         pass
 
@@ -371,6 +380,19 @@ class AnalysisUnit(object):
         _unit_root(self._c_value, ctypes.byref(result))
         return ${root_astnode_name}._wrap(result)
 
+    def nodes_of_kind(self, ast_type):
+        ${py_doc('langkit.unit_nodes_of_kind', 8)}
+        # Abstract node types with no concrete subclass have no kind range:
+        # no node can be an instance of them.
+        if ast_type._kind_range is None:
+            return []
+
+        first_kind, last_kind = ast_type._kind_range
+        c_result = ${entity_array}._c_type()
+        _unit_nodes_of_kind(self._c_value, first_kind, last_kind,
+                            ctypes.byref(c_result))
+        return list(${entity_array}(c_result, inc_ref=False))
+
     @property
     def first_token(self):
         ${py_doc('langkit.unit_first_token', 8)}
@@ -576,11 +598,20 @@ class Token(ctypes.Structure):
         if other < self:
             return
 
-        yield self
+        # Fetch tokens by chunks: this is much faster than calling "next" on
+        # each token.
+        chunk_size = 256
         current = self
-        while current < other:
-            current = current.next
-            yield current
+        while current is not None:
+            chunk = (Token * chunk_size)()
+            count = _token_range_fill(ctypes.byref(current),
+                                      ctypes.byref(other),
+                                      chunk, chunk_size)
+            for token in chunk[:count]:
+                yield token
+            if count < chunk_size:
+                return
+            current = chunk[count - 1].next
 
     def is_equivalent(self, other):
         ${py_doc('langkit.token_is_equivalent', 8)}
@@ -1255,6 +1286,10 @@ _discard_errors_in_populate_lexical_env = _import_func(
    '${capi.get_name("context_discard_errors_in_populate_lexical_env")}',
    [AnalysisContext._c_type, ctypes.c_int], None
 )
+_set_ast_cache_directory = _import_func(
+    '${capi.get_name("context_set_ast_cache_directory")}',
+    [AnalysisContext._c_type, ctypes.c_char_p], None
+)
 _destroy_analysis_context = _import_func(
     '${capi.get_name("destroy_analysis_context")}',
     [AnalysisContext._c_type, ], None
@@ -1286,6 +1321,10 @@ _get_analysis_unit_from_provider = _import_func(
      ctypes.c_int],            # reparse
     AnalysisUnit._c_type
 )
+_invalidate_unit_provider_cache = _import_func(
+    '${capi.get_name("context_invalidate_unit_provider_cache")}',
+    [AnalysisContext._c_type], None
+)
 % endif
 _remove_analysis_unit = _import_func(
     '${capi.get_name("remove_analysis_unit")}',
@@ -1295,6 +1334,11 @@ _unit_root = _import_func(
     '${capi.get_name("unit_root")}',
     [AnalysisUnit._c_type, ctypes.POINTER(${c_entity})], None
 )
+_unit_nodes_of_kind = _import_func(
+    '${capi.get_name("unit_nodes_of_kind")}',
+    [AnalysisUnit._c_type, ctypes.c_int, ctypes.c_int,
+     ctypes.POINTER(${entity_array}._c_type)], None
+)
 _unit_first_token = _import_func(
     "${capi.get_name('unit_first_token')}",
     [AnalysisUnit._c_type, ctypes.POINTER(Token)], None
@@ -1453,6 +1497,12 @@ _token_next = _import_func(
     "${capi.get_name('token_next')}",
     [ctypes.POINTER(Token), ctypes.POINTER(Token)], None
 )
+_token_range_fill = _import_func(
+    "${capi.get_name('token_range_fill')}",
+    [ctypes.POINTER(Token), ctypes.POINTER(Token), ctypes.POINTER(Token),
+     ctypes.c_int],
+    ctypes.c_int
+)
 _token_is_equivalent = _import_func(
     "${capi.get_name('token_is_equivalent')}",
     [ctypes.POINTER(Token), ctypes.POINTER(Token)], ctypes.c_int
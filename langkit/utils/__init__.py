@@ -7,6 +7,7 @@ find in the standard library.
 from __future__ import absolute_import, division, print_function
 
 from copy import copy
+import heapq
 
 
 def copy_with(obj, **kwargs):
@@ -48,32 +49,113 @@ def is_same(coll):
     return len(set(coll)) == 1
 
 
+class TopologicalSortFailure(Exception):
+    """
+    Exception raised when topological_sort cannot sort its input.
+    """
+
+    CYCLE = 'cycle'
+    """
+    Kind for failures due to a dependency cycle.
+    """
+
+    UNKNOWN_DEPENDENCIES = 'unknown-dependencies'
+    """
+    Kind for failures due to dependencies that are not in the sorted items.
+    """
+
+    def __init__(self, message, kind, items):
+        """
+        :param str message: Description of the failure.
+        :param str kind: Kind of failure: CYCLE or UNKNOWN_DEPENDENCIES.
+        :param list items: Items involved in the failure. For CYCLE, this is
+            the dependency cycle (the first item depending on the second one,
+            ..., and the last one depending on the first one). For
+            UNKNOWN_DEPENDENCIES, these are the items that have unknown
+            dependencies.
+        """
+        super(TopologicalSortFailure, self).__init__(message)
+        self.kind = kind
+        self.items = items
+
+
 def topological_sort(items):
     """
     'items' is an iterable of (item, dependencies) pairs, where 'dependencies'
-    is an iterable of the same type as 'items'.
-
-    If 'items' is a generator rather than a data structure, it should not be
-    empty. Passing an empty generator for 'items' (zero yields before return)
-    will cause topological_sort() to raise TopologicalSortFailure.
-
-    An empty iterable (e.g. list, tuple, set, ...) produces no items but
-    raises no exception.
-    """
-    provided = set()
-    while items:
-        remaining_items = []
-        emitted = False
-        for item, dependencies in items:
-            dependencies = set(dependencies)
-            if provided.issuperset(dependencies):
-                yield item
-                provided.add(item)
-                emitted = True
-            else:
-                remaining_items.append((item, dependencies))
-        assert emitted
-        items = remaining_items
+    is an iterable of the same type as 'items'. Return the list of items, in an
+    order such that each item comes after all its dependencies.
+
+    This runs in O(N log N + D) time, where N is the number of items and D the
+    total number of dependencies. Among the items whose dependencies are
+    already in the result, the first one in 'items' always comes first, so the
+    result is deterministic and as close as possible to the input order.
+
+    Note that this is not a level-by-level order (all items without
+    dependencies first, then all items that depend only on them, and so on):
+    an item comes as soon as all its dependencies are in the result and all
+    the ready items that precede it in 'items' are too.
+
+    Raise a TopologicalSortFailure if there is a dependency cycle or if some
+    dependencies are not present in 'items'.
+
+    :type items: collections.Iterable[(T, collections.Iterable[T])]
+    :rtype: list[T]
+    """
+    items = list(items)
+    indexes = {item: i for i, (item, _) in enumerate(items)}
+
+    # For each item, set of items it depends on and list of items that depend
+    # on it, by index.
+    dependencies = [set() for _ in items]
+    dependents = [[] for _ in items]
+    unknown = []
+    for i, (item, deps) in enumerate(items):
+        for dep in deps:
+            try:
+                dep_index = indexes[dep]
+            except KeyError:
+                unknown.append(item)
+                continue
+            if dep_index not in dependencies[i]:
+                dependencies[i].add(dep_index)
+                dependents[dep_index].append(i)
+    if unknown:
+        raise TopologicalSortFailure(
+            'Some items have unknown dependencies',
+            TopologicalSortFailure.UNKNOWN_DEPENDENCIES, unknown
+        )
+
+    # Kahn's algorithm, using a heap to pick the first ready item in input
+    # order.
+    missing = [len(deps) for deps in dependencies]
+    ready = [i for i, count in enumerate(missing) if count == 0]
+    heapq.heapify(ready)
+    result = []
+    while ready:
+        i = heapq.heappop(ready)
+        result.append(items[i][0])
+        for dependent in dependents[i]:
+            missing[dependent] -= 1
+            if missing[dependent] == 0:
+                heapq.heappush(ready, dependent)
+
+    if len(result) < len(items):
+        # All remaining items are part of a cycle or depend on one: walk
+        # unsatisfied dependencies from one of them until we get back to an
+        # item we already visited.
+        i = next(i for i, count in enumerate(missing) if count)
+        path = []
+        visited = {}
+        while i not in visited:
+            visited[i] = len(path)
+            path.append(i)
+            i = next(d for d in sorted(dependencies[i]) if missing[d])
+        raise TopologicalSortFailure(
+            'Dependency cycle', TopologicalSortFailure.CYCLE,
+            [items[j][0] for j in path[visited[i]:]]
+        )
+
+    return result
 
 
 class classproperty(property):
@@ -0,0 +1,87 @@
+#! /usr/bin/env python
+
+"""
+Benchmark the time it takes to import a language specification, comparing the
+two modes for the capture of DSL source locations (see
+langkit.diagnostics.Diagnostics.fast_location_capture).
+
+Each import runs in a separate process, as importing a language specification
+has side effects (registration of DSL types) that prevent importing it twice
+in the same process.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import importlib
+import os.path
+import subprocess
+import sys
+import time
+
+
+MODES = ('traceback', 'fast')
+
+
+def run_child(args):
+    """
+    Import the language specification and print the time it took, in seconds.
+    """
+    from langkit.diagnostics import Diagnostics
+
+    lang_dir = os.path.abspath(args.lang_dir)
+    Diagnostics.set_lang_source_dir(lang_dir)
+    Diagnostics.set_fast_location_capture(args.child == 'fast')
+    sys.path.insert(0, lang_dir)
+
+    start = time.time()
+    for module in args.modules:
+        importlib.import_module(module)
+    print(time.time() - start)
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description=__doc__)
+    args_parser.add_argument(
+        '--repeat', '-n', type=int, default=5,
+        help='Number of imports to run for each mode (default: 5)'
+    )
+    args_parser.add_argument(
+        '--child', choices=MODES,
+        help=argparse.SUPPRESS
+    )
+    args_parser.add_argument(
+        'lang_dir',
+        help='Directory that contains the language specification package'
+    )
+    args_parser.add_argument(
+        'modules', nargs='+',
+        help='Name of the modules to import, for instance "ada.parser"'
+    )
+    args = args_parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    results = {}
+    for mode in MODES:
+        timings = []
+        for _ in range(args.repeat):
+            output = subprocess.check_output(
+                [sys.executable, __file__, '--child', mode, args.lang_dir]
+                + args.modules
+            )
+            timings.append(float(output.strip().splitlines()[-1]))
+        results[mode] = timings
+        print('{:<10} min: {:.3f}s  avg: {:.3f}s'.format(
+            mode, min(timings), sum(timings) / len(timings)
+        ))
+
+    print('Speedup: {:.2f}x'.format(
+        min(results['traceback']) / min(results['fast'])
+    ))
+
+
+if __name__ == '__main__':
+    main()
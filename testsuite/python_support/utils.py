@@ -118,7 +118,8 @@ def build(grammar, lexer=None, warning_set=default_warning_set):
 
 
 def build_and_run(grammar, py_script=None, ada_main=None, lexer=None,
-                  warning_set=default_warning_set, properties_logging=False):
+                  warning_set=default_warning_set, properties_logging=False,
+                  generate_pp=False, default_unit_provider=None):
     """
     Compile and emit code for `ctx` and build the generated library. Then, if
     `py_script` is not None, run it with this library available. If `ada_main`
@@ -131,6 +132,10 @@ def build_and_run(grammar, py_script=None, ada_main=None, lexer=None,
     :param WarningSet warning_set: Set of warnings to emit.
     :param bool properties_logging: Whether to enable properties logging in
         code generation.
+    :param bool generate_pp: Whether to generate a pretty-printer along with
+        the parser.
+    :param LibraryEntity|None default_unit_provider: Default unit provider to
+        use in the generated library. See CompileCtx's constructor.
     """
 
     if lexer is None:
@@ -138,6 +143,7 @@ def build_and_run(grammar, py_script=None, ada_main=None, lexer=None,
         lexer = foo_lexer
 
     ctx = prepare_context(grammar, lexer, warning_set)
+    ctx.default_unit_provider = default_unit_provider
 
     class Manage(ManageScript):
         def create_context(self, args):
@@ -151,7 +157,10 @@ def build_and_run(grammar, py_script=None, ada_main=None, lexer=None,
 
     # First build the library. Forward all test.py's arguments to the libmanage
     # call so that manual testcase runs can pass "-g", for instance.
-    argv = sys.argv[1:] + ['--full-error-traces', '-vnone', 'make']
+    argv = sys.argv[1:] + ['--full-error-traces', '-vnone']
+    if generate_pp:
+        argv.append('--pp')
+    argv.append('make')
     for w in WarningSet.available_warnings:
         argv.append('-{}{}'.format('W' if w in warning_set else 'w', w.name))
     if properties_logging:
@@ -0,0 +1,130 @@
+with Ada.Text_IO; use Ada.Text_IO;
+
+with Langkit_Support.Adalog.Abstract_Relation;
+use Langkit_Support.Adalog.Abstract_Relation;
+with Langkit_Support.Adalog.Main_Support;
+use Langkit_Support.Adalog.Main_Support;
+with Langkit_Support.Adalog.Operations; use Langkit_Support.Adalog.Operations;
+with Langkit_Support.Adalog.Solver_Statistics;
+
+with Support; use Support;
+
+--  Check that domain propagation prunes Member domains according to the
+--  predicates in the same conjunction, without changing the set of solutions.
+--
+--  Each relation is solved without and with domain propagation, and we print
+--  the number of evaluated sub-relations (solver ticks) and predicate calls
+--  in both cases. With propagation, the predicates are called once per domain
+--  value upfront, but pruned values are never tried: conjunctions with an
+--  empty domain are found unsatisfied without evaluating any sub-relation.
+
+procedure Main is
+   use Eq_Int, Eq_Int.Raw_Impl, Eq_Int.Refs;
+
+   package Stats renames Langkit_Support.Adalog.Solver_Statistics;
+
+   X : Eq_Int.Refs.Raw_Var := Eq_Int.Refs.Create;
+   Y : Eq_Int.Refs.Raw_Var := Eq_Int.Refs.Create;
+
+   function Safe_Get_Value (V : Eq_Int.Refs.Raw_Var) return String is
+     ((if Is_Defined (V)
+       then Integer'Image (Get_Value (V))
+       else "<undefined>"));
+
+   Relation_Count : constant := 4;
+
+   function Create_Relation (Index : Positive) return Relation;
+   --  Create the Index'th relation to solve
+
+   procedure Run (R : in out Relation);
+   --  Print all the solutions for R, the number of solver ticks and the
+   --  number of predicate calls needed to find them.
+
+   ---------------------
+   -- Create_Relation --
+   ---------------------
+
+   function Create_Relation (Index : Positive) return Relation is
+   begin
+      case Index is
+         when 1 =>
+            return Member (X, (1, 2, 3, 4)) and Is_Even (X);
+
+         when 2 =>
+            --  The domain of X is reduced to one value: its Member relation
+            --  is evaluated first.
+
+            return Member (Y, (1, 2)) and Member (X, (1, 2, 3))
+                   and Is_Even (X);
+
+         when 3 =>
+            --  The domain of X is left empty
+
+            return Member (X, (1, 3, 5)) and Is_Even (X);
+
+         when 4 =>
+            --  Likewise, but because of two different predicates
+
+            return Is_Even (X) and Member (X, (2, 3)) and Is_Odd (X);
+
+         when others =>
+            raise Program_Error;
+      end case;
+   end Create_Relation;
+
+   ---------
+   -- Run --
+   ---------
+
+   procedure Run (R : in out Relation) is
+      N     : Natural := 0;
+      Ticks : Natural := 0;
+   begin
+      Reset (X);
+      Reset (Y);
+      Calls := 0;
+      Stats.Set_Enabled (True);
+      while Solve (R) loop
+         Put_Line ("Solution: { X =" & Safe_Get_Value (X)
+                   & "; Y =" & Safe_Get_Value (Y) & " }");
+         N := N + 1;
+      end loop;
+      Stats.Set_Enabled (False);
+
+      if N = 0 then
+         Put_Line ("No solution found");
+      end if;
+
+      for I in 1 .. Stats.Solve_Count loop
+         Ticks := Ticks + Stats.Ticks (I);
+      end loop;
+      Stats.Clear;
+      Put_Line ("Ticks:" & Natural'Image (Ticks) & ", predicate calls:"
+                & Natural'Image (Calls));
+   end Run;
+
+begin
+   X.Dbg_Name := new String'("X");
+   Y.Dbg_Name := new String'("Y");
+
+   for I in 1 .. Relation_Count loop
+      Put_Line ((1 .. 72 => '='));
+      for Propagation in Boolean loop
+         declare
+            R : Relation := Create_Relation (I);
+         begin
+            if not Propagation then
+               Print_Relation (R);
+            end if;
+            Set_Domain_Propagation (Propagation);
+            New_Line;
+            Put_Line ("Domain propagation: " & Boolean'Image (Propagation));
+            Run (R);
+            Free_Relation_Tree (R);
+         end;
+      end loop;
+   end loop;
+
+   Destroy (X.all);
+   Destroy (Y.all);
+end Main;
@@ -0,0 +1,13 @@
+package body Support is
+
+   ----------
+   -- Call --
+   ----------
+
+   function Call (Self : Parity_Pred_Type; L : Integer) return Boolean is
+   begin
+      Calls := Calls + 1;
+      return (L mod 2 = 0) = Self.Even;
+   end Call;
+
+end Support;
@@ -0,0 +1,56 @@
+with Ada.Text_IO; use Ada.Text_IO;
+
+with Langkit_Support.Adalog.Abstract_Relation;
+use Langkit_Support.Adalog.Abstract_Relation;
+with Langkit_Support.Adalog.Main_Support;
+use Langkit_Support.Adalog.Main_Support;
+with Langkit_Support.Adalog.Operations; use Langkit_Support.Adalog.Operations;
+
+with Support; use Support;
+
+--  Check that memoized predicates are called at most once per value of their
+--  logic variable during each resolution, even when backtracking.
+
+procedure Main is
+   use Eq_Int, Eq_Int.Raw_Impl, Eq_Int.Refs;
+
+   X : Eq_Int.Refs.Raw_Var := Eq_Int.Refs.Create;
+   Y : Eq_Int.Refs.Raw_Var := Eq_Int.Refs.Create;
+
+   procedure Run (Label : String; R : in out Relation);
+   --  Print all the solutions for R and the number of predicate calls needed
+   --  to find them.
+
+   ---------
+   -- Run --
+   ---------
+
+   procedure Run (Label : String; R : in out Relation) is
+   begin
+      Put_Line (Label & ":");
+      Reset (X);
+      Reset (Y);
+      Calls := 0;
+      while Solve (R) loop
+         Put_Line ("Solution: { X =" & Get_Value (X)'Img
+                   & "; Y =" & Get_Value (Y)'Img & " }");
+      end loop;
+      Put_Line ("Predicate calls:" & Calls'Img);
+      New_Line;
+      Free_Relation_Tree (R);
+   end Run;
+
+   R1 : Relation :=
+     Member (X, (1, 2, 3)) and Member (Y, (1, 2)) and Is_Even (X);
+   R2 : Relation :=
+     Member (X, (1, 2, 3)) and Member (Y, (1, 2)) and Memoized_Is_Even (X);
+begin
+   X.Dbg_Name := new String'("X");
+   Y.Dbg_Name := new String'("Y");
+
+   Run ("Without memoization", R1);
+   Run ("With memoization", R2);
+
+   Destroy (X.all);
+   Destroy (Y.all);
+end Main;
@@ -0,0 +1,14 @@
+package body Support is
+
+   ----------
+   -- Call --
+   ----------
+
+   function Call (Self : Is_Even_Pred_Type; L : Integer) return Boolean is
+      pragma Unreferenced (Self);
+   begin
+      Calls := Calls + 1;
+      return L mod 2 = 0;
+   end Call;
+
+end Support;
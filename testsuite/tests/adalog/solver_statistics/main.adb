@@ -0,0 +1,46 @@
+with Ada.Text_IO; use Ada.Text_IO;
+
+with Langkit_Support.Adalog.Abstract_Relation;
+use Langkit_Support.Adalog.Abstract_Relation;
+with Langkit_Support.Adalog.Main_Support;
+use Langkit_Support.Adalog.Main_Support;
+with Langkit_Support.Adalog.Operations; use Langkit_Support.Adalog.Operations;
+with Langkit_Support.Adalog.Solver_Statistics;
+
+with Support; use Support;
+
+--  Check that solver statistics are correctly collected and reported
+
+procedure Main is
+   use Eq_Int, Eq_Int.Raw_Impl, Eq_Int.Refs;
+
+   package Stats renames Langkit_Support.Adalog.Solver_Statistics;
+
+   X : Eq_Int.Refs.Raw_Var := Eq_Int.Refs.Create;
+
+   Relations : array (Positive range <>) of Relation :=
+     (Member (X, (1, 2, 3)) and Is_Even (X),
+      Member (X, (1, 2)) and (Is_Even (X) or Is_Odd (X)),
+      Member (X, (1, 2, 3)) and Nested_Is_Even (X));
+begin
+   X.Dbg_Name := new String'("X");
+   Nested_Var.Dbg_Name := new String'("Y");
+   Stats.Set_Enabled (True);
+
+   for R of Relations loop
+      Reset (X);
+      while Solve (R) loop
+         Put_Line ("Solution: X =" & Get_Value (X)'Img);
+      end loop;
+      Free_Relation_Tree (R);
+   end loop;
+
+   Stats.Set_Enabled (False);
+   New_Line;
+   Put_Line ("Recorded resolutions:" & Natural'Image (Stats.Solve_Count));
+   Stats.Write_JSON_Report (Standard_Output);
+   Stats.Clear;
+
+   Destroy (X.all);
+   Destroy (Nested_Var.all);
+end Main;
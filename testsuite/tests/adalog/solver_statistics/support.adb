@@ -0,0 +1,20 @@
+package body Support is
+
+   ----------
+   -- Call --
+   ----------
+
+   function Call (Self : Nested_Pred_Type; L : Integer) return Boolean is
+      pragma Unreferenced (Self);
+      use Eq_Int.Refs;
+
+      R : Relation := Relation (Is_Even (Nested_Var));
+   begin
+      Reset (Nested_Var);
+      Set_Value (Nested_Var, L);
+      return Result : constant Boolean := Solve (R) do
+         Free_Relation_Tree (R);
+      end return;
+   end Call;
+
+end Support;
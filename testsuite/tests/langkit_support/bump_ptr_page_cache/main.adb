@@ -0,0 +1,83 @@
+with Ada.Text_IO; use Ada.Text_IO;
+
+with System;
+with System.Storage_Elements; use System.Storage_Elements;
+
+with Langkit_Support.Bump_Ptr; use Langkit_Support.Bump_Ptr;
+
+procedure Main is
+
+   procedure Put (Pool : Bump_Ptr_Pool);
+   procedure Put (Cache : Page_Cache);
+   procedure Allocate (Pool : Bump_Ptr_Pool; S : Storage_Offset);
+
+   ---------
+   -- Put --
+   ---------
+
+   procedure Put (Pool : Bump_Ptr_Pool) is
+      Stats : constant Pool_Statistics := Statistics (Pool);
+   begin
+      Put_Line ("  Page_Size:" & Storage_Count'Image (Stats.Page_Size));
+      Put_Line ("  Pages:" & Natural'Image (Stats.Pages));
+      Put_Line ("  Large_Blocks:" & Natural'Image (Stats.Large_Blocks));
+      Put_Line ("  Allocated_Bytes:"
+                & Storage_Count'Image (Stats.Allocated_Bytes));
+      Put_Line ("  Wasted_Bytes:" & Storage_Count'Image (Stats.Wasted_Bytes));
+   end Put;
+
+   ---------
+   -- Put --
+   ---------
+
+   procedure Put (Cache : Page_Cache) is
+   begin
+      Put_Line ("Cached pages:" & Natural'Image (Cached_Pages (Cache)));
+   end Put;
+
+   --------------
+   -- Allocate --
+   --------------
+
+   procedure Allocate (Pool : Bump_Ptr_Pool; S : Storage_Offset) is
+      Dummy : constant System.Address := Allocate (Pool, S);
+   begin
+      null;
+   end Allocate;
+
+   Cache : Page_Cache := Create_Page_Cache (Page_Size => 1024, Max_Pages => 2);
+   Pool  : Bump_Ptr_Pool;
+
+begin
+   Put_Line ("First pool:");
+   Pool := Create (Cache);
+   Allocate (Pool, 600);
+   Allocate (Pool, 600);
+   Allocate (Pool, 2000);
+   Put (Pool);
+   Free (Pool);
+   Put (Cache);
+   New_Line;
+
+   Put_Line ("Second pool:");
+   Pool := Create (Cache);
+   Allocate (Pool, 100);
+   Put (Cache);
+   Allocate (Pool, 1000);
+   Put (Cache);
+   Allocate (Pool, 1000);
+   Put (Pool);
+   Free (Pool);
+   Put (Cache);
+   New_Line;
+
+   Put_Line ("Pool without cache:");
+   Pool := Create (Page_Size => 256);
+   Allocate (Pool, 200);
+   Allocate (Pool, 200);
+   Put (Pool);
+   Free (Pool);
+
+   Dec_Ref (Cache);
+   Put (Cache);
+end Main;
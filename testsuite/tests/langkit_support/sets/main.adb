@@ -1,10 +1,13 @@
+with Ada.Containers;           use Ada.Containers;
 with Ada.Text_IO;              use Ada.Text_IO;
 
 with Langkit_Support.Cheap_Sets;
 
 procedure Main is
+   function Hash (I : Integer) return Hash_Type is (Hash_Type'Mod (I));
+
    package Int_Sets is new Langkit_Support.Cheap_Sets
-   (Integer, No_Element => -1);
+   (Integer, No_Element => -1, Hash => Hash);
 
    Int_Set : Int_Sets.Set;
 
@@ -0,0 +1,113 @@
+with Ada.Calendar;             use Ada.Calendar;
+with Ada.Command_Line;         use Ada.Command_Line;
+with Ada.Containers;           use Ada.Containers;
+with Ada.Text_IO;              use Ada.Text_IO;
+
+with Langkit_Support.Cheap_Sets;
+
+--  Benchmark for Cheap_Sets in both of its regimes: lots of small sets (which
+--  use linear scans) and a few large sets (which use hash tables). The output
+--  only contains operation counts, so that it is deterministic: pass the
+--  --timings argument to also get the time spent in each scenario.
+
+procedure Main is
+
+   function Hash (I : Integer) return Hash_Type is (Hash_Type'Mod (I));
+
+   package Int_Sets is new Langkit_Support.Cheap_Sets
+     (Integer, No_Element => -1, Hash => Hash);
+   use Int_Sets;
+
+   Show_Timings : constant Boolean :=
+     Argument_Count = 1 and then Argument (1) = "--timings";
+
+   procedure Run (Name : String; Size, Stride, Rounds : Positive);
+   --  Rounds times, create a set and add the Size first multiples of Stride
+   --  to it, look them up (as well as absent elements), remove half of them,
+   --  look them up again and add the removed ones back. Then print the number
+   --  of operations that succeeded.
+
+   ---------
+   -- Run --
+   ---------
+
+   procedure Run (Name : String; Size, Stride, Rounds : Positive) is
+      Start : constant Time := Clock;
+
+      Added, Found, Removed, Total_Length : Natural := 0;
+
+      procedure Count (Success : Boolean; Counter : in out Natural);
+      --  Increment Counter if Success is True
+
+      -----------
+      -- Count --
+      -----------
+
+      procedure Count (Success : Boolean; Counter : in out Natural) is
+      begin
+         if Success then
+            Counter := Counter + 1;
+         end if;
+      end Count;
+
+   begin
+      for R in 1 .. Rounds loop
+         declare
+            S : Set;
+         begin
+            --  Adding an element twice must be a no-op
+
+            for I in 0 .. Size - 1 loop
+               Count (Add (S, I * Stride), Added);
+               Count (Add (S, I * Stride), Added);
+            end loop;
+
+            for I in 0 .. Size - 1 loop
+               Count (Has (S, I * Stride), Found);
+               Count (Has (S, -I - 2), Found);
+            end loop;
+
+            --  Removing an element twice must be a no-op
+
+            for I in 0 .. Size - 1 loop
+               if I mod 2 = 0 then
+                  Count (Remove (S, I * Stride), Removed);
+                  Count (Remove (S, I * Stride), Removed);
+               end if;
+            end loop;
+
+            for I in 0 .. Size - 1 loop
+               Count (Has (S, I * Stride), Found);
+            end loop;
+
+            for I in 0 .. Size - 1 loop
+               Count (Add (S, I * Stride), Added);
+            end loop;
+
+            if Elements (S)'Length /= Length (S) then
+               Put_Line ("Elements and Length disagree");
+            end if;
+            Total_Length := Total_Length + Length (S);
+            Destroy (S);
+         end;
+      end loop;
+
+      Put_Line (Name & ": added" & Natural'Image (Added)
+                & ", found" & Natural'Image (Found)
+                & ", removed" & Natural'Image (Removed)
+                & ", length" & Natural'Image (Total_Length));
+      if Show_Timings then
+         Put_Line ("  time:" & Duration'Image (Clock - Start));
+      end if;
+   end Run;
+
+begin
+   Run ("small", Size => 5, Stride => 1, Rounds => 20_000);
+   Run ("threshold", Size => 9, Stride => 1, Rounds => 10_000);
+   Run ("large", Size => 100_000, Stride => 1, Rounds => 2);
+
+   --  With the identity hash function, multiples of a large power of two all
+   --  start their probe sequences at the same few slots.
+
+   Run ("clustered", Size => 2_000, Stride => 1_024, Rounds => 2);
+end Main;
@@ -0,0 +1,69 @@
+with Ada.Strings.Unbounded; use Ada.Strings.Unbounded;
+with Ada.Text_IO;           use Ada.Text_IO;
+
+with Libfoolang.Analysis; use Libfoolang.Analysis;
+
+procedure Main is
+
+   Filename : constant String := "pp.txt";
+
+   Ctx  : Analysis_Context := Create;
+   Unit : constant Analysis_Unit := Get_From_Buffer
+     (Ctx, "foo.txt",
+      Buffer => "def a = 1" & ASCII.LF
+                & "def b = 22" & ASCII.LF);
+
+   function Read_File return String;
+   --  Return the content of Filename, with line terminators stripped
+
+   procedure Check (Label : String; Node : Foo_Node'Class);
+   --  Print the output of the PP function for Node and check that the PP
+   --  procedure writes the same text to Filename.
+
+   ---------------
+   -- Read_File --
+   ---------------
+
+   function Read_File return String is
+      F      : File_Type;
+      Result : Unbounded_String;
+   begin
+      Open (F, In_File, Filename);
+      while not End_Of_File (F) loop
+         Append (Result, Get_Line (F));
+      end loop;
+      Close (F);
+      return To_String (Result);
+   end Read_File;
+
+   -----------
+   -- Check --
+   -----------
+
+   procedure Check (Label : String; Node : Foo_Node'Class) is
+      In_Memory : constant String := PP (Node);
+   begin
+      PP (Node, Filename);
+      declare
+         From_File : constant String := Read_File;
+      begin
+         Put_Line (Label & ": [" & In_Memory & "]");
+         if From_File = In_Memory then
+            Put_Line ("  file output matches");
+         else
+            Put_Line ("  file output differs: [" & From_File & "]");
+         end if;
+      end;
+   end Check;
+
+   Root_Node : constant Foo_Node := Root (Unit);
+
+begin
+   Check ("Root", Root_Node);
+   for I in 1 .. Child_Count (Root_Node) loop
+      Check ("Child" & Positive'Image (I), Child (Root_Node, I));
+   end loop;
+
+   Destroy (Ctx);
+   Put_Line ("Done.");
+end Main;
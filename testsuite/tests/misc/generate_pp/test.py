@@ -0,0 +1,41 @@
+"""
+Check that the pretty-printer generated with --pp produces the same text
+whether it builds the result in memory (PP function) or streams it to a file
+(PP procedure).
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field
+from langkit.parsers import Grammar, List, Tok
+
+from lexer_example import Token
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Decl(FooNode):
+    name = Field()
+    value = Field()
+
+
+class Name(FooNode):
+    tok = Field()
+
+
+class Number(FooNode):
+    tok = Field()
+
+
+grammar = Grammar('main_rule')
+grammar.add_rules(
+    main_rule=List(grammar.decl),
+    decl=Decl('def', grammar.name, '=', grammar.number),
+    name=Name(Tok(Token.Identifier, keep=True)),
+    number=Number(Tok(Token.Number, keep=True)),
+)
+build_and_run(grammar, ada_main='main.adb', generate_pp=True)
+print('Done')
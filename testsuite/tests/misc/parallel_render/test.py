@@ -0,0 +1,104 @@
+"""
+Test that rendering properties in several processes generates the same
+sources as rendering them sequentially, and that expressions get unique
+identifiers in GDB helpers.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import filecmp
+import os
+import re
+import shutil
+
+from langkit.dsl import ASTNode, Field, T
+from langkit.expressions import Property, Self
+from langkit.parsers import Grammar, List, Tok
+
+from lexer_example import Token
+from utils import prepare_context, reset_langkit
+
+
+def create_grammar():
+    class FooNode(ASTNode):
+        pass
+
+    class Name(FooNode):
+        tok = Field(type=T.TokenType)
+
+        # Parallel rendering kicks in only for passes with enough properties:
+        # create a lot of them.
+        for i in range(40):
+            locals()['prop_{}'.format(i)] = Property(
+                Self.parent.parent.is_null, public=True
+            )
+        del i
+
+    grammar = Grammar('main_rule')
+    grammar.add_rules(
+        main_rule=List(Name(Tok(Token.Identifier, keep=True))),
+    )
+    return grammar
+
+
+def emit(jobs):
+    """
+    Generate the library with the given number of jobs and return the
+    directory that contains it.
+    """
+    build_dir = 'build-j{}'.format(jobs)
+    try:
+        ctx = prepare_context(create_grammar())
+        ctx.emit('build', generate_lexer=False, jobs=jobs)
+    finally:
+        reset_langkit()
+    if os.path.exists(build_dir):
+        shutil.rmtree(build_dir)
+    os.rename('build', build_dir)
+    return build_dir
+
+
+def generated_sources(root):
+    """
+    Return the set of generated source files in the `root` directory, as paths
+    relative to it.
+    """
+    result = set()
+    for dirpath, dirnames, filenames in os.walk(root):
+        # Skip build artifacts and caches
+        if 'obj' in dirnames:
+            dirnames.remove('obj')
+        for f in filenames:
+            result.add(os.path.relpath(os.path.join(dirpath, f), root))
+    return result
+
+
+sequential = emit(1)
+parallel = emit(4)
+
+sequential_sources = generated_sources(sequential)
+parallel_sources = generated_sources(parallel)
+if sequential_sources != parallel_sources:
+    print('Different sets of generated sources:')
+    for f in sorted(sequential_sources ^ parallel_sources):
+        print('  {}'.format(f))
+else:
+    for f in sorted(sequential_sources):
+        if not filecmp.cmp(os.path.join(sequential, f),
+                           os.path.join(parallel, f), shallow=False):
+            print('Different content for {}'.format(f))
+print('Generated sources compared')
+
+# Look for GDB helpers that start expressions in all generated Ada sources
+expr_start_re = re.compile(r'^\s*--# expr-start (\S+)', re.MULTILINE)
+expr_ids = []
+for f in sorted(parallel_sources):
+    if f.endswith('.adb'):
+        with open(os.path.join(parallel, f)) as source:
+            expr_ids.extend(expr_start_re.findall(source.read()))
+print('Found expression identifiers: {}'.format(bool(expr_ids)))
+print('Unique expression identifiers: {}'.format(
+    len(expr_ids) == len(set(expr_ids))
+))
+
+print('Done')
@@ -0,0 +1,106 @@
+"""
+Test that caching sorted type lists does not change the order of
+declarations in generated sources, and that the cache is not fooled by type
+sets that change.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from collections import namedtuple
+import filecmp
+import os
+import shutil
+
+from langkit.compile_context import CompileCtx
+from langkit.dsl import ASTNode, EnumType, Field
+from langkit.expressions import Property, Self
+from langkit.parsers import Enum, Grammar, List, Or, Tok
+
+from lexer_example import Token
+from utils import emit_and_print_errors, prepare_context, reset_langkit
+
+
+def create_grammar():
+    class FooNode(ASTNode):
+        pass
+
+    class MyEnum(EnumType):
+        alternatives = ['e_example', 'e_null']
+
+    class EnumNode(FooNode):
+        enum = Field(type=MyEnum)
+
+        parent_nodes = Property(Self.parents, public=True)
+        child_nodes = Property(Self.children, public=True)
+
+    class Nodes(FooNode):
+        nodes = Field(type=EnumNode.list)
+
+    grammar = Grammar('main_rule')
+    grammar.add_rules(
+        main_rule=Nodes(List(EnumNode(
+            Or(Enum(Tok(Token.Example), MyEnum('e_example')),
+               Enum(Tok(Token.Null), MyEnum('e_null')))
+        ))),
+    )
+    return grammar
+
+
+def generated_sources(root):
+    """
+    Return the set of generated source files in the `root` directory, as paths
+    relative to it.
+    """
+    result = set()
+    for dirpath, dirnames, filenames in os.walk(root):
+        # Skip build artifacts and caches
+        if 'obj' in dirnames:
+            dirnames.remove('obj')
+        for f in filenames:
+            result.add(os.path.relpath(os.path.join(dirpath, f), root))
+    return result
+
+
+# Generate the library once with the sorted_types cache...
+emit_and_print_errors(create_grammar())
+if os.path.exists('build-cached'):
+    shutil.rmtree('build-cached')
+os.rename('build', 'build-cached')
+
+# ... and once without it
+reset_langkit()
+cached_sorted_types = CompileCtx.sorted_types
+CompileCtx.sorted_types = (
+    lambda self, type_set: sorted(type_set, key=lambda cls: cls.name)
+)
+try:
+    emit_and_print_errors(create_grammar())
+finally:
+    CompileCtx.sorted_types = cached_sorted_types
+
+cached_sources = generated_sources('build-cached')
+uncached_sources = generated_sources('build')
+if cached_sources != uncached_sources:
+    print('Different sets of generated sources:')
+    for f in sorted(cached_sources ^ uncached_sources):
+        print('  {}'.format(f))
+else:
+    for f in sorted(cached_sources):
+        if not filecmp.cmp(os.path.join('build-cached', f),
+                           os.path.join('build', f), shallow=False):
+            print('Different content for {}'.format(f))
+print('Generated sources compared')
+
+# Check that sorted_types returns up-to-date results for type sets that are
+# modified after a first call, even when their size does not change.
+reset_langkit()
+ctx = prepare_context(create_grammar())
+FakeType = namedtuple('FakeType', 'name')
+type_set = {FakeType('b'), FakeType('c')}
+print([t.name for t in ctx.sorted_types(type_set)])
+type_set.remove(FakeType('c'))
+type_set.add(FakeType('a'))
+print([t.name for t in ctx.sorted_types(type_set)])
+reset_langkit()
+
+print('Done')
@@ -0,0 +1,100 @@
+"""
+Test that compiled templates in the template cache directory are keyed on the
+template content and on the Mako version, so that stale compiled modules are
+never reused.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import os
+import os.path
+import shutil
+
+import mako
+
+from langkit import template_utils
+from langkit.template_utils import (
+    _template_module_name, add_template_dir, mako_template,
+    set_template_cache_dir
+)
+
+
+TEMPLATE_DIR = os.path.abspath('templates')
+CACHE_DIR = os.path.abspath('mako-cache')
+TEMPLATE_FILE = os.path.join(TEMPLATE_DIR, 'template_cache_test.mako')
+
+
+def write_template(content):
+    with open(TEMPLATE_FILE, 'w') as f:
+        f.write(content)
+
+
+def module_name():
+    return os.path.basename(_template_module_name(TEMPLATE_FILE, None))
+
+
+def render():
+    """
+    Render the test template with a fresh template lookup, just like a new
+    Langkit run would do.
+    """
+    set_template_cache_dir(CACHE_DIR)
+    return mako_template('template_cache_test').render(name='world').strip()
+
+
+def cached_modules():
+    return sorted(f for f in os.listdir(CACHE_DIR) if f.endswith('.py'))
+
+
+for d in (TEMPLATE_DIR, CACHE_DIR):
+    if os.path.exists(d):
+        shutil.rmtree(d)
+os.mkdir(TEMPLATE_DIR)
+add_template_dir(TEMPLATE_DIR)
+
+try:
+    write_template('Hello ${name}\n')
+    set_template_cache_dir(CACHE_DIR)
+    first_name = module_name()
+    print('First render: {}'.format(render()))
+    print('Cached modules: {}'.format(cached_modules() == [first_name]))
+
+    # Rendering again reuses the same module
+    print('Second render: {}'.format(render()))
+    print('Cached modules: {}'.format(cached_modules() == [first_name]))
+
+    # Changing the template changes the module name, so the module compiled
+    # for the previous content is not used anymore, even though it is still
+    # there and may look up-to-date (the template may be rewritten within the
+    # same second).
+    write_template('Goodbye ${name}\n')
+    second_name = module_name()
+    print('New name after template change: {}'.format(
+        second_name != first_name
+    ))
+    print('Render after template change: {}'.format(render()))
+    print('Cached modules: {}'.format(
+        cached_modules() == sorted([first_name, second_name])
+    ))
+
+    # Going back to the first content gets the first module name again
+    write_template('Hello ${name}\n')
+    print('Same name for the same content: {}'.format(
+        module_name() == first_name
+    ))
+
+    # Changing the Mako version also changes the module name
+    mako_version = mako.__version__
+    mako.__version__ = mako_version + '-other'
+    try:
+        print('New name after Mako version change: {}'.format(
+            module_name() != first_name
+        ))
+    finally:
+        mako.__version__ = mako_version
+
+finally:
+    template_utils._template_dirs.remove(TEMPLATE_DIR)
+    set_template_cache_dir(None)
+
+print('Done')
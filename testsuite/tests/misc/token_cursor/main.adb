@@ -0,0 +1,137 @@
+with Ada.Text_IO; use Ada.Text_IO;
+
+with Libfoolang.Analysis; use Libfoolang.Analysis;
+
+procedure Main is
+
+   Ctx  : Analysis_Context := Create (With_Trivia => True);
+   Unit : constant Analysis_Unit := Get_From_Buffer
+     (Ctx, "foo.txt",
+      Buffer => "# lead 1" & ASCII.LF
+                & "# lead 2" & ASCII.LF
+                & "a # c1" & ASCII.LF
+                & "# c2" & ASCII.LF
+                & "b c # c3" & ASCII.LF);
+   Other_Unit : constant Analysis_Unit := Get_From_Buffer
+     (Ctx, "bar.txt", Buffer => "d");
+
+   Max_Tokens : constant := 100;
+   Tokens     : Token_Buffer (1 .. Max_Tokens);
+   Count      : Natural := 0;
+   --  Reference list of tokens, computed with the Next function
+
+   function Image (T : Token_Type) return String is
+     (if T = No_Token then "<No_Token>" else Libfoolang.Analysis.Image (T));
+
+   procedure Check (Label : String; T, Expected : Token_Type);
+   --  Print an error message if T and Expected are different
+
+   procedure Check_Fill (Chunk_Size : Positive);
+   --  Check that fetching all tokens with Fill_Token_Range and a buffer of
+   --  Chunk_Size elements yields the reference list of tokens.
+
+   -----------
+   -- Check --
+   -----------
+
+   procedure Check (Label : String; T, Expected : Token_Type) is
+   begin
+      if T /= Expected then
+         Put_Line (Label & ": got " & Image (T) & ", expected "
+                   & Image (Expected));
+      end if;
+   end Check;
+
+   ----------------
+   -- Check_Fill --
+   ----------------
+
+   procedure Check_Fill (Chunk_Size : Positive) is
+      Label  : constant String := "Fill (" & Positive'Image (Chunk_Size) & ")";
+      Buffer : Token_Buffer (1 .. Chunk_Size);
+      First  : Token_Type := First_Token (Unit);
+      Total  : Natural := 0;
+      Filled : Natural;
+   begin
+      loop
+         Fill_Token_Range (First, Tokens (Count), Buffer, Filled);
+         for I in 1 .. Filled loop
+            Check (Label, Buffer (I), Tokens (Total + I));
+         end loop;
+         Total := Total + Filled;
+         exit when Filled < Chunk_Size;
+         First := Next (Buffer (Filled));
+         exit when First = No_Token;
+      end loop;
+
+      if Total /= Count then
+         Put_Line (Label & ": got" & Natural'Image (Total) & " tokens");
+      end if;
+   end Check_Fill;
+
+   Cursor : Token_Cursor;
+   T      : Token_Type;
+   Buffer : Token_Buffer (1 .. 10);
+   Filled : Natural;
+
+begin
+   --  Compute the reference list of tokens
+
+   T := First_Token (Unit);
+   while T /= No_Token loop
+      Count := Count + 1;
+      Tokens (Count) := T;
+      Put_Line (Image (T));
+      T := Next (T);
+   end loop;
+   New_Line;
+
+   --  Go forward and then backward with a single cursor
+
+   Cursor := To_Cursor (Tokens (1));
+   for I in 1 .. Count loop
+      Check ("Forward", Current (Cursor), Tokens (I));
+      Next (Cursor);
+   end loop;
+   Check ("Forward", Current (Cursor), No_Token);
+
+   Cursor := To_Cursor (Tokens (Count));
+   for I in reverse 1 .. Count loop
+      Check ("Backward", Current (Cursor), Tokens (I));
+      Previous (Cursor);
+   end loop;
+   Check ("Backward", Current (Cursor), No_Token);
+
+   --  Check cursors created in the middle of the token stream
+
+   for I in 1 .. Count loop
+      Cursor := To_Cursor (Tokens (I));
+      Previous (Cursor);
+      Check ("Previous", Current (Cursor), Previous (Tokens (I)));
+
+      Cursor := To_Cursor (Tokens (I));
+      Next (Cursor);
+      Check ("Next", Current (Cursor), Next (Tokens (I)));
+   end loop;
+
+   --  Check Fill_Token_Range with various buffer sizes
+
+   for Chunk_Size in 1 .. Count + 1 loop
+      Check_Fill (Chunk_Size);
+   end loop;
+
+   Fill_Token_Range (Tokens (3), Tokens (2), Buffer, Filled);
+   Put_Line ("Reverse range:" & Natural'Image (Filled) & " tokens");
+
+   begin
+      Fill_Token_Range
+        (Tokens (1), First_Token (Other_Unit), Buffer, Filled);
+      Put_Line ("Different units: no error");
+   exception
+      when Constraint_Error =>
+         Put_Line ("Different units: Constraint_Error");
+   end;
+
+   Destroy (Ctx);
+   Put_Line ("Done.");
+end Main;
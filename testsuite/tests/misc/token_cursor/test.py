@@ -0,0 +1,46 @@
+"""
+Check that token cursors and Fill_Token_Range go through tokens and trivia
+just like the Next and Previous functions do.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field, T
+from langkit.lexer import (
+    Eof, Ignore, Lexer, LexerToken, Pattern, WithSymbol, WithTrivia
+)
+from langkit.parsers import Grammar, List, Tok
+
+from utils import build_and_run
+
+
+class Token(LexerToken):
+    Identifier = WithSymbol()
+    Comment = WithTrivia()
+
+
+foo_lexer = Lexer(Token)
+foo_lexer.add_rules(
+    (Pattern(r'[ \n\r\t]+'), Ignore()),
+    (Eof(),                  Token.Termination),
+
+    (Pattern(r'#[^\n]*'),    Token.Comment),
+    (Pattern('[a-zA-Z_][a-zA-Z0-9_]*'), Token.Identifier),
+)
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Name(FooNode):
+    tok = Field(type=T.TokenType)
+
+
+foo_grammar = Grammar('main_rule')
+foo_grammar.add_rules(
+    main_rule=List(foo_grammar.name),
+    name=Name(Tok(Token.Identifier, keep=True)),
+)
+build_and_run(foo_grammar, ada_main='main.adb', lexer=foo_lexer)
+print('Done')
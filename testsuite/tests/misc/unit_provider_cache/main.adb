@@ -0,0 +1,80 @@
+with Ada.Text_IO; use Ada.Text_IO;
+
+with Langkit_Support.Text; use Langkit_Support.Text;
+
+with Libfoolang.Analysis; use Libfoolang.Analysis;
+with Libfoolang.Counting_Unit_Provider;
+
+procedure Main is
+
+   package Provider renames Libfoolang.Counting_Unit_Provider;
+
+   Ctx : Analysis_Context := Create;
+
+   Last_Calls : Natural := 0;
+   Last_Unit  : Analysis_Unit;
+
+   procedure Get (Name : Text_Type; Reparse : Boolean := False);
+   --  Fetch the Name unit from Ctx's unit provider and print how many times
+   --  the unit provider was queried in order to get it.
+
+   ---------
+   -- Get --
+   ---------
+
+   procedure Get (Name : Text_Type; Reparse : Boolean := False) is
+      Label : constant String :=
+        "Get " & Image (Name, With_Quotes => True)
+        & (if Reparse then " (reparse)" else "");
+   begin
+      begin
+         Last_Unit := Get_From_Provider
+           (Ctx, Name, Unit_Specification, Reparse => Reparse);
+         Put (Label & ": " & Get_Filename (Last_Unit));
+      exception
+         when Invalid_Unit_Name_Error =>
+            Put (Label & ": Invalid_Unit_Name_Error");
+      end;
+      Put_Line (" (provider calls:"
+                & Natural'Image (Provider.Calls - Last_Calls) & ")");
+      Last_Calls := Provider.Calls;
+   end Get;
+
+   First_A : Analysis_Unit;
+
+begin
+   Put_Line ("== Cache hits ==");
+   Get ("a");
+   First_A := Last_Unit;
+   Get ("a");
+   Put_Line ("Same unit: " & Boolean'Image (Last_Unit = First_A));
+   New_Line;
+
+   Put_Line ("== Negative caching ==");
+   Get ("invalid");
+   Get ("invalid");
+   New_Line;
+
+   Put_Line ("== Reparse ==");
+   Get ("a", Reparse => True);
+   Get ("a");
+   New_Line;
+
+   Put_Line ("== Remove ==");
+   Remove (Ctx, Get_Filename (First_A));
+   Get ("a");
+   Get ("a");
+   New_Line;
+
+   Put_Line ("== Invalidate ==");
+   Get ("b");
+   Get ("b");
+   Invalidate_Unit_Provider_Cache (Ctx);
+   Get ("a");
+   Get ("b");
+   Get ("invalid");
+   Get ("b");
+
+   Destroy (Ctx);
+   Put_Line ("Done.");
+end Main;
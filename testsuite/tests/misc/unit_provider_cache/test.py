@@ -0,0 +1,31 @@
+"""
+Check that analysis contexts cache the answers of their unit provider, and
+that reparsing, removing units and invalidating the cache bypass or update
+this cache as expected.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.compile_context import LibraryEntity
+from langkit.dsl import ASTNode
+from langkit.parsers import Grammar
+
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Example(FooNode):
+    pass
+
+
+grammar = Grammar('main_rule')
+grammar.add_rules(main_rule=Example('example'))
+build_and_run(
+    grammar, ada_main='main.adb',
+    default_unit_provider=LibraryEntity('Libfoolang.Counting_Unit_Provider',
+                                        'Provider_Access')
+)
+print('Done')
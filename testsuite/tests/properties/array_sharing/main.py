@@ -0,0 +1,32 @@
+from __future__ import absolute_import, division, print_function
+
+print('main.py: Running...')
+
+
+import sys
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+
+for text in ('1 2 3', ''):
+    print('== {} =='.format(repr(text)))
+    u = ctx.get_from_buffer('main.txt', text)
+    if u.diagnostics:
+        for d in u.diagnostics:
+            print(d)
+        sys.exit(1)
+
+    # Evaluate properties several times, so that a shared empty array that is
+    # wrongly deallocated is used after being freed.
+    for _ in range(3):
+        results = [(name, getattr(u.root, 'p_' + name)) for name in (
+            'indexes', 'small_indexes', 'no_indexes', 'concat_left',
+            'concat_right', 'concat_both', 'concat_none', 'nb_count'
+        )]
+    for name, value in results:
+        print('{} = {}'.format(name, value))
+    print('')
+
+print('main.py: Done.')
@@ -0,0 +1,52 @@
+"""
+Test that empty arrays and concatenations with empty arrays, which share
+storage, are correctly handled by ref-counting, and that maps without filters
+(which build their result in place) are correct.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field
+from langkit.expressions import Property, Self
+from langkit.parsers import Grammar, List, Tok
+
+from lexer_example import Token
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class ListNode(FooNode):
+    nb_list = Field()
+
+    indexes = Property(Self.nb_list.map(lambda i, _: i), public=True)
+    small_indexes = Property(Self.indexes.filter(lambda i: i < 2),
+                             public=True)
+    no_indexes = Property(Self.indexes.filter(lambda i: i < 0), public=True)
+
+    concat_left = Property(Self.no_indexes.concat(Self.indexes), public=True)
+    concat_right = Property(Self.indexes.concat(Self.no_indexes), public=True)
+    concat_both = Property(Self.small_indexes.concat(Self.indexes),
+                           public=True)
+    concat_none = Property(Self.no_indexes.concat(Self.no_indexes),
+                           public=True)
+
+    nb_count = Property(Self.nb_list.map(lambda n: n).length, public=True)
+
+
+class NumberNode(FooNode):
+    tok = Field()
+
+
+foo_grammar = Grammar('main_rule')
+foo_grammar.add_rules(
+    main_rule=ListNode(
+        List(NumberNode(Tok(Token.Number, keep=True)), empty_valid=True)
+    ),
+)
+
+
+build_and_run(foo_grammar, 'main.py')
+print('Done')
@@ -0,0 +1,74 @@
+from __future__ import absolute_import, division, print_function
+
+import ctypes
+import os
+import re
+import sys
+import tempfile
+
+import libfoolang
+
+
+print('main.py: Running...')
+
+ctx = libfoolang.AnalysisContext()
+u = ctx.get_from_buffer('main.txt', 'example')
+if u.diagnostics:
+    for d in u.diagnostics:
+        print(d)
+    sys.exit(1)
+
+# 3 misses for both properties: "bounded" evicts its result for 1
+for n in (1, 2, 3):
+    print('bounded({}) = {}'.format(n, u.root.p_bounded(n)))
+    print('unbounded({}) = {}'.format(n, u.root.p_unbounded(n)))
+
+# Hits for 3, 2 and for 1 only in "unbounded": "bounded" recomputes 1 and
+# evicts 3, the least recently used.
+for n in (3, 2, 1):
+    print('bounded({}) = {}'.format(n, u.root.p_bounded(n)))
+    print('unbounded({}) = {}'.format(n, u.root.p_unbounded(n)))
+
+
+def dump_statistics():
+    """
+    Print memoization statistics. As the number of bytes depends on the
+    platform, only print whether it is zero.
+    """
+    # The C API prints to the standard output: redirect it to a file so that
+    # we can process it.
+    libc = ctypes.CDLL(None)
+    sys.stdout.flush()
+    saved_fd = os.dup(1)
+    with tempfile.TemporaryFile() as f:
+        os.dup2(f.fileno(), 1)
+        try:
+            libfoolang._c_lib.foo_context_dump_memoization_statistics(
+                ctx._c_value
+            )
+            libc.fflush(None)
+        finally:
+            os.dup2(saved_fd, 1)
+            os.close(saved_fd)
+        f.seek(0)
+        output = f.read()
+
+    for line in output.splitlines():
+        print(re.sub(r'bytes=(\d+)',
+                     lambda m: 'bytes={}'.format(
+                         'zero' if m.group(1) == '0' else 'non-zero'
+                     ),
+                     line))
+
+
+print('')
+dump_statistics()
+print('')
+
+# Resetting caches destroys memoization entries but keeps lookup statistics
+u.reparse(buffer='example')
+u.root.p_bounded(1)
+dump_statistics()
+print('')
+
+print('main.py: Done.')
@@ -0,0 +1,35 @@
+"""
+Test that memoized properties with a memoization limit evict their least
+recently used results, and that memoization statistics are correct.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, LongType
+from langkit.expressions import langkit_property
+from langkit.parsers import Grammar, Tok
+
+from lexer_example import Token
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Example(FooNode):
+    @langkit_property(memoized=True, memoization_limit=2, public=True)
+    def bounded(n=LongType):
+        return n + 1
+
+    @langkit_property(memoized=True, public=True)
+    def unbounded(n=LongType):
+        return n + 2
+
+
+foo_grammar = Grammar('main_rule')
+foo_grammar.add_rules(
+    main_rule=Example(Tok(Token.Example)),
+)
+build_and_run(foo_grammar, 'main.py')
+print('Done')
@@ -0,0 +1,109 @@
+with Ada.Exceptions; use Ada.Exceptions;
+with Ada.Text_IO;    use Ada.Text_IO;
+
+with Libfoolang.Analysis; use Libfoolang.Analysis;
+with Libfoolang.Analysis.Implementation;
+
+procedure Main is
+
+   Prelude      : Analysis_Context := Create;
+   Prelude_Unit : constant Analysis_Unit := Get_From_Buffer
+     (Prelude, "prelude.txt", Buffer => "foo { bar {} }");
+   Foo          : constant Scope := Root (Prelude_Unit).Child (1).As_Scope;
+
+   procedure Check_Prelude_Member;
+   --  Check whether the "foo" prelude scope has a "foo" member
+
+   procedure Put_Prelude_Statistics;
+   --  Print memoization statistics for the units of Prelude
+
+   procedure Process (Buffer, Member : String);
+   --  Create a context that uses Prelude, load Buffer in it and populate its
+   --  lexical environments. Buffer's first declaration must be a simple
+   --  identifier: check twice whether it designates a member of the "foo"
+   --  prelude scope.
+
+   --------------------------
+   -- Check_Prelude_Member --
+   --------------------------
+
+   procedure Check_Prelude_Member is
+   begin
+      Put_Line ("foo has foo: "
+                & Boolean'Image (Foo.P_Has_Member (Foo.F_Name)));
+   end Check_Prelude_Member;
+
+   ----------------------------
+   -- Put_Prelude_Statistics --
+   ----------------------------
+
+   procedure Put_Prelude_Statistics is
+      package Impl renames Libfoolang.Analysis.Implementation;
+
+      Hits, Misses : Long_Long_Integer := 0;
+   begin
+      for S of Impl.Memoization_Statistics (Prelude) loop
+         Hits := Hits + S.Hits;
+         Misses := Misses + S.Misses;
+      end loop;
+      Put_Line ("Prelude memoization: hits:" & Long_Long_Integer'Image (Hits)
+                & ", misses:" & Long_Long_Integer'Image (Misses));
+   end Put_Prelude_Statistics;
+
+   -------------
+   -- Process --
+   -------------
+
+   procedure Process (Buffer, Member : String) is
+      Ctx  : Analysis_Context := Create (Prelude => Prelude);
+      Unit : Analysis_Unit;
+   begin
+      Put_Line ("== " & Buffer & " ==");
+      Discard_Errors_In_Populate_Lexical_Env (Ctx, False);
+      Unit := Get_From_Buffer (Ctx, "main.txt", Buffer => Buffer);
+
+      begin
+         Populate_Lexical_Env (Unit);
+         Put_Line ("Populate: no error");
+      exception
+         when Exc : Property_Error =>
+            Put_Line ("Populate: " & Exception_Message (Exc));
+      end;
+
+      declare
+         Id : constant Simple_Id :=
+           Root (Unit).Child (1).As_Foreign_Decl.F_Id.As_Simple_Id;
+      begin
+         for I in 1 .. 2 loop
+            Put_Line ("foo has " & Member & ": "
+                      & Boolean'Image (Foo.P_Has_Member (Id)));
+         end loop;
+      end;
+      Check_Prelude_Member;
+      Put_Prelude_Statistics;
+      New_Line;
+
+      Destroy (Ctx);
+   end Process;
+
+begin
+   --  Properties evaluated on the prelude before it is frozen are memoized,
+   --  and contexts that use it can reuse their results. After that, the
+   --  memoization tables of the prelude are read-only, so statistics must not
+   --  change.
+
+   Check_Prelude_Member;
+   Put_Prelude_Statistics;
+   New_Line;
+   Freeze (Prelude);
+
+   --  Both contexts try to add a declaration to the "foo" scope from the
+   --  prelude. The second context uses a name that the first context tried to
+   --  add: it must not see it.
+
+   Process ("bar foo.x", "bar");
+   Process ("x foo.y", "x");
+
+   Dec_Ref (Prelude);
+   Put_Line ("Done.");
+end Main;
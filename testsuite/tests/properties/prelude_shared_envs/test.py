@@ -0,0 +1,109 @@
+"""
+Check that contexts which share a prelude cannot add entries to its lexical
+environments, and that the memoization tables of prelude units are read-only
+once the prelude is frozen.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field, T, abstract
+from langkit.envs import EnvSpec, add_env, add_to_env
+from langkit.expressions import (AbstractKind, New, Not, Self,
+                                 langkit_property)
+from langkit.parsers import Grammar, List, Or, Tok
+
+from lexer_example import Token
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Scope(FooNode):
+    name = Field(type=T.SimpleId)
+    content = Field()
+
+    env_spec = EnvSpec(
+        add_to_env(New(T.env_assoc, key=Self.name.get_symbol, val=Self)),
+        add_env()
+    )
+
+    @langkit_property(public=True, memoized=True)
+    def has_member(id=T.SimpleId):
+        return Not(Self.children_env.get_first(id.get_symbol,
+                                               recursive=False).is_null)
+
+
+@abstract
+class Id(FooNode):
+    @langkit_property(return_type=T.SimpleId, kind=AbstractKind.abstract)
+    def simple_name():
+        pass
+
+    @langkit_property(return_type=T.Scope, kind=AbstractKind.abstract)
+    def resolve(base_env=T.LexicalEnvType):
+        pass
+
+
+class SimpleId(Id):
+    name = Field(type=T.TokenType)
+
+    @langkit_property()
+    def get_symbol():
+        return Self.name.symbol
+
+    @langkit_property()
+    def simple_name():
+        return Self
+
+    @langkit_property()
+    def resolve(base_env=T.LexicalEnvType):
+        return base_env.get_first(Self.get_symbol).el.cast(T.Scope)
+
+
+class ScopedId(Id):
+    scope = Field(type=T.Id)
+    name = Field(type=T.SimpleId)
+
+    @langkit_property()
+    def simple_name():
+        return Self.name
+
+    @langkit_property()
+    def resolve(base_env=T.LexicalEnvType):
+        return (Self.scope.resolve(base_env)
+                .children_env.get_first(Self.name.get_symbol).el
+                .cast(T.Scope))
+
+
+class ForeignDecl(FooNode):
+    id = Field(type=T.Id)
+
+    env_spec = EnvSpec(
+        add_to_env(
+            New(T.env_assoc, key=Self.id.simple_name.get_symbol, val=Self),
+            dest_env=Self.id.match(
+                lambda simple=T.SimpleId:
+                    simple.node_env,
+                lambda scoped=T.ScopedId:
+                    scoped.resolve(Self.node_env).children_env,
+            )
+        )
+    )
+
+
+G = Grammar('main_rule')
+G.add_rules(
+    main_rule=List(Or(G.scope, G.foreign_decl)),
+    scope=Scope(G.simple_identifier,
+                '{', List(G.scope, empty_valid=True), '}'),
+
+    identifier=Or(ScopedId(G.identifier, '.', G.simple_identifier),
+                  G.simple_identifier),
+    simple_identifier=SimpleId(Tok(Token.Identifier, keep=True)),
+
+    foreign_decl=ForeignDecl(G.identifier),
+)
+build_and_run(G, ada_main='main.adb')
+print('Done')
@@ -0,0 +1,152 @@
+with Ada.Exceptions; use Ada.Exceptions;
+with Ada.Text_IO;    use Ada.Text_IO;
+
+with Libfoolang.Analysis; use Libfoolang.Analysis;
+
+procedure Main is
+
+   Prelude      : Analysis_Context := Create;
+   Prelude_Unit : constant Analysis_Unit := Get_From_Buffer
+     (Prelude, "prelude.txt", Buffer => "b(a) a()");
+
+   Ctx  : Analysis_Context;
+   Unit : Analysis_Unit;
+
+   procedure Check_Error (Label : String; Action : access procedure);
+   --  Run Action and print the message of the Constraint_Error it is expected
+   --  to raise.
+
+   procedure Resolve (Unit : Analysis_Unit);
+   --  Resolve the references in the first declaration of Unit and print the
+   --  declarations they designate.
+
+   procedure Create_With_Unfrozen_Prelude;
+   procedure Load_In_Prelude;
+   procedure Parse_Buffer_For_Prelude_Unit;
+   procedure Reparse_Prelude_Unit;
+   procedure Remove_From_Prelude;
+
+   -----------------
+   -- Check_Error --
+   -----------------
+
+   procedure Check_Error (Label : String; Action : access procedure) is
+   begin
+      Action.all;
+      Put_Line (Label & ": no error");
+   exception
+      when Exc : Constraint_Error =>
+         Put_Line (Label & ": " & Exception_Message (Exc));
+   end Check_Error;
+
+   -------------
+   -- Resolve --
+   -------------
+
+   procedure Resolve (Unit : Analysis_Unit) is
+      Items : constant Foo_Node'Class :=
+        Root (Unit).Child (1).As_Decl.F_Items;
+   begin
+      for I in 1 .. Items.Child_Count loop
+         declare
+            R : constant Ref := Items.Child (I).As_Ref;
+            D : constant Decl := R.P_Decl;
+         begin
+            Put_Line ("  " & R.Short_Image & " -> " & D.Short_Image
+                      & (if D.Get_Unit = Prelude_Unit
+                         then " (prelude)"
+                         else " (main)"));
+         end;
+      end loop;
+   end Resolve;
+
+   ----------------------------------
+   -- Create_With_Unfrozen_Prelude --
+   ----------------------------------
+
+   procedure Create_With_Unfrozen_Prelude is
+      Unfrozen : Analysis_Context := Create;
+      Dummy    : Analysis_Context;
+   begin
+      Dummy := Create (Prelude => Unfrozen);
+   exception
+      when Constraint_Error =>
+         Destroy (Unfrozen);
+         raise;
+   end Create_With_Unfrozen_Prelude;
+
+   ---------------------
+   -- Load_In_Prelude --
+   ---------------------
+
+   procedure Load_In_Prelude is
+      Dummy : Analysis_Unit;
+   begin
+      Dummy := Get_From_Buffer (Prelude, "other.txt", Buffer => "c()");
+   end Load_In_Prelude;
+
+   -----------------------------------
+   -- Parse_Buffer_For_Prelude_Unit --
+   -----------------------------------
+
+   procedure Parse_Buffer_For_Prelude_Unit is
+      Dummy : Analysis_Unit;
+   begin
+      Dummy := Get_From_Buffer (Ctx, "prelude.txt", Buffer => "c()");
+   end Parse_Buffer_For_Prelude_Unit;
+
+   --------------------------
+   -- Reparse_Prelude_Unit --
+   --------------------------
+
+   procedure Reparse_Prelude_Unit is
+      Dummy : Analysis_Unit;
+   begin
+      Dummy := Get_From_File (Ctx, "prelude.txt", Reparse => True);
+   end Reparse_Prelude_Unit;
+
+   -------------------------
+   -- Remove_From_Prelude --
+   -------------------------
+
+   procedure Remove_From_Prelude is
+   begin
+      Remove (Prelude, "prelude.txt");
+   end Remove_From_Prelude;
+
+begin
+   Put_Line ("Frozen before Freeze: " & Image (Is_Frozen (Prelude)));
+   Freeze (Prelude);
+   Put_Line ("Frozen after Freeze: " & Image (Is_Frozen (Prelude)));
+
+   Check_Error ("Create with unfrozen prelude",
+                Create_With_Unfrozen_Prelude'Access);
+
+   Ctx := Create (Prelude => Prelude);
+   Put_Line ("Prelude unit is shared: "
+             & Image (Get_From_File (Ctx, "prelude.txt") = Prelude_Unit));
+   Put_Line ("Has prelude unit: " & Image (Has_Unit (Ctx, "prelude.txt")));
+
+   --  References in the main unit must resolve to local declarations first,
+   --  and then to the declarations of the prelude.
+
+   Unit := Get_From_Buffer (Ctx, "main.txt", Buffer => "c(a b) b()");
+   Put_Line ("Resolving main.txt:");
+   Resolve (Unit);
+   Put_Line ("Resolving prelude.txt:");
+   Resolve (Prelude_Unit);
+
+   Check_Error ("Load in frozen context", Load_In_Prelude'Access);
+   Check_Error ("Parse buffer for prelude unit",
+                Parse_Buffer_For_Prelude_Unit'Access);
+   Check_Error ("Reparse prelude unit", Reparse_Prelude_Unit'Access);
+   Check_Error ("Remove from frozen context", Remove_From_Prelude'Access);
+
+   --  Ctx holds a reference to its prelude, so it must remain usable after
+   --  we release ours.
+
+   Dec_Ref (Prelude);
+   Put_Line ("Resolving main.txt after releasing the prelude:");
+   Resolve (Unit);
+   Destroy (Ctx);
+end Main;
@@ -0,0 +1,117 @@
+from __future__ import absolute_import, division, print_function
+
+import os
+import os.path
+
+print('main.py: Running...')
+
+
+import libfoolang
+
+
+CACHE_DIR = 'ast-cache'
+
+# Keep analysis contexts alive as long as we use their units
+contexts = []
+
+
+def write_source(content):
+    with open('foo.txt', 'w') as f:
+        f.write(content)
+
+
+def load(with_trivia=False):
+    """
+    Load foo.txt in a new analysis context that uses the AST cache.
+    """
+    ctx = libfoolang.AnalysisContext(with_trivia=with_trivia)
+    ctx.set_ast_cache_directory(CACHE_DIR)
+    contexts.append(ctx)
+    return ctx.get_from_file('foo.txt')
+
+
+def cache_entries():
+    return sorted(f for f in os.listdir(CACHE_DIR) if f.endswith('.ast'))
+
+
+def describe(unit):
+    """
+    Return a list of strings that describe the tokens and the tree of unit.
+    """
+    return ([str(t) for t in unit.iter_tokens()]
+            + [str(n) for n in unit.root.findall(lambda n: True)]
+            + [str(d) for d in unit.diagnostics])
+
+
+os.mkdir(CACHE_DIR)
+write_source('example a = 1\nnull + b =\n')
+
+# The first load parses the source and creates an entry, the second one uses
+# it.
+parsed = load()
+print('Entries after parsing: {}'.format(len(cache_entries())))
+first_entry = os.path.join(CACHE_DIR, cache_entries()[0])
+with open(first_entry, 'rb') as f:
+    first_content = f.read()
+cached = load()
+print('Entries after loading again: {}'.format(len(cache_entries())))
+cached.root.dump()
+print('Same tokens and nodes: {}'.format(describe(parsed) == describe(cached)))
+print('Name: {}'.format(cached.root[1].f_name.text))
+
+# Different parsing settings need a different entry
+load(with_trivia=True)
+print('Entries after loading with trivia: {}'.format(len(cache_entries())))
+
+# Sources with errors are never saved to the cache
+write_source('example a = 1\nnull + =\n')
+print('Has diagnostics: {}'.format(bool(load().diagnostics)))
+print('Entries after a parsing error: {}'.format(len(cache_entries())))
+
+# Reparsing the unit from the file after an update uses a different entry
+write_source('null c = 2\n')
+cached.reparse()
+cached.root.dump()
+print('Entries after reparsing: {}'.format(len(cache_entries())))
+
+# Broken entries are ignored
+for entry in cache_entries():
+    path = os.path.join(CACHE_DIR, entry)
+    with open(path, 'rb') as f:
+        content = f.read()
+    with open(path, 'wb') as f:
+        f.write(content[:len(content) // 2])
+broken = load()
+print('Load with truncated entries: {}'.format(
+    describe(broken) == describe(cached)
+))
+
+# Make sure loads actually use the cache: put the content of the first entry in
+# the entry for another source. Loading this other source then yields the
+# first tree instead of parsing it.
+write_source('null z =\n')
+before = set(cache_entries())
+load()
+new_entry, = set(cache_entries()) - before
+with open(os.path.join(CACHE_DIR, new_entry), 'wb') as f:
+    f.write(first_content)
+swapped = load()
+print('Names from the swapped entry: {}'.format(
+    [d.f_name.text for d in swapped.root]
+))
+
+# Empty sources can be cached too
+write_source('')
+before = len(cache_entries())
+print('Empty source children: {}'.format(len(load().root)))
+print('Entries after parsing an empty source: {}'.format(
+    len(cache_entries()) - before
+))
+print('Empty source children from the cache: {}'.format(len(load().root)))
+
+# Temporary files never stay in the cache directory
+print('Temporary files: {}'.format(
+    [f for f in os.listdir(CACHE_DIR) if f.endswith('.tmp')]
+))
+
+print('main.py: Done.')
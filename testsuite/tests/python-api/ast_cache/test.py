@@ -0,0 +1,49 @@
+"""
+Test that the on-disk AST cache restores units that are identical to parsed
+ones, that loads actually use it, and that it ignores broken cache entries.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, BoolType, EnumType, Field, TokenType
+from langkit.parsers import Enum, Grammar, List, Opt, Or, Tok
+
+from lexer_example import Token
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class DeclKind(EnumType):
+    alternatives = ['e_example', 'e_null']
+
+
+class Number(FooNode):
+    tok = Field(type=TokenType)
+
+
+class Decl(FooNode):
+    kind = Field(type=DeclKind)
+    has_plus = Field(type=BoolType)
+    name = Field(type=TokenType)
+    value = Field(type=Number)
+
+
+foo_grammar = Grammar('main_rule')
+foo_grammar.add_rules(
+    main_rule=List(foo_grammar.decl, empty_valid=True),
+    decl=Decl(
+        Or(Enum(Tok(Token.Example), DeclKind('e_example')),
+           Enum(Tok(Token.Null), DeclKind('e_null'))),
+        Opt('+').as_bool(),
+        Tok(Token.Identifier, keep=True),
+        '=',
+        Opt(foo_grammar.number)
+    ),
+    number=Number(Tok(Token.Number, keep=True)),
+)
+
+build_and_run(foo_grammar, 'main.py')
+print('Done')
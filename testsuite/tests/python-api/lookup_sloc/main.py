@@ -0,0 +1,19 @@
+from __future__ import absolute_import, division, print_function
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+unit = ctx.get_from_buffer(
+    'foo.txt',
+    ''.join('a{} = b{}\nc{}\n'.format(i, i, i) for i in range(50))
+)
+assert not unit.diagnostics, unit.diagnostics
+
+for line, column in [(1, 1), (1, 2), (1, 4), (1, 6), (2, 1),
+                     (50, 3), (99, 1), (99, 5), (100, 2), (100, 3),
+                     (101, 1)]:
+    sloc = libfoolang.Sloc(line, column)
+    print('{}: {}'.format(sloc, unit.root.lookup(sloc)))
+
+print('Done.')
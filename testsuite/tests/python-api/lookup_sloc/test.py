@@ -0,0 +1,35 @@
+"""
+Test that looking up nodes by source location works in the Python API, in
+particular in list nodes with many children and in nodes with null fields.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field, T
+from langkit.parsers import Grammar, List, Opt, Tok
+
+from lexer_example import Token
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Decl(FooNode):
+    name = Field(type=T.Name)
+    value = Field(type=T.Name)
+
+
+class Name(FooNode):
+    tok = Field(type=T.TokenType)
+
+
+foo_grammar = Grammar('main_rule')
+foo_grammar.add_rules(
+    main_rule=List(foo_grammar.decl),
+    decl=Decl(foo_grammar.name, Opt('=', foo_grammar.name)),
+    name=Name(Tok(Token.Identifier, keep=True)),
+)
+build_and_run(foo_grammar, 'main.py')
+print('Done')
@@ -0,0 +1,39 @@
+from __future__ import absolute_import, division, print_function
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+unit = ctx.get_from_buffer('foo.txt', '(a 1 (b (2 c)) 3 ())')
+assert not unit.diagnostics, unit.diagnostics
+
+
+def check(cls, show_tokens):
+    nodes = unit.nodes_of_kind(cls)
+
+    # The result must be the same as the one of a traversal of the whole tree
+    # (note that findall does not consider the root node itself).
+    expected = unit.root.findall(cls)
+    if isinstance(unit.root, cls):
+        expected.insert(0, unit.root)
+    assert [str(n) for n in nodes] == [str(n) for n in expected]
+
+    if show_tokens:
+        print('{}: {}'.format(cls.__name__,
+                              ', '.join(n.tok.text for n in nodes)))
+    else:
+        print('{}: {} nodes'.format(cls.__name__, len(nodes)))
+
+
+check(libfoolang.FooNode, False)
+check(libfoolang.Sequence, False)
+check(libfoolang.Atom, True)
+check(libfoolang.Ref, True)
+check(libfoolang.Lit, True)
+
+print('After reparse:')
+unit.reparse('(x 4)')
+check(libfoolang.Ref, True)
+check(libfoolang.Lit, True)
+
+print('Done.')
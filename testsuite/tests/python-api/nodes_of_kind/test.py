@@ -0,0 +1,48 @@
+"""
+Test that looking up all the nodes of some kind in an analysis unit works in
+the Python API, for both concrete and abstract node types.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field, abstract
+from langkit.parsers import Grammar, List, Or, Pick, Tok
+
+from lexer_example import Token
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Sequence(FooNode.list):
+    pass
+
+
+@abstract
+class Atom(FooNode):
+    pass
+
+
+class Ref(Atom):
+    tok = Field()
+
+
+class Lit(Atom):
+    tok = Field()
+
+
+foo_grammar = Grammar('main_rule')
+foo_grammar.add_rules(
+    main_rule=foo_grammar.element,
+    element=Or(foo_grammar.sequence, foo_grammar.atom),
+    sequence=Pick('(', List(foo_grammar.element, list_cls=Sequence,
+                            empty_valid=True), ')'),
+    atom=Or(Ref(Tok(Token.Identifier, keep=True)),
+            Lit(Tok(Token.Number, keep=True))),
+)
+
+build_and_run(foo_grammar, 'main.py')
+
+print('Done')
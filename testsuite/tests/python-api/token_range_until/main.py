@@ -0,0 +1,51 @@
+from __future__ import absolute_import, division, print_function
+
+import sys
+
+print('main.py: Running...')
+
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+u = ctx.get_from_buffer('foo.txt', ' '.join('a{}'.format(i)
+                                            for i in range(600)))
+if u.diagnostics:
+    for d in u.diagnostics:
+        print(d)
+    sys.exit(1)
+
+# Reference list of tokens, fetched one at a time
+tokens = []
+t = u.first_token
+while t is not None:
+    tokens.append(t)
+    t = t.next
+print('Number of tokens: {}'.format(len(tokens)))
+
+# range_until fetches tokens by chunks of 256: check ranges that stop right
+# before, at and right after chunk boundaries, and ranges that end on the
+# termination token, whose next token does not exist.
+last = len(tokens) - 1
+for first_index, last_index in [(0, 0),
+                                (0, 254),
+                                (0, 255),
+                                (0, 256),
+                                (0, 511),
+                                (0, 512),
+                                (10, 265),
+                                (10, 530),
+                                (last - 255, last),
+                                (last - 256, last),
+                                (0, last)]:
+    result = list(tokens[first_index].range_until(tokens[last_index]))
+    print('{} .. {}: {} tokens, {}'.format(
+        first_index, last_index, len(result),
+        'OK' if result == tokens[first_index:last_index + 1] else 'FAIL'
+    ))
+
+# Empty ranges yield no token
+print('Empty range: {}'.format(list(tokens[300].range_until(tokens[299]))))
+
+print('main.py: Done.')
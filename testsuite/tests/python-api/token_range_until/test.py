@@ -0,0 +1,30 @@
+"""
+Test that Token.range_until returns the right tokens for ranges that span
+several of the chunks it uses to fetch tokens.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field, TokenType
+from langkit.parsers import Grammar, List, Tok
+
+from lexer_example import Token
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Atom(FooNode):
+    tok = Field(type=TokenType)
+
+
+foo_grammar = Grammar('main_rule')
+foo_grammar.add_rules(
+    main_rule=List(foo_grammar.atom),
+    atom=Atom(Tok(Token.Identifier, keep=True)),
+)
+
+build_and_run(foo_grammar, 'main.py')
+print('Done')
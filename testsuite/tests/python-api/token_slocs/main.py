@@ -0,0 +1,35 @@
+from __future__ import absolute_import, division, print_function
+
+import sys
+
+import libfoolang
+
+
+print('main.py: Running...')
+
+ctx = libfoolang.AnalysisContext(with_trivia=True)
+u = ctx.get_from_buffer('foo.txt', '# leading\na # c\n"x\ny" b\n\n')
+if u.diagnostics:
+    for d in u.diagnostics:
+        print(d)
+    sys.exit(1)
+
+print('Tokens:')
+t = u.first_token
+while t is not None:
+    print('  ', t)
+    t = t.next
+
+# Line numbers are computed with a cache of the last line looked up: make sure
+# that it also works when walking backwards.
+print('Tokens backwards:')
+t = u.last_token
+while t is not None:
+    print('  ', t)
+    t = t.previous
+
+print('Node slocs:')
+for atom in u.root:
+    print('  ', atom, atom.sloc_range)
+
+print('main.py: Done.')
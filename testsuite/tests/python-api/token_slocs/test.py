@@ -0,0 +1,49 @@
+"""
+Test that source locations for tokens and trivia are right, in particular for
+tokens that span multiple lines and for the termination token.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field, T
+from langkit.lexer import (
+    Eof, Ignore, Lexer, LexerToken, Pattern, WithSymbol, WithText, WithTrivia
+)
+from langkit.parsers import Grammar, List, Or, Tok
+
+from utils import build_and_run
+
+
+class Token(LexerToken):
+    Identifier = WithSymbol()
+    Str = WithText()
+    Comment = WithTrivia()
+
+
+foo_lexer = Lexer(Token)
+foo_lexer.add_rules(
+    (Pattern(r'[ \n\r\t]+'), Ignore()),
+    (Eof(),                  Token.Termination),
+
+    (Pattern(r'#[^\n]*'),    Token.Comment),
+    (Pattern(r'"[^"]*"'),    Token.Str),
+    (Pattern('[a-zA-Z_][a-zA-Z0-9_]*'), Token.Identifier),
+)
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Atom(FooNode):
+    tok = Field(type=T.TokenType)
+
+
+foo_grammar = Grammar('main_rule')
+foo_grammar.add_rules(
+    main_rule=List(foo_grammar.atom),
+    atom=Atom(Or(Tok(Token.Identifier, keep=True),
+                 Tok(Token.Str, keep=True))),
+)
+build_and_run(foo_grammar, 'main.py', lexer=foo_lexer)
+print('Done')